@@ -1,10 +1,44 @@
-from fastapi import APIRouter, Query
-from typing import Dict, Any, List
+import asyncio
+import json
 
-from app.modules.assist_scraper import get_transfer_courses
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
+
+from app.config import settings
+from app.modules.assist_async import get_async_assist_client, get_transfer_courses_async
+from app.modules.browser_pool import close_browser_pool, get_browser_pool
+from app.modules.data_pack import get_data_pack
+from app.modules.single_flight import coalescing_stats
+from app.modules.transfer_jobs import JobQueueFull, TransferJob, get_transfer_job_manager
 
 router = APIRouter(prefix="/transfers", tags=["transfers"])
 
+_background_tasks = set()
+
+@router.on_event("startup")
+async def map_data_pack() -> None:
+    """Maps the bundled articulation data pack up front so packed pathways never wait on disk or network."""
+    get_data_pack()
+
+@router.on_event("startup")
+async def prewarm_browser_pool() -> None:
+    """Launches the pooled Chrome sessions in the background so the first Selenium scrape finds one warm."""
+    if settings.SELENIUM_PREWARM:
+        task = asyncio.create_task(asyncio.to_thread(get_browser_pool().warm))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+@router.on_event("shutdown")
+async def quit_pooled_browsers() -> None:
+    """Quits the pooled Chrome sessions so reloads and worker restarts don't leave headless Chrome behind."""
+    await asyncio.to_thread(close_browser_pool)
+
+@router.on_event("shutdown")
+async def close_assist_client() -> None:
+    await get_async_assist_client().aclose()
+
 @router.get("/requirements")
 async def get_transfer_requirements(
     source_institution: str = Query(..., description="Source institution (where student is transferring from)"),
@@ -17,12 +51,82 @@ async def get_transfer_requirements(
     Get transfer course requirements from source to target institution for a specific major.
     Will check which courses have been completed by the student and mark remaining ones.
     """
-    result = get_transfer_courses(
-        source_institution=source_institution,
-        target_institution=target_institution,
-        major=major,
+    result = await get_transfer_courses_async(
+        source_institution_name=source_institution,
+        target_institution_name=target_institution,
+        major_name_input=major,
         completed_courses=completed_courses,
         target_quarter=target_quarter
     )
     
-    return result 
\ No newline at end of file
+    return result
+
+
+@router.get("/metrics")
+async def get_transfer_metrics() -> Dict[str, Any]:
+    """Counters for /transfers lookups (calls, upstream lookups, coalesced calls)."""
+    return {"coalescing": coalescing_stats("transfers")}
+
+
+class TransferJobRequest(BaseModel):
+    source_institution: str = Field(..., description="Source institution (where student is transferring from)")
+    target_institution: str = Field(..., description="Target institution (where student wants to transfer to)")
+    major: str = Field(..., description="Major/program of study")
+    completed_courses: Optional[List[str]] = Field(None, description="Course codes the student has already completed")
+    target_quarter: Optional[str] = Field(None, description="Target quarter/term for transfer (e.g., 'Fall 2024')")
+    target_academic_year: Optional[str] = Field(None, description="Academic year, e.g. '2024-2025'")
+    true_data_only: bool = Field(True, description="Scrape assist.org with Selenium; no API or data-pack fallback")
+    use_selenium: bool = Field(False, description="Prefer the Selenium scraper")
+
+def _job_links(job: TransferJob) -> Dict[str, str]:
+    return {"status_url": f"/transfers/requirements/jobs/{job.id}",
+            "events_url": f"/transfers/requirements/jobs/{job.id}/events"}
+
+def _get_job_or_404(job_id: str) -> TransferJob:
+    job = get_transfer_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired transfer job '{job_id}'")
+    return job
+
+@router.post("/requirements/jobs", status_code=202)
+async def create_transfer_requirements_job(req: TransferJobRequest) -> Dict[str, Any]:
+    """
+    Queues a (typically Selenium) requirements lookup and returns its job id immediately.
+    Poll the status URL or subscribe to the events URL (SSE) for progress and the result.
+    """
+    try:
+        job = get_transfer_job_manager().submit({
+            "source_institution_name": req.source_institution,
+            "target_institution_name": req.target_institution,
+            "major_name_input": req.major,
+            "completed_courses": req.completed_courses,
+            "target_quarter": req.target_quarter,
+            "target_academic_year_str": req.target_academic_year,
+            "use_selenium": req.use_selenium,
+            "true_data_only": req.true_data_only,
+            "run_selenium_headless": True,
+        })
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=f"Too many transfer jobs in progress: {e}")
+    return {"job_id": job.id, "status": job.status, **_job_links(job)}
+
+@router.get("/requirements/jobs/{job_id}")
+async def get_transfer_requirements_job(job_id: str) -> Dict[str, Any]:
+    """Current status, progress events so far and (once finished) the result."""
+    job = _get_job_or_404(job_id)
+    return {**job.snapshot(), **_job_links(job)}
+
+@router.get("/requirements/jobs/{job_id}/events")
+async def stream_transfer_requirements_job(job_id: str) -> StreamingResponse:
+    """Server-sent events: queued, running, one "step" per scraper step, then done/failed with the result."""
+    job = _get_job_or_404(job_id)
+
+    async def events():
+        async for record in job.stream():
+            data = dict(record)
+            if record["event"] in ("done", "failed"):
+                data["result"] = job.result
+            yield f"id: {record['seq']}\nevent: {record['event']}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
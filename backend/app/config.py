@@ -11,4 +11,74 @@ class Settings:
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", 8000))
 
-settings = Settings()
\ No newline at end of file
+    # Local ASSIST reference store (SQLite via SQLAlchemy)
+    ASSIST_STORE_URL: str = os.getenv("ASSIST_STORE_URL", "sqlite:///assist_cache.db")
+    # Per-entity freshness windows, in seconds. Stale entries are still served
+    # while a background refresh runs.
+    ASSIST_TTL_ACADEMIC_YEARS: int = int(os.getenv("ASSIST_TTL_ACADEMIC_YEARS", 24 * 3600))
+    ASSIST_TTL_INSTITUTIONS: int = int(os.getenv("ASSIST_TTL_INSTITUTIONS", 7 * 24 * 3600))
+    ASSIST_TTL_MAJORS: int = int(os.getenv("ASSIST_TTL_MAJORS", 3 * 24 * 3600))
+    ASSIST_TTL_AGREEMENT: int = int(os.getenv("ASSIST_TTL_AGREEMENT", 7 * 24 * 3600))
+    ASSIST_REFRESH_WORKERS: int = int(os.getenv("ASSIST_REFRESH_WORKERS", 2))
+
+    # Shared assist.org HTTP session
+    ASSIST_COOKIE_PATH: str = os.getenv("ASSIST_COOKIE_PATH", "assist_cookies.json")
+    ASSIST_POOL_MAXSIZE: int = int(os.getenv("ASSIST_POOL_MAXSIZE", 20))
+
+    # Background /transfers/requirements/jobs
+    TRANSFER_JOB_WORKERS: int = int(os.getenv("TRANSFER_JOB_WORKERS", 2))
+    TRANSFER_JOB_MAX_PENDING: int = int(os.getenv("TRANSFER_JOB_MAX_PENDING", 50))
+    TRANSFER_JOB_RETENTION: int = int(os.getenv("TRANSFER_JOB_RETENTION", 200))  # finished jobs kept
+    TRANSFER_JOB_TTL: int = int(os.getenv("TRANSFER_JOB_TTL", 3600))  # seconds a finished job stays readable
+
+    # Bundled articulation data pack (empty: app/data/articulation.pack)
+    DATA_PACK_PATH: str = os.getenv("DATA_PACK_PATH", "")
+
+    # Warm headless Chrome pool for the Selenium scraper
+    CHROMEDRIVER_PATH: str = os.getenv("CHROMEDRIVER_PATH", "")  # empty: resolve once via webdriver-manager
+    SELENIUM_POOL_SIZE: int = int(os.getenv("SELENIUM_POOL_SIZE", 2))
+    SELENIUM_MAX_USES: int = int(os.getenv("SELENIUM_MAX_USES", 25))
+    SELENIUM_MAX_MEMORY_MB: int = int(os.getenv("SELENIUM_MAX_MEMORY_MB", 512))
+    SELENIUM_CHECKOUT_TIMEOUT: int = int(os.getenv("SELENIUM_CHECKOUT_TIMEOUT", 120))
+    SELENIUM_PREWARM: bool = os.getenv("SELENIUM_PREWARM", "false").lower() == "true"
+    # "network": read the agreement JSON the SPA loads via DevTools; "dom": scrape the rendered page
+    SELENIUM_CAPTURE_MODE: str = os.getenv("SELENIUM_CAPTURE_MODE", "network")
+    # "humanized": randomized pauses and typing; "fast": wait only on page readiness
+    SELENIUM_PACING: str = os.getenv("SELENIUM_PACING", "humanized")
+
+    # Perplexity Sonar client (async keep-alive pool)
+    SONAR_MAX_CONNECTIONS: int = int(os.getenv("SONAR_MAX_CONNECTIONS", 20))
+    SONAR_CONNECT_TIMEOUT: float = float(os.getenv("SONAR_CONNECT_TIMEOUT", 10))
+    SONAR_READ_TIMEOUT: float = float(os.getenv("SONAR_READ_TIMEOUT", 30))
+    # Resilience: total seconds per request across retries and hedges, capped attempts with
+    # jittered exponential backoff, and retries limited to a fraction of requests
+    SONAR_REQUEST_BUDGET: float = float(os.getenv("SONAR_REQUEST_BUDGET", 45))
+    SONAR_MAX_ATTEMPTS: int = int(os.getenv("SONAR_MAX_ATTEMPTS", 3))
+    SONAR_RETRY_BASE_DELAY: float = float(os.getenv("SONAR_RETRY_BASE_DELAY", 0.5))
+    SONAR_RETRY_MAX_DELAY: float = float(os.getenv("SONAR_RETRY_MAX_DELAY", 4))
+    SONAR_RETRY_RATIO: float = float(os.getenv("SONAR_RETRY_RATIO", 0.2))
+    # Hedge with a second request once a call outlives this latency percentile (0: never)
+    SONAR_HEDGE_PERCENTILE: float = float(os.getenv("SONAR_HEDGE_PERCENTILE", 95))
+    SONAR_HEDGE_MIN_SAMPLES: int = int(os.getenv("SONAR_HEDGE_MIN_SAMPLES", 20))
+    # Circuit breaker: open after this many consecutive failures, probe again after the reset time
+    SONAR_BREAKER_FAILURES: int = int(os.getenv("SONAR_BREAKER_FAILURES", 5))
+    SONAR_BREAKER_RESET: float = float(os.getenv("SONAR_BREAKER_RESET", 30))
+    # "grounded": send a requirement table resolved from ASSIST; "research": let Sonar look everything up
+    SONAR_PROMPT_MODE: str = os.getenv("SONAR_PROMPT_MODE", "grounded")
+    # Prerequisite chains per origin institution (empty: app/data/prerequisites.json)
+    PREREQUISITES_PATH: str = os.getenv("PREREQUISITES_PATH", "")
+    # "auto": local solver when ASSIST has the requirements, else Sonar; "local"; "sonar"
+    SCHEDULE_PLANNER: str = os.getenv("SCHEDULE_PLANNER", "auto")
+    # /sonar/schedule/batch: generations run at once per batch, and students accepted per batch
+    SCHEDULE_BATCH_CONCURRENCY: int = int(os.getenv("SCHEDULE_BATCH_CONCURRENCY", 4))
+    SCHEDULE_BATCH_MAX_REQUESTS: int = int(os.getenv("SCHEDULE_BATCH_MAX_REQUESTS", 500))
+
+    # Sonar schedule responses: in-memory LRU in front of a SQLite table
+    SONAR_CACHE_URL: str = os.getenv("SONAR_CACHE_URL", "sqlite:///sonar_cache.db")
+    SONAR_CACHE_TTL: int = int(os.getenv("SONAR_CACHE_TTL", 7 * 24 * 3600))
+    SONAR_CACHE_STALE_TTL: int = int(os.getenv("SONAR_CACHE_STALE_TTL", 30 * 24 * 3600))  # expired, kept as a fallback
+    SONAR_CACHE_MEMORY_ENTRIES: int = int(os.getenv("SONAR_CACHE_MEMORY_ENTRIES", 256))
+    SONAR_CACHE_MAX_ENTRIES: int = int(os.getenv("SONAR_CACHE_MAX_ENTRIES", 5000))
+    SONAR_CACHE_MAX_BYTES: int = int(os.getenv("SONAR_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+
+settings = Settings()
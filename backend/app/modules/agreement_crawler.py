@@ -0,0 +1,283 @@
+# backend/app/modules/agreement_crawler.py
+"""
+Bulk ASSIST agreement ingester.
+
+Crawls every major agreement between a set of sending and receiving institutions for one
+academic year into the local reference store, so production requests never pay first-hit
+latency. Run from backend/:
+
+    python -m app.modules.agreement_crawler --sending ccc --receiving uc --year 2024-2025
+    python -m app.modules.agreement_crawler --refresh    # revalidate stale cached agreements
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Set
+
+from app.modules.assist_scraper import (
+    build_agreement_key,
+    fetch_academic_years_api,
+    fetch_agreement_conditional_api,
+    fetch_institutions_api,
+    fetch_majors_api,
+    select_academic_year_id,
+)
+from app.modules.agreement_parser import parse_agreement_response
+from app.modules.assist_store import AssistStore, get_assist_store
+from app.modules.institution_resolver import get_institution_resolver
+
+# Shorthands accepted by --sending / --receiving.
+INSTITUTION_GROUPS = {
+    "ccc": lambda inst: inst.get("is_community_college") or inst["name"].lower().endswith("college"),
+    "uc": lambda inst: inst["name"].lower().startswith("university of california"),
+    "csu": lambda inst: inst["name"].lower().startswith("california state") or "state university" in inst["name"].lower(),
+}
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads."""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CrawlCheckpoint:
+    """Keys already ingested (and keys that failed), flushed to a JSON file for --resume."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.done: Set[str] = set()
+        self.failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._dirty = 0
+        if path and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            self.done = set(saved.get("done", []))
+            self.failed = saved.get("failed", {})
+
+    def mark(self, key: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            if error:
+                self.failed[key] = error
+            else:
+                self.done.add(key)
+                self.failed.pop(key, None)
+            self._dirty += 1
+            if self._dirty >= 25:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._dirty = 0
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"done": sorted(self.done), "failed": self.failed}, f)
+        os.replace(tmp_path, self.path)
+
+
+def select_institutions(institutions: List[Dict[str, Any]], selectors: List[str]) -> List[Dict[str, Any]]:
+    """Expands group names (ccc/uc/csu), numeric ids and institution names into institutions."""
+    by_id = {inst["id"]: inst for inst in institutions}
+    resolver = get_institution_resolver(institutions)
+    selected: Dict[int, Dict[str, Any]] = {}
+    for selector in selectors:
+        group = INSTITUTION_GROUPS.get(selector.lower())
+        if group:
+            selected.update({inst["id"]: inst for inst in institutions if group(inst)})
+        elif selector.isdigit() and int(selector) in by_id:
+            selected[int(selector)] = by_id[int(selector)]
+        else:
+            inst = resolver.resolve(selector)
+            if inst is None:
+                print(f"Skipping unknown institution '{selector}'")
+                continue
+            selected[inst["id"]] = inst
+    return list(selected.values())
+
+
+class AgreementCrawler:
+    """
+    Fetches with a bounded thread pool behind a shared rate limiter and hands the large
+    templateAssets payloads to a process pool for parsing.
+    """
+
+    def __init__(self, store: Optional[AssistStore] = None, concurrency: int = 4, parse_workers: Optional[int] = None,
+                 rate_per_second: float = 2.0, checkpoint_path: Optional[str] = None, report_type: int = 3):
+        self.store = store or get_assist_store()
+        self.concurrency = concurrency
+        self.parse_workers = parse_workers
+        self.limiter = RateLimiter(rate_per_second)
+        self.checkpoint = CrawlCheckpoint(checkpoint_path)
+        self.report_type = report_type
+        self.stats = {"agreements": 0, "unchanged": 0, "skipped": 0, "failed": 0, "bytes": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, field: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[field] += amount
+
+    def _ingest(self, parse_pool: ProcessPoolExecutor, agreement_key: str, referer_url: str,
+                meta: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Fetches one agreement, revalidating against the stored hash/validators (`meta`) if it is
+        already cached; only changed content is decoded, parsed and written back.
+        """
+        self.limiter.wait()
+        fetched = fetch_agreement_conditional_api(None, agreement_key, referer_url, meta)
+        if fetched.status in ("not_modified", "unchanged"):
+            self.store.touch("agreement", agreement_key, fetched.meta)
+            self.checkpoint.mark(agreement_key)
+            self._count("unchanged")
+            return
+        if fetched.status == "error":
+            self.checkpoint.mark(agreement_key, fetched.error)
+            self._count("failed")
+            return
+        template_assets = (fetched.payload.get("result") or {}).get("templateAssets") or ""
+        self._count("bytes", len(template_assets))
+        try:
+            parsed = parse_pool.submit(parse_agreement_response, fetched.payload).result()
+        except Exception as e:
+            parsed = {"data_available": False, "error": f"Parse error: {e}"}
+        if not parsed.get("data_available"):
+            self.checkpoint.mark(agreement_key, parsed.get("error", "No agreement data"))
+            self._count("failed")
+            return
+        self.store.put("agreement", agreement_key, parsed, fetched.meta)
+        self.checkpoint.mark(agreement_key)
+        self._count("agreements")
+
+    def _drain(self, pending: List[Future], started: float) -> Dict[str, Any]:
+        last_report = started
+        for future in as_completed(pending):
+            future.result()
+            now = time.monotonic()
+            if now - last_report >= 10:
+                last_report = now
+                rate = (self.stats["agreements"] + self.stats["unchanged"]) / (now - started)
+                print(f"[crawl] {self.stats['agreements']} ingested, {self.stats['unchanged']} unchanged, "
+                      f"{self.stats['failed']} failed, {self.stats['skipped']} skipped - {rate:.2f} agreements/s")
+
+        self.checkpoint.flush()
+        elapsed = time.monotonic() - started
+        summary = dict(self.stats, seconds=round(elapsed, 1),
+                       agreements_per_second=round(self.stats["agreements"] / elapsed, 2) if elapsed else 0.0)
+        print(f"[crawl] done: {summary}")
+        return summary
+
+    def crawl(self, year_id: int, sending: List[Dict[str, Any]], receiving: List[Dict[str, Any]]) -> Dict[str, Any]:
+        started = time.monotonic()
+        cached = self.store.entry_metas("agreement")
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as parse_pool, \
+                ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="crawl") as fetch_pool:
+            pending: List[Future] = []
+            for send in sending:
+                for recv in receiving:
+                    if send["id"] == recv["id"]:
+                        continue
+                    self.limiter.wait()
+                    majors = fetch_majors_api(None, year_id, send["id"], recv["id"], self.report_type)
+                    if not majors:
+                        continue
+                    self.store.put("majors", f"{year_id}/{send['id']}/{recv['id']}/{self.report_type}", majors)
+                    for major in majors:
+                        agreement_key, referer_url = build_agreement_key(year_id, send["id"], recv["id"], major["key"])
+                        if agreement_key in self.checkpoint.done:
+                            self._count("skipped")
+                            continue
+                        meta = cached[agreement_key][1] if agreement_key in cached else None
+                        pending.append(fetch_pool.submit(self._ingest, parse_pool, agreement_key, referer_url, meta))
+
+            return self._drain(pending, started)
+
+    def refresh(self, stale_only: bool = True) -> Dict[str, Any]:
+        """
+        Revalidates cached agreements. Unchanged ones (304 or same content hash) only get their
+        timestamp bumped; changed ones are re-parsed and replaced.
+        """
+        started = time.monotonic()
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as parse_pool, \
+                ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="refresh") as fetch_pool:
+            pending: List[Future] = []
+            max_age = self.store.ttls.get("agreement", 0)
+            for agreement_key, (fetched_at, meta) in self.store.entry_metas("agreement").items():
+                if stale_only and time.time() - fetched_at < max_age:
+                    self._count("skipped")
+                    continue
+                referer_url = meta.get("referer_url") or referer_for_agreement_key(agreement_key)
+                pending.append(fetch_pool.submit(self._ingest, parse_pool, agreement_key, referer_url, meta))
+            print(f"[refresh] revalidating {len(pending)} cached agreements")
+            return self._drain(pending, started)
+
+
+def referer_for_agreement_key(agreement_key: str) -> str:
+    """Rebuilds the referer for keys stored before referer_url was recorded in entry meta."""
+    year_id, sending_id, _, receiving_id, major_key = agreement_key.split("/", 4)
+    return build_agreement_key(int(year_id), int(sending_id), int(receiving_id), major_key)[1]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-populate the local ASSIST store with major agreements.")
+    parser.add_argument("--sending", nargs="+", help="Sending institutions: names, ids, or ccc/uc/csu")
+    parser.add_argument("--receiving", nargs="+", help="Receiving institutions: names, ids, or ccc/uc/csu")
+    parser.add_argument("--year", default=None, help="Academic year, e.g. 2024-2025 (default: 2024-2025)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent agreement fetches")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--rate", type=float, default=2.0, help="Maximum upstream requests per second")
+    parser.add_argument("--checkpoint", default="crawl_checkpoint.json", help="Checkpoint file used to resume")
+    parser.add_argument("--fresh", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--refresh", action="store_true", help="Revalidate cached agreements instead of crawling")
+    parser.add_argument("--all", action="store_true", help="With --refresh, revalidate fresh entries too")
+    args = parser.parse_args(argv)
+
+    if args.refresh:
+        crawler = AgreementCrawler(concurrency=args.concurrency, parse_workers=args.parse_workers,
+                                   rate_per_second=args.rate)
+        crawler.refresh(stale_only=not args.all)
+        return
+    if not args.sending or not args.receiving:
+        parser.error("--sending and --receiving are required unless --refresh is given")
+
+    if args.fresh and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    academic_years = fetch_academic_years_api()
+    year_id = select_academic_year_id(academic_years, args.year)
+    institutions = fetch_institutions_api()
+    if not year_id or not institutions:
+        raise SystemExit("Could not load academic years or institutions from ASSIST.")
+    store = get_assist_store()
+    store.put("academic_years", "all", academic_years)
+    store.put("institutions", "all", institutions)
+
+    sending = select_institutions(institutions, args.sending)
+    receiving = select_institutions(institutions, args.receiving)
+    print(f"[crawl] year {year_id}: {len(sending)} sending x {len(receiving)} receiving institutions")
+
+    crawler = AgreementCrawler(store=store, concurrency=args.concurrency, parse_workers=args.parse_workers,
+                               rate_per_second=args.rate, checkpoint_path=args.checkpoint)
+    crawler.crawl(year_id, sending, receiving)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# backend/app/modules/agreement_parser.py
+
+import json
+from typing import Any, Dict, List, Tuple, Union
+
+# A section item is either one course code or a set of interchangeable codes.
+SectionItem = Union[str, Dict[str, List[str]]]
+
+
+def agreement_error(error_message: str) -> Dict:
+    return {"error": error_message, "data_available": False, "required_courses": [], "recommended_courses": []}
+
+
+def _course_info(course_data: Dict[str, Any]) -> Dict[str, Any]:
+    code = f"{course_data.get('prefix', '')} {course_data.get('courseNumber', '')}".strip()
+    try: units = float(course_data.get("minUnits", 0.0))
+    except (ValueError, TypeError): units = 0.0
+    return {"code": code, "title": course_data.get("courseTitle", "Unknown Title"), "units": units}
+
+
+def _is_recommended(course_data: Dict[str, Any]) -> bool:
+    for attr in course_data.get("courseAttributes") or ():
+        if isinstance(attr, dict) and "RECOMMENDED" in (attr.get("content") or "").upper():
+            return True
+    return False
+
+
+def _conjunction(node: Dict[str, Any], default: str = "And") -> str:
+    instruction = node.get("instruction") or {}
+    conjunction = instruction.get("conjunction") or node.get("conjunction") or default
+    return "Or" if str(conjunction).lower() == "or" else "And"
+
+
+def parse_template_assets(template_assets: List[Dict[str, Any]]) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """
+    Single pass over RequirementTitle / RequirementGroup -> sections -> rows -> cells.
+    Returns (required_courses, recommended_courses, requirement_groups). Course lists are
+    deduplicated through dict keys in first-seen order; requirement_groups keeps the
+    structure the flat lists lose:
+
+        {"title": ..., "required": bool, "conjunction": "And" | "Or",
+         "sections": [{"courses": ["MATH 1A", {"any_of": ["CS 61A", "CS 88"]}, ...]}]}
+
+    Sections inside a group are combined with the group's conjunction; items inside a
+    section are all required.
+
+    Unlike the nested loop this replaced, which skipped "Series" cells, every course in a
+    series is added to the flat lists, including each side of an "or" series, so courses
+    offered only as a series are not lost. The flat lists therefore over-state an "or": use
+    requirement_groups to tell alternatives apart (course_codes.mark_requirements marks the
+    ones made unnecessary by a completed course; CompletionMatcher.choose_alternatives picks
+    one per choice for planning).
+    """
+    required: Dict[Tuple[str, str, float], Dict[str, Any]] = {}
+    recommended: Dict[Tuple[str, str, float], Dict[str, Any]] = {}
+    groups: List[Dict[str, Any]] = []
+    current_title = ""
+    current_section_is_required = False
+
+    def add_course(course_data: Dict[str, Any]) -> str:
+        info = _course_info(course_data)
+        key = (info["code"], info["title"], info["units"])
+        if _is_recommended(course_data) or not current_section_is_required:
+            recommended.setdefault(key, info)
+        else:
+            required.setdefault(key, info)
+        return info["code"]
+
+    for asset in template_assets:
+        asset_type = asset.get("type")
+        if asset_type == "RequirementTitle":
+            current_title = asset.get("content") or ""
+            content = current_title.upper()
+            current_section_is_required = "REQUIREMENT" in content and "RECOMMENDED" not in content
+        elif asset_type == "RequirementGroup":
+            sections_out: List[Dict[str, List[SectionItem]]] = []
+            for section in asset.get("sections") or ():
+                items: List[SectionItem] = []
+                for row in section.get("rows") or ():
+                    for cell in row.get("cells") or ():
+                        cell_type = cell.get("type")
+                        if cell_type == "Course":
+                            course_data = cell.get("course")
+                            if course_data:
+                                items.append(add_course(course_data))
+                        elif cell_type == "Series":
+                            series = cell.get("series") or {}
+                            codes = [add_course(c) for c in series.get("courses") or () if c]
+                            if not codes:
+                                continue
+                            if _conjunction(series) == "Or" and len(codes) > 1:
+                                items.append({"any_of": codes})
+                            else:
+                                items.extend(codes)
+                if items:
+                    sections_out.append({"courses": items})
+            if sections_out:
+                groups.append({
+                    "title": current_title,
+                    "required": current_section_is_required,
+                    "conjunction": _conjunction(asset),
+                    "sections": sections_out,
+                })
+
+    return list(required.values()), list(recommended.values()), groups
+
+
+def parse_agreement_response(response_data: Dict[str, Any]) -> Dict:
+    """Parses an api/articulation/Agreements response body into required/recommended course lists."""
+    if not response_data.get("isSuccessful") or not response_data.get("result"):
+        error_message = "API reported an unsuccessful operation or missing result for agreement."
+        if response_data.get("validationFailure"): error_message += f" Validation Failure: {response_data['validationFailure']}"
+        print(error_message); return agreement_error(error_message)
+
+    result_data = response_data["result"]
+    template_assets_str = result_data.get("templateAssets")
+    academic_year_str = result_data.get("academicYear")
+    agreement_name = result_data.get("name", "N/A")
+
+    if not template_assets_str or not academic_year_str:
+        error_message = "Missing templateAssets or academicYear in agreement API response."
+        print(error_message); return agreement_error(error_message)
+
+    template_assets = json.loads(template_assets_str)
+    academic_year_code = json.loads(academic_year_str).get("code", "N/A")
+    required_courses, recommended_courses, requirement_groups = parse_template_assets(template_assets)
+
+    print(f"Successfully parsed API data for: {agreement_name} ({academic_year_code})")
+    return {
+        "data_available": True,
+        "required_courses": required_courses,
+        "recommended_courses": recommended_courses,
+        "requirement_groups": requirement_groups,
+        "year": academic_year_code,
+        "agreement_name": agreement_name,
+    }
@@ -0,0 +1,317 @@
+# backend/app/modules/assist_async.py
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.config import settings
+from app.modules.agreement_parser import agreement_error, parse_agreement_response
+from app.modules.assist_scraper import (
+    BROWSER_USER_AGENT,
+    agreement_response_meta,
+    apply_completed_courses,
+    agreement_store_result,
+    build_agreement_key,
+    build_api_transfer_result,
+    format_academic_years,
+    fetch_agreement_conditional_api,
+    format_institutions,
+    get_transfer_courses,
+    is_valid_categories_payload,
+    is_valid_majors_payload,
+    load_persisted_cookies,
+    packed_transfer_result,
+    resolve_institution_pair,
+    save_persisted_cookies,
+    select_academic_year_id,
+    select_major_agreement,
+)
+from app.modules.assist_store import Fetched, get_assist_store
+from app.modules.fingerprints import transfer_fingerprint
+from app.modules.single_flight import get_single_flight
+
+
+class AsyncAssistClient:
+    """
+    asyncio counterpart of RequestsSessionManager + the fetch_*_api functions.
+    One keep-alive httpx pool per event loop; the XSRF token is shared with the sync session
+    through the persisted cookie file and renewed only when the API rejects it (403/419).
+    """
+
+    TOKEN_REJECTED_STATUSES = (403, 419)
+
+    def __init__(self, base_url: str = "https://assist.org/", cookie_path: Optional[str] = None,
+                 max_connections: Optional[int] = None):
+        self.base_url = base_url
+        self.cookie_path = cookie_path if cookie_path is not None else settings.ASSIST_COOKIE_PATH
+        self.max_connections = max_connections or settings.ASSIST_POOL_MAXSIZE
+        self.xsrf_token: Optional[str] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._token_lock: Optional[asyncio.Lock] = None
+        self._closing: set = set()
+
+    # --- Connection and token management ---
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._close_previous_client(loop)
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                timeout=httpx.Timeout(30.0, connect=10.0),
+                follow_redirects=True,
+            )
+            self._client_loop = loop
+            self._token_lock = asyncio.Lock()
+            for c in load_persisted_cookies(self.cookie_path):
+                self._client.cookies.set(c["name"], c["value"], domain=c.get("domain") or "", path=c.get("path") or "/")
+            self.xsrf_token = self._cookie("XSRF-TOKEN")
+        return self._client
+
+    def _close_previous_client(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Closes a pool left by an earlier event loop: on that loop if it still runs, else on this one."""
+        previous, previous_loop = self._client, self._client_loop
+        if previous is None:
+            return
+        self._client = None
+        if previous_loop is not None and previous_loop.is_running() and not previous_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(previous.aclose(), previous_loop)
+            return
+        task = loop.create_task(previous.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def _cookie(self, name: str) -> Optional[str]:
+        for cookie in self._client.cookies.jar:
+            if cookie.name == name:
+                return cookie.value
+        return None
+
+    async def _bootstrap_token(self) -> None:
+        headers = {
+            "User-Agent": BROWSER_USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        }
+        try:
+            response = await self._get_client().get(self.base_url, headers=headers, timeout=20)
+            response.raise_for_status()
+            self.xsrf_token = self._cookie("XSRF-TOKEN")
+            if not self.xsrf_token:
+                print("Warning: XSRF-TOKEN not found in cookies after initial async request.")
+                return
+            save_persisted_cookies(self.cookie_path, [
+                {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+                 "expires": c.expires, "secure": c.secure} for c in self._client.cookies.jar])
+        except httpx.HTTPError as e:
+            print(f"Error initializing async session and XSRF token: {e}")
+            self.xsrf_token = None
+
+    async def _ensure_token(self) -> Optional[str]:
+        self._get_client()
+        if self.xsrf_token is None:
+            async with self._token_lock:
+                if self.xsrf_token is None:
+                    await self._bootstrap_token()
+        return self.xsrf_token
+
+    async def _renew_token(self, rejected_token: Optional[str]) -> None:
+        async with self._token_lock:
+            if rejected_token is None or self.xsrf_token == rejected_token:
+                print("ASSIST rejected the XSRF token; renewing async session cookies...")
+                self._client.cookies.clear()
+                self.xsrf_token = None
+                await self._bootstrap_token()
+
+    def _headers(self, referer_url: Optional[str], extra_headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        headers = {
+            "Accept": "application/json, text/plain, */*",
+            "Accept-Language": "en-US,en;q=0.9",
+            "User-Agent": BROWSER_USER_AGENT,
+            "Content-Type": "application/json",
+            "Referer": referer_url or self.base_url,
+        }
+        if self.xsrf_token:
+            headers["X-XSRF-TOKEN"] = self.xsrf_token
+        headers.update(extra_headers or {})
+        return headers
+
+    async def request(self, method: str, url: str, referer_url: Optional[str] = None,
+                      extra_headers: Optional[Dict[str, str]] = None, timeout: float = 30) -> httpx.Response:
+        """Sends a request with the default API headers, renewing the token once on 403/419."""
+        token = await self._ensure_token()
+        client = self._get_client()
+        response = await client.request(method, url, headers=self._headers(referer_url, extra_headers), timeout=timeout)
+        if response.status_code in self.TOKEN_REJECTED_STATUSES:
+            await self._renew_token(token)
+            response = await client.request(method, url, headers=self._headers(referer_url, extra_headers), timeout=timeout)
+        return response
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    # --- API calls (same return shapes as the fetch_*_api functions) ---
+    async def fetch_academic_years(self) -> List[Dict[str, Any]]:
+        try:
+            response = await self.request("GET", f"{self.base_url}api/AcademicYears", timeout=20)
+            response.raise_for_status()
+            return format_academic_years(response.json())
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            print(f"Error fetching academic years (async): {e}")
+            return []
+
+    async def fetch_institutions(self) -> List[Dict[str, Any]]:
+        try:
+            response = await self.request("GET", f"{self.base_url}api/institutions", timeout=30)
+            response.raise_for_status()
+            return format_institutions(response.json())
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            print(f"Error fetching institutions (async): {e}")
+            return []
+
+    async def fetch_agreement_categories(self, year_id: int, sending_id: int, receiving_id: int) -> List[Dict[str, Any]]:
+        api_url = f"{self.base_url}api/agreements/categories?academicYearId={year_id}&sendingInstitutionId={sending_id}&receivingInstitutionId={receiving_id}"
+        referer = f"{self.base_url}transfer/results?year={year_id}&institution={sending_id}&agreement={receiving_id}&agreementType=to"
+        try:
+            response = await self.request("GET", api_url, referer_url=referer, timeout=20)
+            response.raise_for_status()
+            categories = response.json()
+            return categories if is_valid_categories_payload(categories) else []
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            print(f"Error fetching agreement categories (async): {e}")
+            return []
+
+    async def fetch_majors(self, yr_id: int, send_id: int, recv_id: int, report_type: int = 3) -> List[Dict[str, Any]]:
+        api_url = f"{self.base_url}api/agreements?academicYearId={yr_id}&sendingInstitutionId={send_id}&receivingInstitutionId={recv_id}&reportType={report_type}"
+        ref = f"{self.base_url}transfer/results?year={yr_id}&institution={send_id}&agreement={recv_id}&agreementType=to&view=agreement&viewBy=major"
+        try:
+            response = await self.request("GET", api_url, referer_url=ref,
+                                          extra_headers={"Origin": "https://assist.org"}, timeout=20)
+            response.raise_for_status()
+            majors_data = response.json()
+            return majors_data if is_valid_majors_payload(majors_data) else []
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            print(f"Error fetching major agreements (async): {e}")
+            return []
+
+    async def fetch_agreement_data(self, agreement_key: str, referer_url: str) -> Dict:
+        result = await self.fetch_agreement_record(agreement_key, referer_url)
+        return result.payload if isinstance(result, Fetched) else result
+
+    async def fetch_agreement_record(self, agreement_key: str, referer_url: str) -> Any:
+        """Parsed agreement wrapped in Fetched with its content hash and validators, or an error dict."""
+        try:
+            response = await self.request("GET", f"{self.base_url}api/articulation/Agreements?Key={agreement_key}",
+                                          referer_url=referer_url, timeout=30)
+            response.raise_for_status()
+            meta = agreement_response_meta(response.content, response.headers, referer_url)
+            return Fetched(parse_agreement_response(response.json()), meta)
+        except httpx.HTTPStatusError as e:
+            error_message = f"HTTP error: {e} - {e.response.text[:200]}"
+        except httpx.HTTPError as e:
+            error_message = f"Request error: {e}"
+        except json.JSONDecodeError as e:
+            error_message = f"JSON decode error: {e}"
+        print(error_message)
+        return agreement_error(error_message)
+
+
+_client: Optional[AsyncAssistClient] = None
+
+
+def get_async_assist_client() -> AsyncAssistClient:
+    """Returns the process-wide async ASSIST client."""
+    global _client
+    if _client is None:
+        _client = AsyncAssistClient()
+    return _client
+
+
+async def get_transfer_courses_async(source_institution_name: str, target_institution_name: str, major_name_input: str,
+                                     completed_courses: Optional[List[str]] = None,
+                                     target_quarter: Optional[str] = None,
+                                     target_academic_year_str: Optional[str] = None,
+                                     use_selenium: bool = False,
+                                     true_data_only: bool = False,
+                                     run_selenium_headless: bool = True) -> Dict:
+    """
+    Non-blocking get_transfer_courses. The API path awaits the async client (years and
+    institutions in parallel); the Selenium paths run in a worker thread.
+
+    Concurrent lookups of the same pathway (normalized source, target, major, year and mode)
+    share one upstream call; each caller's completed courses are applied to the shared result.
+    """
+    mode = "selenium" if (true_data_only or use_selenium) else "api"
+    key = transfer_fingerprint(source_institution_name, target_institution_name, major_name_input,
+                               target_academic_year_str, mode)
+    result = await get_single_flight("transfers").do(key, lambda: _lookup_transfer_courses(
+        source_institution_name, target_institution_name, major_name_input, target_academic_year_str,
+        use_selenium, true_data_only, run_selenium_headless))
+    result = apply_completed_courses(result, completed_courses, target_quarter)
+    # the shared result carries the first caller's spelling of the institutions
+    for field, name in (("origin_institution", source_institution_name), ("target_institution", target_institution_name)):
+        if field in result:
+            result[field] = name
+    return result
+
+
+async def _lookup_transfer_courses(source_institution_name: str, target_institution_name: str, major_name_input: str,
+                                   target_academic_year_str: Optional[str], use_selenium: bool,
+                                   true_data_only: bool, run_selenium_headless: bool) -> Dict:
+    """One pathway lookup with no completed courses applied (every requirement "remaining")."""
+    completed_courses, target_quarter = None, None
+    if true_data_only or use_selenium:
+        return await asyncio.to_thread(
+            get_transfer_courses, source_institution_name, target_institution_name, major_name_input,
+            completed_courses, target_quarter, target_academic_year_str, use_selenium, true_data_only,
+            run_selenium_headless)
+
+    packed = packed_transfer_result(source_institution_name, target_institution_name, major_name_input,
+                                    completed_courses, target_quarter, target_academic_year_str)
+    if packed is not None:
+        return packed
+
+    client = get_async_assist_client()
+    store = get_assist_store()
+    academic_years, institutions = await asyncio.gather(
+        store.aget_or_fetch("academic_years", "all", client.fetch_academic_years),
+        store.aget_or_fetch("institutions", "all", client.fetch_institutions),
+    )
+    if not academic_years:
+        return {"error": "Failed to fetch academic years via API.", "requirements": []}
+    year_id = select_academic_year_id(academic_years, target_academic_year_str)
+    if not year_id:
+        return {"error": "Could not determine academic year for API.", "requirements": []}
+    if not institutions:
+        return {"error": "Failed to fetch institutions via API.", "requirements": []}
+    institution_ids, error_result = resolve_institution_pair(institutions, source_institution_name, target_institution_name)
+    if error_result:
+        return error_result
+    source_id, target_id = institution_ids
+
+    majors = await store.aget_or_fetch(
+        "majors", f"{year_id}/{source_id}/{target_id}/3",
+        lambda: client.fetch_majors(year_id, source_id, target_id, 3))
+    if not majors:
+        err_msg = f"API: No major agreements found for Inst {source_id} to {target_id}, Year {year_id}."
+        return {"error": err_msg, "requirements": []}
+    major_match, error_result = select_major_agreement(year_id, source_id, target_id, majors, major_name_input)
+    if error_result:
+        return error_result
+
+    agreement_key, referer_url = build_agreement_key(year_id, source_id, target_id, major_match["key"])
+    api_result = await store.aget_or_fetch(
+        "agreement", agreement_key,
+        lambda: client.fetch_agreement_record(agreement_key, referer_url),
+        is_valid=lambda result: bool(result.get("data_available")),
+        refresher=lambda entry: agreement_store_result(
+            fetch_agreement_conditional_api(None, agreement_key, referer_url, entry.meta)))
+    return build_api_transfer_result(api_result, major_match["name"] or major_name_input, source_institution_name,
+                                     target_institution_name, major_name_input, completed_courses, target_quarter)
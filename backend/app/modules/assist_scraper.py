@@ -1,35 +1,89 @@
+import hashlib
+import os
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional, Union, Any
+from typing import Callable, List, Dict, NamedTuple, Optional, Union, Any, Tuple
 import re
 import json
 import time # Keep for general use, but Playwright has its own waits
-import random
 
 # Add Selenium imports
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
-from webdriver_manager.chrome import ChromeDriverManager
+
+from app.config import settings
+from app.modules.agreement_parser import agreement_error, parse_agreement_response
+from app.modules.assist_store import Fetched, Unchanged, get_assist_store
+from app.modules.browser_pool import get_browser_pool, wait_for_response_body
+from app.modules.course_codes import mark_requirements
+from app.modules.data_pack import get_data_pack
+from app.modules.institution_resolver import INSTITUTION_ALIASES, get_institution_resolver
+from app.modules.major_index import MIN_SCORE as MAJOR_MIN_SCORE, get_major_index
+from app.modules.scrape_pacing import StepTimer, get_pacing_policy
 
 # --- Session and XSRF Token Management ---
+BROWSER_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+def load_persisted_cookies(cookie_path: Optional[str]) -> List[Dict[str, Any]]:
+    """Unexpired cookies saved by save_persisted_cookies, or [] if there is no usable file."""
+    if not cookie_path or not os.path.exists(cookie_path):
+        return []
+    try:
+        with open(cookie_path) as f:
+            saved = json.load(f)
+        now = time.time()
+        return [c for c in saved if c.get("name") and "value" in c and not (c.get("expires") and c["expires"] < now)]
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        print(f"Ignoring unreadable cookie file {cookie_path}: {e}")
+        return []
+
+def save_persisted_cookies(cookie_path: Optional[str], cookies: List[Dict[str, Any]]) -> None:
+    if not cookie_path:
+        return
+    try:
+        tmp_path = f"{cookie_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cookies, f)
+        os.replace(tmp_path, cookie_path)
+    except OSError as e:
+        print(f"Could not persist ASSIST cookies to {cookie_path}: {e}")
+
 class RequestsSessionManager:
-    def __init__(self, base_url="https://assist.org/"):
+    """
+    Keep-alive session against assist.org. The XSRF token is bootstrapped lazily on the first
+    request (or restored from the persisted cookie jar) and renewed only when the API rejects it.
+    Safe to share across threads; use get_session_manager() for the process-wide instance.
+    """
+
+    TOKEN_REJECTED_STATUSES = (403, 419)
+
+    def __init__(self, base_url="https://assist.org/", cookie_path: Optional[str] = None,
+                 pool_maxsize: Optional[int] = None):
         self.base_url = base_url
+        self.cookie_path = cookie_path if cookie_path is not None else settings.ASSIST_COOKIE_PATH
         self.session = requests.Session()
+        pool_maxsize = pool_maxsize or settings.ASSIST_POOL_MAXSIZE
+        adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=pool_maxsize, pool_block=False,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                              allowed_methods=frozenset(["GET", "OPTIONS"])))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.xsrf_token: Optional[str] = None
-        self._initialize_session_and_token()
+        self._token_lock = threading.Lock()
+        self._load_cookies()
 
     def _initialize_session_and_token(self):
         """Makes an initial request to the base URL to get cookies, including XSRF-TOKEN."""
         try:
             headers = {
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                "User-Agent": BROWSER_USER_AGENT,
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
                 "Accept-Language": "en-US,en;q=0.9"
             }
@@ -40,10 +94,58 @@ class RequestsSessionManager:
                 print("Warning: XSRF-TOKEN not found in cookies after initial request.")
             else:
                 print(f"Successfully initialized session and XSRF-TOKEN: {self.xsrf_token[:20]}...") # Print first 20 chars
+                self._save_cookies()
         except requests.exceptions.RequestException as e:
             print(f"Error initializing session and XSRF token: {e}")
             self.xsrf_token = None # Ensure it's None if fetching failed
 
+    def _load_cookies(self):
+        """Restores cookies saved by a previous worker so the home-page handshake can be skipped."""
+        for c in load_persisted_cookies(self.cookie_path):
+            self.session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""),
+                                     path=c.get("path", "/"), expires=c.get("expires"),
+                                     secure=c.get("secure", False))
+        self.xsrf_token = self.session.cookies.get("XSRF-TOKEN")
+        if self.xsrf_token:
+            print(f"Restored persisted ASSIST cookies from {self.cookie_path}")
+
+    def _save_cookies(self):
+        save_persisted_cookies(self.cookie_path, [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+             "expires": c.expires, "secure": c.secure} for c in self.session.cookies])
+
+    def ensure_token(self) -> Optional[str]:
+        """Bootstraps the XSRF token if this session has never had one."""
+        if self.xsrf_token is None:
+            with self._token_lock:
+                if self.xsrf_token is None:
+                    self._initialize_session_and_token()
+        return self.xsrf_token
+
+    def renew_token(self, rejected_token: Optional[str] = None) -> Optional[str]:
+        """Re-runs the home-page handshake unless another thread already replaced `rejected_token`."""
+        with self._token_lock:
+            if rejected_token is None or self.xsrf_token == rejected_token:
+                print("ASSIST rejected the XSRF token; renewing session cookies...")
+                self.session.cookies.clear()
+                self.xsrf_token = None
+                self._initialize_session_and_token()
+        return self.xsrf_token
+
+    def request(self, method: str, url: str, referer_url: Optional[str] = None,
+                extra_headers: Optional[Dict[str, str]] = None, **kwargs) -> requests.Response:
+        """Sends a request with the default API headers, renewing the token once on 403/419."""
+        token = self.ensure_token()
+        headers = self.get_default_headers(referer_url=referer_url)
+        headers.update(extra_headers or {})
+        response = self.session.request(method, url, headers=headers, **kwargs)
+        if response.status_code in self.TOKEN_REJECTED_STATUSES:
+            self.renew_token(rejected_token=token)
+            headers = self.get_default_headers(referer_url=referer_url)
+            headers.update(extra_headers or {})
+            response = self.session.request(method, url, headers=headers, **kwargs)
+        return response
+
     def get_xsrf_token(self) -> Optional[str]:
         return self.xsrf_token
 
@@ -54,7 +156,7 @@ class RequestsSessionManager:
         headers = {
             "Accept": "application/json, text/plain, */*",
             "Accept-Language": "en-US,en;q=0.9",
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "User-Agent": BROWSER_USER_AGENT,
             "Content-Type": "application/json"
         }
         if self.xsrf_token:
@@ -65,41 +167,23 @@ class RequestsSessionManager:
             headers["Referer"] = self.base_url # Default referer
         return headers
 
+_session_manager: Optional[RequestsSessionManager] = None
+_session_manager_lock = threading.Lock()
+
+def get_session_manager() -> RequestsSessionManager:
+    """Returns the process-wide pooled ASSIST session."""
+    global _session_manager
+    if _session_manager is None:
+        with _session_manager_lock:
+            if _session_manager is None:
+                _session_manager = RequestsSessionManager()
+    return _session_manager
+
 # --- Normalization Functions (remain unchanged) ---
 def normalize_institution_name(name: str) -> str:
-    """Normalize institution name for search"""
+    """Normalize institution name for search (exact alias lookup; fuzzy matching lives in InstitutionResolver)"""
     name = name.lower().strip()
-    
-    # Common aliases and abbreviations
-    aliases = {
-        "uc berkeley": "university of california, berkeley",
-        "berkeley": "university of california, berkeley",
-        "ucla": "university of california, los angeles",
-        "uc davis": "university of california, davis",
-        "uc irvine": "university of california, irvine",
-        "uci": "university of california, irvine",
-        "uc san diego": "university of california, san diego",
-        "ucsd": "university of california, san diego",
-        "uc santa barbara": "university of california, santa barbara",
-        "ucsb": "university of california, santa barbara",
-        "uc santa cruz": "university of california, santa cruz",
-        "ucsc": "university of california, santa cruz",
-        "uc riverside": "university of california, riverside",
-        "ucr": "university of california, riverside",
-        "uc merced": "university of california, merced",
-        "de anza": "de anza college",
-        "foothill": "foothill college",
-        "san jose city": "san jose city college",
-        "sjcc": "san jose city college",
-        "sjsu": "san jose state university",
-        "san jose state": "san jose state university",
-    }
-    
-    for alias, full_name in aliases.items():
-        if name == alias or name in alias or alias in name:
-            return full_name.lower()
-    
-    return name
+    return INSTITUTION_ALIASES.get(name, name)
 
 def normalize_major_name(name: str) -> str:
     """Normalize major name for search"""
@@ -125,27 +209,58 @@ def normalize_major_name(name: str) -> str:
     
     return name
 
+# --- API Payload Parsing (shared by the sync and async clients) ---
+def format_academic_years(years_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    formatted_years = []
+    for year_entry in years_data:
+        year_id = year_entry.get("Id")
+        fall_year = year_entry.get("FallYear")
+        if year_id is not None and fall_year is not None:
+            # Constructing name like "2024-2025" from FallYear 2024
+            display_name = f"{fall_year}-{fall_year + 1}"
+            formatted_years.append({"id": year_id, "name": display_name, "code": display_name, "fall_year": fall_year})
+    return formatted_years
+
+def format_institutions(institutions_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    formatted_institutions = []
+    for inst_entry in institutions_data:
+        inst_id = inst_entry.get("id")
+        # Prioritize names without 'fromYear', then latest 'fromYear', then first name.
+        primary_name = "Unknown Institution"
+        if inst_entry.get("names"):
+            sorted_names = sorted([n for n in inst_entry["names"] if isinstance(n, dict) and n.get("name")], 
+                                  key=lambda x: x.get("fromYear", 0), reverse=True)
+            if sorted_names:
+                primary_name = sorted_names[0]["name"]
+        
+        if inst_id is not None:
+            formatted_institutions.append({
+                "id": inst_id, 
+                "name": primary_name, 
+                "all_names": [n.get("name") for n in inst_entry.get("names", []) if isinstance(n, dict) and n.get("name")],
+                "code": inst_entry.get("code", "").strip(),
+                "is_community_college": bool(inst_entry.get("isCommunityCollege"))
+            })
+    return formatted_institutions
+
+def is_valid_categories_payload(categories: Any) -> bool:
+    # Ensure it's a list and items are dicts with 'code' and 'label'
+    return isinstance(categories, list) and all(isinstance(item, dict) and 'code' in item and 'label' in item for item in categories)
+
+def is_valid_majors_payload(majors_data: Any) -> bool:
+    return isinstance(majors_data, list) and all(isinstance(i, dict) and 'name' in i and 'key' in i for i in majors_data)
+
 # --- API Fetching Functions ---
-def fetch_academic_years_api(session_manager: RequestsSessionManager) -> List[Dict[str, Any]]:
+def fetch_academic_years_api(session_manager: Optional[RequestsSessionManager] = None) -> List[Dict[str, Any]]:
     """Fetches available academic years from the assist.org API."""
     print("Fetching academic years from API...")
+    session_manager = session_manager or get_session_manager()
     api_url = f"{session_manager.base_url}api/AcademicYears"
-    headers = session_manager.get_default_headers()
     
     try:
-        session = session_manager.get_session()
-        response = session.get(api_url, headers=headers, timeout=20)
+        response = session_manager.request("GET", api_url, timeout=20)
         response.raise_for_status()
-        years_data = response.json()
-        
-        formatted_years = []
-        for year_entry in years_data:
-            year_id = year_entry.get("Id")
-            fall_year = year_entry.get("FallYear")
-            if year_id is not None and fall_year is not None:
-                # Constructing name like "2024-2025" from FallYear 2024
-                display_name = f"{fall_year}-{fall_year + 1}"
-                formatted_years.append({"id": year_id, "name": display_name, "code": display_name, "fall_year": fall_year})
+        formatted_years = format_academic_years(response.json())
         print(f"Successfully fetched {len(formatted_years)} academic years.")
         return formatted_years
     except requests.exceptions.RequestException as e:
@@ -154,54 +269,33 @@ def fetch_academic_years_api(session_manager: RequestsSessionManager) -> List[Di
         print(f"Error decoding JSON for academic years: {e}")
     return []
 
-def fetch_institutions_api(session_manager: RequestsSessionManager) -> List[Dict[str, Any]]:
+def fetch_institutions_api(session_manager: Optional[RequestsSessionManager] = None) -> List[Dict[str, Any]]:
     """Fetches institutions from the assist.org API."""
     print("Fetching institutions from API...")
+    session_manager = session_manager or get_session_manager()
     api_url = f"{session_manager.base_url}api/institutions"
-    headers = session_manager.get_default_headers()
     try:
-        session = session_manager.get_session()
-        response = session.get(api_url, headers=headers, timeout=30)
+        response = session_manager.request("GET", api_url, timeout=30)
         response.raise_for_status()
-        institutions_data = response.json()
-        formatted_institutions = []
-        for inst_entry in institutions_data:
-            inst_id = inst_entry.get("id")
-            # Prioritize names without 'fromYear', then latest 'fromYear', then first name.
-            primary_name = "Unknown Institution"
-            if inst_entry.get("names"):
-                sorted_names = sorted([n for n in inst_entry["names"] if isinstance(n, dict) and n.get("name")], 
-                                      key=lambda x: x.get("fromYear", 0), reverse=True)
-                if sorted_names:
-                    primary_name = sorted_names[0]["name"]
-            
-            if inst_id is not None:
-                formatted_institutions.append({
-                    "id": inst_id, 
-                    "name": primary_name, 
-                    "all_names": [n.get("name") for n in inst_entry.get("names", []) if isinstance(n, dict) and n.get("name")],
-                    "code": inst_entry.get("code", "").strip()
-                })
+        formatted_institutions = format_institutions(response.json())
         print(f"Successfully fetched {len(formatted_institutions)} institutions.")
         return formatted_institutions
     except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
         print(f"Error fetching/decoding institutions: {e}"); return []
 
-def fetch_agreement_categories_api(session_manager: RequestsSessionManager, year_id: int, sending_id: int, receiving_id: int) -> List[Dict[str, Any]]:
+def fetch_agreement_categories_api(session_manager: Optional[RequestsSessionManager], year_id: int, sending_id: int, receiving_id: int) -> List[Dict[str, Any]]:
     """Fetches agreement categories (like Major, Department) for a given pair of institutions and year."""
     print(f"Fetching agreement categories for year {year_id}, sending {sending_id}, receiving {receiving_id}...")
+    session_manager = session_manager or get_session_manager()
     api_url = f"{session_manager.base_url}api/agreements/categories?academicYearId={year_id}&sendingInstitutionId={sending_id}&receivingInstitutionId={receiving_id}"
     # Referer for this specific type of call might be just the base, or the selection page if it matters
     # For now, using a generic referer that led to agreement selections
     referer = f"{session_manager.base_url}transfer/results?year={year_id}&institution={sending_id}&agreement={receiving_id}&agreementType=to"
-    headers = session_manager.get_default_headers(referer_url=referer)
     try:
-        session = session_manager.get_session()
-        response = session.get(api_url, headers=headers, timeout=20)
+        response = session_manager.request("GET", api_url, referer_url=referer, timeout=20)
         response.raise_for_status()
         categories = response.json() # Expecting a list directly
-        # Ensure it's a list and items are dicts with 'code' and 'label'
-        if isinstance(categories, list) and all(isinstance(item, dict) and 'code' in item and 'label' in item for item in categories):
+        if is_valid_categories_payload(categories):
             print(f"Successfully fetched {len(categories)} agreement categories.")
             return categories
         else:
@@ -210,96 +304,98 @@ def fetch_agreement_categories_api(session_manager: RequestsSessionManager, year
     except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
         print(f"Error fetching/decoding agreement categories: {e}"); return []
 
-def fetch_agreement_data_api(session_manager: RequestsSessionManager, agreement_key: str, referer_url: str) -> Dict:
-    """Fetches and parses a specific agreement data from the assist.org API."""
-    print(f"Fetching agreement data from API for key: {agreement_key}")
-    api_url = f"{session_manager.base_url}api/articulation/Agreements?Key={agreement_key}"
-    headers = session_manager.get_default_headers(referer_url=referer_url)
+class AgreementFetch(NamedTuple):
+    status: str  # "changed", "not_modified" (HTTP 304), "unchanged" (same content hash) or "error"
+    payload: Optional[Dict[str, Any]]
+    meta: Dict[str, Any]
+    error: Optional[str] = None
+
+def agreement_conditional_headers(meta: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since from validators recorded on a previous fetch."""
+    headers = {}
+    if meta and meta.get("etag"): headers["If-None-Match"] = meta["etag"]
+    if meta and meta.get("last_modified"): headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+def agreement_response_meta(content: bytes, response_headers: Any, referer_url: str) -> Dict[str, Any]:
+    """Content hash of the raw body plus any validators the server sent."""
+    return {
+        "content_hash": hashlib.sha256(content).hexdigest(),
+        "etag": response_headers.get("ETag"),
+        "last_modified": response_headers.get("Last-Modified"),
+        "referer_url": referer_url,
+    }
 
+def fetch_agreement_conditional_api(session_manager: Optional[RequestsSessionManager], agreement_key: str, referer_url: str,
+                                    meta: Optional[Dict[str, Any]] = None) -> AgreementFetch:
+    """
+    Fetches api/articulation/Agreements, revalidating against `meta` from a previous fetch.
+    The body is only JSON-decoded when the server returns new content whose hash differs.
+    """
+    session_manager = session_manager or get_session_manager()
+    api_url = f"{session_manager.base_url}api/articulation/Agreements?Key={agreement_key}"
+    meta = meta or {}
+    response = None
     try:
-        session = session_manager.get_session()
-        response = session.get(api_url, headers=headers, timeout=30)
+        response = session_manager.request("GET", api_url, referer_url=referer_url,
+                                           extra_headers=agreement_conditional_headers(meta), timeout=30)
+        if response.status_code == 304:
+            validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+            return AgreementFetch("not_modified", None, dict(meta, **{k: v for k, v in validators.items() if v}))
         response.raise_for_status()
-        response_data = response.json()
-
-        if not response_data.get("isSuccessful") or not response_data.get("result"):
-            error_message = "API reported an unsuccessful operation or missing result for agreement."
-            if response_data.get("validationFailure"): error_message += f" Validation Failure: {response_data['validationFailure']}"
-            print(error_message); return {"error": error_message, "data_available": False, "required_courses": [], "recommended_courses": []}
-
-        result_data = response_data["result"]
-        template_assets_str = result_data.get("templateAssets")
-        academic_year_str = result_data.get("academicYear")
-        agreement_name = result_data.get("name", "N/A")
-
-        if not template_assets_str or not academic_year_str:
-            error_message = "Missing templateAssets or academicYear in agreement API response."
-            print(error_message); return {"error": error_message, "data_available": False, "required_courses": [], "recommended_courses": []}
-
-        template_assets = json.loads(template_assets_str)
-        academic_year_info = json.loads(academic_year_str)
-        academic_year_code = academic_year_info.get("code", "N/A")
-
-        required_courses, recommended_courses = [], []
-        current_section_is_required = False
-
-        for asset in template_assets:
-            asset_type = asset.get("type"); content = asset.get("content", "").upper()
-            if asset_type == "RequirementTitle":
-                current_section_is_required = "REQUIREMENT" in content and "RECOMMENDED" not in content
-            elif asset_type == "RequirementGroup":
-                for section in asset.get("sections", []):
-                    for row in section.get("rows", []):
-                        for cell in row.get("cells", []):
-                            if cell.get("type") == "Course":
-                                course_data = cell.get("course")
-                                if not course_data: continue
-                                code = f"{course_data.get('prefix', '')} {course_data.get('courseNumber', '')}".strip()
-                                title = course_data.get("courseTitle", "Unknown Title")
-                                try: units = float(course_data.get("minUnits", 0.0))
-                                except (ValueError, TypeError): units = 0.0
-                                course_info = {'code': code, 'title': title, 'units': units}
-                                is_recommended_attr = any("RECOMMENDED" in attr.get("content", "").upper() for attr in course_data.get("courseAttributes", []) if isinstance(attr, dict))
-                                if is_recommended_attr:
-                                    if course_info not in recommended_courses: recommended_courses.append(course_info)
-                                elif current_section_is_required:
-                                    if course_info not in required_courses: required_courses.append(course_info)
-                                else:
-                                    if course_info not in recommended_courses: recommended_courses.append(course_info)
-        
-        print(f"Successfully parsed API data for: {agreement_name} ({academic_year_code})")
-        return {"data_available": True, "required_courses": required_courses, "recommended_courses": recommended_courses, "year": academic_year_code, "agreement_name": agreement_name}
-
+        new_meta = agreement_response_meta(response.content, response.headers, referer_url)
+        if meta.get("content_hash") == new_meta["content_hash"]:
+            return AgreementFetch("unchanged", None, new_meta)
+        return AgreementFetch("changed", response.json(), new_meta)
     except requests.exceptions.HTTPError as http_err:
-        error_message = f"HTTP error: {http_err} - {response.status_code if 'response' in locals() and response else 'N/A'} {response.text if 'response' in locals() and response else 'No response text'}"
+        error_message = f"HTTP error: {http_err} - {response.status_code if response is not None else 'N/A'} {response.text if response is not None else 'No response text'}"
     except requests.exceptions.RequestException as e: error_message = f"Request error: {e}"
     except json.JSONDecodeError as e: error_message = f"JSON decode error: {e}"
-    except Exception as e: error_message = f"Unexpected error in fetch_agreement_data: {e}"
-    print(error_message); return {"error": error_message, "data_available": False, "required_courses": [], "recommended_courses": []}
+    return AgreementFetch("error", None, meta, error_message)
+
+def fetch_agreement_payload_api(session_manager: Optional[RequestsSessionManager], agreement_key: str, referer_url: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Fetches the raw api/articulation/Agreements body. Returns (payload, None) or (None, error_message)."""
+    fetched = fetch_agreement_conditional_api(session_manager, agreement_key, referer_url)
+    return fetched.payload, fetched.error
+
+def agreement_store_result(fetched: AgreementFetch) -> Any:
+    """Maps an AgreementFetch to what AssistStore expects: Unchanged, Fetched(parsed, meta) or an error dict."""
+    if fetched.status in ("not_modified", "unchanged"):
+        return Unchanged(fetched.meta)
+    error_message = fetched.error
+    if fetched.status == "changed":
+        try:
+            return Fetched(parse_agreement_response(fetched.payload), fetched.meta)
+        except json.JSONDecodeError as e: error_message = f"JSON decode error: {e}"
+        except Exception as e: error_message = f"Unexpected error in fetch_agreement_data: {e}"
+    print(error_message); return agreement_error(error_message)
+
+def fetch_agreement_data_api(session_manager: Optional[RequestsSessionManager], agreement_key: str, referer_url: str) -> Dict:
+    """Fetches and parses a specific agreement data from the assist.org API."""
+    print(f"Fetching agreement data from API for key: {agreement_key}")
+    response_data, error_message = fetch_agreement_payload_api(session_manager, agreement_key, referer_url)
+    if response_data is not None:
+        try:
+            return parse_agreement_response(response_data)
+        except json.JSONDecodeError as e: error_message = f"JSON decode error: {e}"
+        except Exception as e: error_message = f"Unexpected error in fetch_agreement_data: {e}"
+    print(error_message); return agreement_error(error_message)
 
-def fetch_majors_api(sm: RequestsSessionManager, yr_id: int, send_id: int, recv_id: int, report_type: int = 3) -> List[Dict[str, Any]]:
+def fetch_majors_api(sm: Optional[RequestsSessionManager], yr_id: int, send_id: int, recv_id: int, report_type: int = 3) -> List[Dict[str, Any]]:
     """Fetches list of major agreements between two institutions for a given year and report type."""
     print(f"Fetching major agreements (reportType {report_type}) for yr {yr_id}, send {send_id}, recv {recv_id}...")
+    sm = sm or get_session_manager()
     api_url = f"{sm.base_url}api/agreements?academicYearId={yr_id}&sendingInstitutionId={send_id}&receivingInstitutionId={recv_id}&reportType={report_type}"
     
     # Try a more detailed Referer URL that looks like the one from a browser session
     ref = f"{sm.base_url}transfer/results?year={yr_id}&institution={send_id}&agreement={recv_id}&agreementType=to&view=agreement&viewBy=major"
     
-    # Start with default headers
-    headers = sm.get_default_headers(referer_url=ref)
-    
-    # Add Origin header - this is often needed for CORS requests
-    headers["Origin"] = "https://assist.org"
-    
-    # Explicitly add Cookie header with the XSRF-TOKEN (sometimes helps)
-    if sm.get_xsrf_token():
-        headers["Cookie"] = f"XSRF-TOKEN={sm.get_xsrf_token()}"
+    # Add Origin header - this is often needed for CORS requests.
+    # The XSRF-TOKEN cookie itself comes from the pooled session's cookie jar.
+    extra_headers = {"Origin": "https://assist.org"}
     
     print("----- fetch_majors_api REQUEST DETAILS -----")
     print(f"URL: {api_url}")
-    print("Headers Sent:")
-    for k_header, v_header in headers.items():
-        print(f"  {k_header}: {v_header}")
     print("Cookies in Session (before call):")
     current_cookies = sm.get_session().cookies
     if current_cookies:
@@ -311,13 +407,13 @@ def fetch_majors_api(sm: RequestsSessionManager, yr_id: int, send_id: int, recv_
 
     try:
         # Make an OPTIONS request first (like browsers do for CORS)
-        options_resp = sm.get_session().options(api_url, headers=headers)
+        options_resp = sm.request("OPTIONS", api_url, referer_url=ref, extra_headers=extra_headers, timeout=20)
         print(f"OPTIONS request status: {options_resp.status_code}")
         
         # Then make the actual GET request
-        resp = sm.get_session().get(api_url, headers=headers, timeout=20)
+        resp = sm.request("GET", api_url, referer_url=ref, extra_headers=extra_headers, timeout=20)
         resp.raise_for_status(); majors_data = resp.json()
-        if isinstance(majors_data, list) and all(isinstance(i, dict) and 'name' in i and 'key' in i for i in majors_data):
+        if is_valid_majors_payload(majors_data):
             print(f"Fetched {len(majors_data)} major agreements."); return majors_data
         print("Major agreements data format unexpected."); return []
     except (requests.exceptions.RequestException, json.JSONDecodeError) as e: 
@@ -327,33 +423,87 @@ def fetch_majors_api(sm: RequestsSessionManager, yr_id: int, send_id: int, recv_
         print(f"Err major agreements: {error_detail}"); 
         return []
 
+# --- Cached lookups (local reference store) ---
+def get_academic_years_cached() -> List[Dict[str, Any]]:
+    """Academic years from the local store, fetched from the API only on a miss or when stale."""
+    return get_assist_store().get_or_fetch("academic_years", "all", fetch_academic_years_api)
+
+def get_institutions_cached() -> List[Dict[str, Any]]:
+    """Institution list from the local store."""
+    return get_assist_store().get_or_fetch("institutions", "all", fetch_institutions_api)
+
+def get_majors_cached(yr_id: int, send_id: int, recv_id: int, report_type: int = 3) -> List[Dict[str, Any]]:
+    """Major agreement list for an institution pair from the local store."""
+    return get_assist_store().get_or_fetch(
+        "majors", f"{yr_id}/{send_id}/{recv_id}/{report_type}",
+        lambda: fetch_majors_api(None, yr_id, send_id, recv_id, report_type))
+
+def get_agreement_cached(agreement_key: str, referer_url: str) -> Dict:
+    """
+    Parsed agreement from the local store. Failed fetches are returned but not stored.
+    Stale entries are revalidated with a conditional request and re-parsed only if changed.
+    """
+    return get_assist_store().get_or_fetch(
+        "agreement", agreement_key,
+        lambda: agreement_store_result(fetch_agreement_conditional_api(None, agreement_key, referer_url)),
+        is_valid=lambda result: bool(result.get("data_available")),
+        refresher=lambda entry: agreement_store_result(
+            fetch_agreement_conditional_api(None, agreement_key, referer_url, entry.meta)))
+
+def selenium_result_from_agreement(parsed_agreement: Dict, source_institution_name: str, target_institution_name: str,
+                                   major_name_input: str, completed_courses: Optional[List[str]] = None) -> Dict:
+    """Builds the Selenium result shape from an agreement captured off the network and parsed by agreement_parser."""
+    final_requirements = []
+    for section, courses in (("Required", parsed_agreement.get("required_courses", [])),
+                             ("Recommended", parsed_agreement.get("recommended_courses", []))):
+        for course in courses:
+            final_requirements.append({"code": course.get('code'), "title": course.get('title'),
+                                       "units": course.get('units'), "section": section})
+    final_requirements = mark_requirements(final_requirements, completed_courses,
+                                           parsed_agreement.get("requirement_groups"))
+    return {
+        "origin_institution": source_institution_name, "target_institution": target_institution_name,
+        "target_major": parsed_agreement.get("agreement_name") or major_name_input,
+        "requirements": final_requirements, "requirement_groups": parsed_agreement.get("requirement_groups", []),
+        "api_year_information": parsed_agreement.get("year", "N/A"), "scraper_method": "Selenium - Network Capture"
+    }
+
 def humanized_scrape_with_selenium(source_institution_name: str, 
                                   target_institution_name: str, 
                                   major_name_input: str, 
                                   completed_courses: Optional[List[str]] = None,
-                                  run_headless: bool = False) -> Dict:
+                                  run_headless: bool = False,
+                                  capture_mode: Optional[str] = None,
+                                  pacing: Optional[str] = None,
+                                  progress: Optional[Callable[[str], None]] = None) -> Dict:
     """
     Scrapes ASSIST.org using Selenium with a more direct approach based on homepage structure.
+
+    capture_mode "network" (default: settings.SELENIUM_CAPTURE_MODE) returns as soon as the SPA's
+    api/articulation/Agreements response is seen in the DevTools log, parsed like the API path;
+    the DOM walk below only runs in "dom" mode or if nothing was captured.
+
+    pacing "humanized" or "fast" (default: settings.SELENIUM_PACING) picks the PacingPolicy; every
+    result carries per-step wall-clock timings under "timings". `progress` is called with each
+    step name as it starts.
     """
-    print(f"Starting DIRECT Selenium scraper for {source_institution_name} to {target_institution_name} for {major_name_input} (Headless: {run_headless})")
-    
-    options = Options()
-    if run_headless:
-        options.add_argument("--headless")
-    options.add_argument("--window-size=1366,768")
-    options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/99.0.4844.84 Safari/537.36")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
+    capture_mode = capture_mode or settings.SELENIUM_CAPTURE_MODE
+    policy = get_pacing_policy(pacing)
+    timer = StepTimer(on_step=progress)
+    print(f"Starting DIRECT Selenium scraper for {source_institution_name} to {target_institution_name} for {major_name_input} (Headless: {run_headless}, capture: {capture_mode}, pacing: {policy.name})")
     
+    pool = get_browser_pool()
     driver = None
+    driver_healthy = True
     try:
-        print("Initializing Chrome driver...")
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        # Headless scrapes borrow a warm browser from the pool (waiting if all are busy);
+        # headed runs are for debugging and get their own browser.
+        print("Checking out Chrome driver...")
+        timer.begin("browser_checkout")
+        driver = pool.acquire(dedicated=not run_headless)
         
         def random_delay(min_seconds=0.3, max_seconds=1.0):
-            time.sleep(random.uniform(min_seconds, max_seconds))
+            policy.settle(driver, min_seconds, max_seconds)
         
         def robust_click(locator, wait_time=15):
             try:
@@ -377,9 +527,7 @@ def humanized_scrape_with_selenium(source_institution_name: str,
                 input_field.click() # Focus the field
                 random_delay(0.1, 0.3)
                 input_field.clear()
-                for char in text_to_type:
-                    input_field.send_keys(char)
-                    time.sleep(random.uniform(0.03, 0.08))
+                policy.type_text(input_field, text_to_type)
                 random_delay(0.5, 1.0) # Wait for suggestions to load
                 
                 # Wait for the suggestion list to appear and have at least one item
@@ -401,11 +549,13 @@ def humanized_scrape_with_selenium(source_institution_name: str,
 
         # --- Direct Scraper Logic --- 
         print("Navigating to ASSIST.org...")
+        timer.begin("navigate")
         driver.get("https://assist.org/")
         random_delay(1.0, 1.5)
 
         # 1. Academic Year
         print("Selecting Academic Year...")
+        timer.begin("year_select")
         try:
             # The academic year dropdown seems to be the first one with a common structure
             academic_year_dropdown_locator = (By.XPATH, "(//label[contains(text(), 'Academic Year')]/following-sibling::div//select)[1]")
@@ -444,6 +594,7 @@ def humanized_scrape_with_selenium(source_institution_name: str,
         # Based on typical Assist.org structure and previous attempts, ID might be "sendingInstitution"
         # Or, visually, it's the input under the label "Institution"
         print(f"Selecting Sending Institution: {source_institution_name}")
+        timer.begin("sending_institution_typeahead")
         try:
             # Locator for the input field itself
             sending_institution_input_locator = (By.ID, "institution-select") # Check actual ID on site
@@ -458,6 +609,7 @@ def humanized_scrape_with_selenium(source_institution_name: str,
 
         # 3. Receiving Institution ("Agreements with Other Institutions" on the left card)
         print(f"Selecting Receiving Institution: {target_institution_name}")
+        timer.begin("receiving_institution_typeahead")
         try:
             receiving_institution_input_locator = (By.ID, "agreement-select") # Check actual ID
             receiving_suggestion_list_item_locator = (By.CSS_SELECTOR, "#agreement-select-suggestions .list-group-item") # Check actual suggestion list
@@ -470,6 +622,7 @@ def humanized_scrape_with_selenium(source_institution_name: str,
 
         # 4. Click "View Agreements" button
         print("Clicking 'View Agreements' button...")
+        timer.begin("view_agreements")
         try:
             # The button text in the screenshot is "View Agreements"
             view_agreements_button_locator = (By.XPATH, "//button[normalize-space()='View Agreements']")
@@ -483,6 +636,7 @@ def humanized_scrape_with_selenium(source_institution_name: str,
 
         # --- From here, we are on the page listing majors (or similar) ---
         print(f"Searching for major on agreements page: {major_name_input}")
+        timer.begin("major_click")
         norm_major_input = normalize_major_name(major_name_input)
         try:
             # Selector for links that represent a major agreement. This is highly site-dependent.
@@ -518,7 +672,8 @@ def humanized_scrape_with_selenium(source_institution_name: str,
 
             print(f"Clicking selected major link: {selected_major_element.text.strip()}")
             robust_click(selected_major_element) # Pass the element directly
-            random_delay(2.0, 3.5) # Wait for agreement details page
+            if capture_mode != "network":
+                random_delay(2.0, 3.5) # Wait for agreement details page
 
         except Exception as e_major_select:
             detailed_error = f"Error finding/clicking major link for '{major_name_input}': {type(e_major_select).__name__} - {str(e_major_select)}"
@@ -526,8 +681,22 @@ def humanized_scrape_with_selenium(source_institution_name: str,
             if not run_headless and driver: driver.save_screenshot("debug_major_selection_error.png")
             raise
 
+        if capture_mode == "network":
+            print("Waiting for agreement payload on the network...")
+            timer.begin("network_capture")
+            payload = wait_for_response_body(driver, "api/articulation/Agreements", timeout=20)
+            if isinstance(payload, dict):
+                parsed_agreement = parse_agreement_response(payload)
+                if parsed_agreement.get("data_available"):
+                    result = selenium_result_from_agreement(parsed_agreement, source_institution_name, target_institution_name,
+                                                            major_name_input, completed_courses)
+                    result["timings"] = timer.summary()
+                    return result
+            print("No agreement payload captured from the network; falling back to DOM extraction.")
+
         # --- Extract course requirements from the final agreement page ---
         print("Extracting course requirements...")
+        timer.begin("extraction")
         # The structure for course data (code, title, units) is very specific to ASSIST's final agreement page layout.
         # This will require careful inspection of the page if the selectors below fail.
         agreement_name_on_page = driver.title # A simple default
@@ -588,29 +757,26 @@ def humanized_scrape_with_selenium(source_institution_name: str,
         print(f"Extracted {len(all_extracted_courses)} courses.")
         final_requirements = []
         if all_extracted_courses:
-            norm_completed = [c.strip().replace(" ", "").upper() for c in (completed_courses or [])]
-            for course in all_extracted_courses:
-                norm_code = str(course.get('code', '')).replace(" ", "").upper()
-                status = "completed" if norm_code and norm_code in norm_completed else "remaining"
-                final_requirements.append({
-                    "code": course.get('code'), "title": course.get('title'), 
-                    "units": course.get('units'), "status": status,
-                    "section": course.get('section', 'Required')
-                })
+            final_requirements = mark_requirements([{
+                "code": course.get('code'), "title": course.get('title'),
+                "units": course.get('units'), "section": course.get('section', 'Required')
+            } for course in all_extracted_courses], completed_courses)
         
         if not final_requirements:
             error_msg = f"Selenium scraper: No courses extracted for {major_name_input} agreement."
             print(error_msg)
             if not run_headless and driver: driver.save_screenshot("debug_no_final_requirements.png")
-            return {"error": error_msg, "origin_institution": source_institution_name, "target_institution": target_institution_name, "target_major": major_name_input, "requirements": []}
+            return {"error": error_msg, "origin_institution": source_institution_name, "target_institution": target_institution_name, "target_major": major_name_input, "requirements": [], "timings": timer.summary(failed=True)}
         
         return {
             "origin_institution": source_institution_name, "target_institution": target_institution_name,
             "target_major": agreement_name_on_page or major_name_input,
-            "requirements": final_requirements, "scraper_method": "Selenium - Direct"
+            "requirements": final_requirements, "scraper_method": "Selenium - Direct",
+            "timings": timer.summary()
         }
         
     except Exception as e_main_selenium:
+        driver_healthy = False
         detailed_error = f"Critical error in DIRECT Selenium scraper: {type(e_main_selenium).__name__} - {str(e_main_selenium)}"
         print(detailed_error)
         if driver and not run_headless:
@@ -619,15 +785,126 @@ def humanized_scrape_with_selenium(source_institution_name: str,
         return {
             "error": f"Selenium scraper critical error: {detailed_error}",
             "origin_institution": source_institution_name, "target_institution": target_institution_name,
-            "target_major": major_name_input, "requirements": []
+            "target_major": major_name_input, "requirements": [],
+            "timings": timer.summary(failed=True)
         }
     finally:
         if driver:
-            try: 
-                driver.quit()
-                print("Browser closed.")
-            except Exception as e_quit:
-                print(f"Error quitting browser: {str(e_quit)}")
+            pool.release(driver, healthy=driver_healthy)
+            print("Browser returned to pool.")
+
+def packed_transfer_result(source_institution_name: str, target_institution_name: str, major_name_input: str,
+                           completed_courses: Optional[List[str]] = None,
+                           target_quarter: Optional[str] = None,
+                           target_academic_year_str: Optional[str] = None) -> Optional[Dict]:
+    """Returns requirements from the bundled articulation data pack (no network), or None if the pathway isn't packed."""
+    pack = get_data_pack()
+    if pack is None:
+        return None
+    agreement = pack.find(normalize_institution_name(source_institution_name),
+                          normalize_institution_name(target_institution_name),
+                          major_name_input, target_academic_year_str)
+    if agreement is None:
+        return None
+    if "requirement_groups" not in agreement:
+        # without the any_of / "Or" structure every alternative would read as required
+        print(f"Data pack has no requirement groups for {agreement['agreement_name']}; using the live API instead.")
+        return None
+    print(f"Using data pack {pack.digest[:8]} for {source_institution_name} to {target_institution_name} {agreement['agreement_name']} transfer requirements")
+    result = build_api_transfer_result(agreement, agreement["agreement_name"], source_institution_name,
+                                       target_institution_name, major_name_input, completed_courses, target_quarter)
+    result["api_year_information"] = f"{agreement['year']} (Data Pack)"
+    result["scraper_method"] = "Data Pack"
+    return result
+
+def select_academic_year_id(academic_years: List[Dict[str, Any]], target_academic_year_str: Optional[str] = None) -> Optional[int]:
+    """Picks the requested academic year, else 2024-2025, else the first year ASSIST lists."""
+    year_id_to_use = None
+    if target_academic_year_str:
+        for year in academic_years:
+            if year["name"] == target_academic_year_str or str(year.get("fall_year")) == target_academic_year_str:
+                year_id_to_use = year["id"]
+                print(f"Using specified Academic Year: {year['name']} (ID: {year_id_to_use})")
+                break
+    if not year_id_to_use:
+        specific_year_to_try = "2024-2025"
+        for year in academic_years:
+            if year["name"] == specific_year_to_try:
+                year_id_to_use = year["id"]
+                print(f"Defaulting to Academic Year: {year['name']} (ID: {year_id_to_use})")
+                break
+        if not year_id_to_use and academic_years: 
+            year_id_to_use = academic_years[0]["id"]
+            print(f"Defaulting to latest available Academic Year: {academic_years[0]['name']} (ID: {year_id_to_use})")
+    return year_id_to_use
+
+def resolve_institution_pair(institutions: List[Dict[str, Any]], source_institution_name: str,
+                             target_institution_name: str) -> Tuple[Optional[Tuple[int, int]], Optional[Dict]]:
+    """Returns ((source_id, target_id), None) or (None, error_result)."""
+    resolver = get_institution_resolver(institutions)
+    source_inst = resolver.resolve(source_institution_name)
+    target_inst = resolver.resolve(target_institution_name)
+    if not source_inst:
+        suggestions = [inst["name"] for _, inst in resolver.search(source_institution_name, limit=3)]
+        return None, {"error": f"API: Source institution '{source_institution_name}' not found.", "suggestions": suggestions, "requirements": []}
+    if not target_inst:
+        suggestions = [inst["name"] for _, inst in resolver.search(target_institution_name, limit=3)]
+        return None, {"error": f"API: Target institution '{target_institution_name}' not found.", "suggestions": suggestions, "requirements": []}
+    print(f"API Found Source ID: {source_inst['id']}, Target ID: {target_inst['id']}")
+    return (source_inst["id"], target_inst["id"]), None
+
+def select_major_agreement(year_id: int, source_institution_id: int, target_institution_id: int,
+                           majors: List[Dict[str, Any]], major_name_input: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict]]:
+    """Returns (best_candidate, None) or (None, error_result carrying the ranked candidates)."""
+    major_index = get_major_index(year_id, source_institution_id, target_institution_id, majors)
+    major_candidates = major_index.search(major_name_input, k=5)
+    if not major_candidates or major_candidates[0]["score"] < MAJOR_MIN_SCORE:
+        err_msg = f"API: Major agreement '{major_name_input}' not found."
+        return None, {"error": err_msg, "candidates": major_candidates, "requirements": []}
+    if major_index.is_ambiguous(major_candidates):
+        err_msg = f"API: Major '{major_name_input}' matches several agreements; please pick one of the candidates."
+        return None, {"error": err_msg, "candidates": major_candidates, "requirements": []}
+    best = major_candidates[0]
+    print(f"API Found Major Agreement: '{best['name']}' (score {best['score']}) with key: {best['key']}")
+    return best, None
+
+def build_agreement_key(year_id: int, source_institution_id: int, target_institution_id: int, major_key: str) -> Tuple[str, str]:
+    """Returns (agreement_key, referer_url) for api/articulation/Agreements."""
+    agreement_key = f"{int(year_id)}/{int(source_institution_id)}/to/{int(target_institution_id)}/{major_key}"
+    print(f"API Constructed agreement key: {agreement_key}")
+    referer_url = f"https://assist.org/transfer/results?year={year_id}&institution={source_institution_id}&agreement={target_institution_id}&agreementType=to&viewBy=major&viewByKey={agreement_key.replace('/', '%2F')}"
+    return agreement_key, referer_url
+
+def build_api_transfer_result(api_result: Dict, found_major_name_api: str, source_institution_name: str,
+                              target_institution_name: str, major_name_input: str,
+                              completed_courses: Optional[List[str]] = None,
+                              target_quarter: Optional[str] = None) -> Dict:
+    """Marks each agreement course completed/remaining and shapes the /transfers response."""
+    all_courses_api = []
+    if api_result.get("data_available", False):
+        all_courses_api.extend(api_result.get("required_courses", []))
+        all_courses_api.extend(api_result.get("recommended_courses", []))
+
+    requirement_groups = api_result.get("requirement_groups", [])
+    final_requirements_api = mark_requirements(
+        [{"code": c.get('code'), "title": c.get('title'), "units": c.get('units')} for c in all_courses_api],
+        completed_courses, requirement_groups)
+
+    if "error" in api_result and not api_result.get("data_available", False):
+        err_msg = api_result["error"]
+        return {"error": err_msg, "origin_institution": source_institution_name, "target_institution": target_institution_name, "target_major": major_name_input, "target_quarter": target_quarter or "N/A", "requirements": [], "suggestion": "API could not retrieve data."}
+
+    return {"origin_institution": source_institution_name, "target_institution": target_institution_name, "target_major": api_result.get("agreement_name", found_major_name_api), "target_quarter": target_quarter or "N/A", "requirements": final_requirements_api, "requirement_groups": requirement_groups, "api_year_information": api_result.get("year", "N/A"), "scraper_method": "API"}
+
+def apply_completed_courses(result: Dict, completed_courses: Optional[List[str]] = None,
+                            target_quarter: Optional[str] = None) -> Dict:
+    """Copy of a transfer result with requirement statuses recomputed for another student's completed courses."""
+    updated = dict(result)
+    updated["requirements"] = mark_requirements(result.get("requirements", []), completed_courses,
+                                                result.get("requirement_groups"))
+    if "target_quarter" in result:
+        updated["target_quarter"] = target_quarter or "N/A"
+    return updated
 
 def get_transfer_courses(source_institution_name: str, target_institution_name: str, major_name_input: str, 
                          completed_courses: Optional[List[str]] = None, 
@@ -635,9 +912,14 @@ def get_transfer_courses(source_institution_name: str, target_institution_name:
                          target_academic_year_str: Optional[str] = None,
                          use_selenium: bool = False,
                          true_data_only: bool = False,
-                         run_selenium_headless: bool = False) -> Dict:
-    """Main function to get transfer courses using dynamic API lookups or Selenium."""
+                         run_selenium_headless: bool = False,
+                         progress: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Main function to get transfer courses using dynamic API lookups or Selenium.
+    `progress`, if given, is called with the name of each step as it starts.
+    """
     print(f"Getting courses for {source_institution_name} to {target_institution_name} for {major_name_input}")
+    report = progress or (lambda step: None)
 
     if true_data_only:
         print(f"TRUE_DATA_ONLY specified. Attempting Selenium scraper... (Headless: {run_selenium_headless})")
@@ -646,10 +928,11 @@ def get_transfer_courses(source_institution_name: str, target_institution_name:
             target_institution_name, 
             major_name_input, 
             completed_courses,
-            run_headless=run_selenium_headless
+            run_headless=run_selenium_headless,
+            progress=progress
         )
         # If true_data_only is set, we return the result of Selenium, success or failure.
-        # We do not fall back to API or hardcoded data.
+        # We do not fall back to API or data-pack results.
         if not selenium_result.get("error") and selenium_result.get("requirements"):
             print("Selenium scraping successful for true_data_only request.")
         else:
@@ -664,155 +947,56 @@ def get_transfer_courses(source_institution_name: str, target_institution_name:
             target_institution_name, 
             major_name_input, 
             completed_courses,
-            run_headless=run_selenium_headless
+            run_headless=run_selenium_headless,
+            progress=progress
         )
         # If Selenium was explicitly requested, return its result, success or failure.
-        # Do not fall back to API/hardcoded if use_selenium was the specific instruction.
+        # Do not fall back to API/data pack if use_selenium was the specific instruction.
         if not selenium_result.get("error") and selenium_result.get("requirements"):
             print("Selenium scraping successful for use_selenium request.")
         else:
             print(f"Selenium scraping failed for use_selenium request. Error: {selenium_result.get('error', 'Unknown Selenium error')}")
         return selenium_result
 
-    # Standard path: Hardcoded data, then API (if true_data_only and use_selenium are both False)
-    print("Attempting hardcoded data / API method (standard path)...")
-    norm_source = normalize_institution_name(source_institution_name)
-    norm_target = normalize_institution_name(target_institution_name)
-    norm_major = normalize_major_name(major_name_input)
-    
-    # --- Hardcoded Data Check (only if not true_data_only) ---
-    # This check is implicitly covered now by the logic: if true_data_only was true, we'd have returned.
-    # De Anza College to UC Berkeley - Applied Math
-    if (norm_source == "de anza college" and 
-        norm_target == "university of california, berkeley" and 
-        (norm_major == "mathematics, applied" or "applied" in norm_major or "math" in norm_major)):
-        print("Using hardcoded data for De Anza College to UC Berkeley Applied Math transfer requirements")
-        all_courses_hardcoded_applied_math = [
-            {"code": "MATH 1A", "title": "Calculus", "units": 5.0},{"code": "MATH 1B", "title": "Calculus", "units": 5.0},{"code": "MATH 1C", "title": "Calculus", "units": 5.0},{"code": "MATH 1D", "title": "Calculus", "units": 5.0},{"code": "MATH 2A", "title": "Differential Equations", "units": 5.0},{"code": "MATH 2B", "title": "Linear Algebra", "units": 5.0},{"code": "PHYS 4A", "title": "Physics for Scientists and Engineers: Mechanics", "units": 6.0},{"code": "PHYS 4B", "title": "Physics for Scientists and Engineers: Electricity and Magnetism", "units": 6.0},{"code": "PHYS 4C", "title": "Physics for Scientists and Engineers: Fluids, Waves, Optics & Thermodynamics", "units": 6.0},{"code": "CIS 22A", "title": "Beginning Programming Methodologies in C++", "units": 4.5},{"code": "CIS 22B", "title": "Intermediate Programming Methodologies in C++", "units": 4.5},
-        ]
-        final_requirements_hardcoded = []
-        norm_completed_hardcoded = [c.strip().replace(" ", "").upper() for c in (completed_courses or [])]
-        for course in all_courses_hardcoded_applied_math:
-            norm_code_hardcoded = str(course.get('code', '')).replace(" ", "").upper()
-            status_hardcoded = "completed" if norm_code_hardcoded in norm_completed_hardcoded else "remaining"
-            final_requirements_hardcoded.append({"code": course.get('code'), "title": course.get('title'), "units": course.get('units'), "status": status_hardcoded})
-        return {"origin_institution": source_institution_name, "target_institution": target_institution_name, "target_major": "Mathematics, Applied", "target_quarter": target_quarter or "Fall 2024", "requirements": final_requirements_hardcoded, "api_year_information": "2024-2025 (Hardcoded Fallback)", "scraper_method": "Hardcoded"}
-
-    # De Anza College to UC Berkeley - Computer Science
-    if (norm_source == "de anza college" and 
-        norm_target == "university of california, berkeley" and 
-        norm_major == "computer science"):
-        print("Using hardcoded data for De Anza College to UC Berkeley Computer Science transfer requirements")
-        all_courses_hardcoded_cs = [
-            {"code": "MATH 1A", "title": "Calculus", "units": 5.0},{"code": "MATH 1B", "title": "Calculus", "units": 5.0},{"code": "MATH 1C", "title": "Calculus", "units": 5.0},{"code": "MATH 1D", "title": "Calculus", "units": 5.0},{"code": "MATH 2B", "title": "Linear Algebra", "units": 5.0},{"code": "PHYS 4A", "title": "Physics for Scientists and Engineers: Mechanics", "units": 6.0},{"code": "PHYS 4B", "title": "Physics for Scientists and Engineers: Electricity and Magnetism", "units": 6.0},{"code": "CIS 22A", "title": "Beginning Programming Methodologies in C++", "units": 4.5},{"code": "CIS 22B", "title": "Intermediate Programming Methodologies in C++", "units": 4.5},{"code": "CIS 22C", "title": "Data Structures and Algorithms in C++", "units": 4.5},
-        ]
-        final_requirements_hardcoded_cs = []
-        norm_completed_hardcoded_cs = [c.strip().replace(" ", "").upper() for c in (completed_courses or [])]
-        for course in all_courses_hardcoded_cs:
-            norm_code_hardcoded_cs = str(course.get('code', '')).replace(" ", "").upper()
-            status_hardcoded_cs = "completed" if norm_code_hardcoded_cs in norm_completed_hardcoded_cs else "remaining"
-            final_requirements_hardcoded_cs.append({"code": course.get('code'), "title": course.get('title'), "units": course.get('units'), "status": status_hardcoded_cs})
-        return {"origin_institution": source_institution_name, "target_institution": target_institution_name, "target_major": "Computer Science", "target_quarter": target_quarter or "Fall 2024", "requirements": final_requirements_hardcoded_cs, "api_year_information": "2024-2025 (Hardcoded Fallback)", "scraper_method": "Hardcoded"}
+    # Standard path: bundled data pack, then API (if true_data_only and use_selenium are both False)
+    print("Attempting data pack / API method (standard path)...")
+    report("data_pack")
+    packed = packed_transfer_result(source_institution_name, target_institution_name, major_name_input,
+                                    completed_courses, target_quarter, target_academic_year_str)
+    if packed is not None:
+        return packed
     
     # --- API Method (only if not true_data_only and not use_selenium, or if they were false and led here) ---
     print("Proceeding to API method...")
-    session_manager = RequestsSessionManager()
-    if not session_manager.get_xsrf_token():
-        return {"error": "Failed to init API session.", "requirements": []}
-
-    academic_years = fetch_academic_years_api(session_manager)
+    report("academic_years")
+    academic_years = get_academic_years_cached()
     if not academic_years: 
         return {"error": "Failed to fetch academic years via API.", "requirements": []}
-
-    year_id_to_use = None
-    if target_academic_year_str:
-        for year in academic_years:
-            if year["name"] == target_academic_year_str or str(year.get("fall_year")) == target_academic_year_str:
-                year_id_to_use = year["id"]
-                print(f"Using specified Academic Year: {year['name']} (ID: {year_id_to_use})")
-                break
-    if not year_id_to_use:
-        specific_year_to_try = "2024-2025"
-        for year in academic_years:
-            if year["name"] == specific_year_to_try:
-                year_id_to_use = year["id"]
-                print(f"Defaulting to Academic Year: {year['name']} (ID: {year_id_to_use})")
-                break
-        if not year_id_to_use and academic_years: 
-            year_id_to_use = academic_years[0]["id"]
-            print(f"Defaulting to latest available Academic Year: {academic_years[0]['name']} (ID: {year_id_to_use})")
+    year_id_to_use = select_academic_year_id(academic_years, target_academic_year_str)
     if not year_id_to_use: 
         return {"error": "Could not determine academic year for API.", "requirements": []}
 
-    institutions = fetch_institutions_api(session_manager)
+    report("institutions")
+    institutions = get_institutions_cached()
     if not institutions: 
         return {"error": "Failed to fetch institutions via API.", "requirements": []}
-
-    norm_source_name = normalize_institution_name(source_institution_name)
-    norm_target_name = normalize_institution_name(target_institution_name)
-    source_institution_id, target_institution_id = None, None
-    for inst in institutions:
-        if any(normalize_institution_name(name) == norm_source_name for name in inst.get("all_names", [])):
-            source_institution_id = inst["id"]
-        if any(normalize_institution_name(name) == norm_target_name for name in inst.get("all_names", [])):
-            target_institution_id = inst["id"]
-        if source_institution_id and target_institution_id: break
-    if not source_institution_id: 
-        return {"error": f"API: Source institution '{source_institution_name}' not found.", "requirements": []}
-    if not target_institution_id: 
-        return {"error": f"API: Target institution '{target_institution_name}' not found.", "requirements": []}
-    print(f"API Found Source ID: {source_institution_id}, Target ID: {target_institution_id}")
+    institution_ids, error_result = resolve_institution_pair(institutions, source_institution_name, target_institution_name)
+    if error_result:
+        return error_result
+    source_institution_id, target_institution_id = institution_ids
 
     majors_report_type = 3 
-    majors = fetch_majors_api(session_manager, year_id_to_use, source_institution_id, target_institution_id, majors_report_type)
+    report("majors")
+    majors = get_majors_cached(year_id_to_use, source_institution_id, target_institution_id, majors_report_type)
     if not majors: 
         err_msg = f"API: No major agreements found for Inst {source_institution_id} to {target_institution_id}, Year {year_id_to_use}."
         return {"error": err_msg, "requirements": []}
-    
-    norm_major_input_api = normalize_major_name(major_name_input)
-    major_key_from_api = None
-    found_major_name_api = major_name_input
-    for m_api in majors:
-        api_major_name_normalized = normalize_major_name(m_api.get("name", "")) 
-        if norm_major_input_api == api_major_name_normalized:
-            major_key_from_api = m_api.get("key")
-            found_major_name_api = m_api.get("name", major_name_input)
-            print(f"API Found Major Agreement: '{found_major_name_api}' with key: {major_key_from_api}")
-            break
-    if not major_key_from_api:
-        for m_api in majors: # Fallback partial match
-            api_major_name_normalized = normalize_major_name(m_api.get("name", ""))
-            if norm_major_input_api in api_major_name_normalized:
-                 major_key_from_api = m_api.get("key")
-                 found_major_name_api = m_api.get("name", major_name_input)
-                 print(f"API Found Major Agreement (partial match): '{found_major_name_api}' with key: {major_key_from_api}")
-                 break
-    if not major_key_from_api: 
-        err_msg = f"API: Major agreement '{major_name_input}' (normalized: {norm_major_input_api}) not found."
-        return {"error": err_msg, "requirements": []}
-
-    agreement_key = f"{int(year_id_to_use)}/{int(source_institution_id)}/to/{int(target_institution_id)}/{major_key_from_api}"
-    print(f"API Constructed agreement key: {agreement_key}")
-    referer_url = f"{session_manager.base_url}transfer/results?year={year_id_to_use}&institution={source_institution_id}&agreement={target_institution_id}&agreementType=to&viewBy=major&viewByKey={agreement_key.replace('/', '%2F')}"
-    api_result = fetch_agreement_data_api(session_manager, agreement_key, referer_url)
-    
-    all_courses_api = []
-    if api_result.get("data_available", False):
-        all_courses_api.extend(api_result.get("required_courses", []))
-        all_courses_api.extend(api_result.get("recommended_courses", []))
-
-    final_requirements_api = []
-    norm_completed_api = [c.strip().replace(" ", "").upper() for c in (completed_courses or [])]
-    for course_api in all_courses_api:
-        norm_code_api = str(course_api.get('code', '')).replace(" ", "").upper()
-        status_api = "completed" if norm_code_api and norm_code_api in norm_completed_api else "remaining"
-        final_requirements_api.append({"code": course_api.get('code'), "title": course_api.get('title'), "units": course_api.get('units'), "status": status_api})
-
-    if "error" in api_result and not api_result.get("data_available", False):
-        err_msg = api_result["error"]
-        return {"error": err_msg, "origin_institution": source_institution_name, "target_institution": target_institution_name, "target_major": major_name_input, "target_quarter": target_quarter or "N/A", "requirements": [], "suggestion": "API could not retrieve data."}
-
-    return {"origin_institution": source_institution_name, "target_institution": target_institution_name, "target_major": api_result.get("agreement_name", found_major_name_api), "target_quarter": target_quarter or "N/A", "requirements": final_requirements_api, "api_year_information": api_result.get("year", "N/A"), "scraper_method": "API"}
-
-# Removed BeautifulSoup and re as they are not used in the API method currently.
-# Kept json and typing. Removed time. 
\ No newline at end of file
+    major_match, error_result = select_major_agreement(year_id_to_use, source_institution_id, target_institution_id, majors, major_name_input)
+    if error_result:
+        return error_result
+
+    agreement_key, referer_url = build_agreement_key(year_id_to_use, source_institution_id, target_institution_id, major_match["key"])
+    report("agreement")
+    api_result = get_agreement_cached(agreement_key, referer_url)
+    return build_api_transfer_result(api_result, major_match["name"] or major_name_input, source_institution_name,
+                                     target_institution_name, major_name_input, completed_courses, target_quarter)
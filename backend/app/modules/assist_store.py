@@ -0,0 +1,258 @@
+# backend/app/modules/assist_store.py
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Column, Float, MetaData, String, Table, Text, create_engine, select
+
+from app.config import settings
+
+# Entity types kept in the store and how long each stays fresh (seconds).
+ENTITY_TTLS: Dict[str, int] = {
+    "academic_years": settings.ASSIST_TTL_ACADEMIC_YEARS,
+    "institutions": settings.ASSIST_TTL_INSTITUTIONS,
+    "majors": settings.ASSIST_TTL_MAJORS,
+    "agreement": settings.ASSIST_TTL_AGREEMENT,
+}
+
+metadata = MetaData()
+
+assist_entries = Table(
+    "assist_entries",
+    metadata,
+    Column("entity", String(32), primary_key=True),
+    Column("key", String(255), primary_key=True),
+    Column("payload", Text, nullable=False),
+    Column("fetched_at", Float, nullable=False),
+    Column("meta", Text, nullable=True),
+)
+
+
+class StoreEntry(NamedTuple):
+    payload: Any
+    fetched_at: float
+    meta: Dict[str, Any]
+
+
+class Fetched(NamedTuple):
+    """A fetcher result that carries metadata (content hash, HTTP validators) to store with the payload."""
+    payload: Any
+    meta: Dict[str, Any]
+
+
+class Unchanged(NamedTuple):
+    """A refresher result meaning upstream content is unchanged; only the timestamp and meta are updated."""
+    meta: Dict[str, Any]
+
+
+def _unpack(result: Any) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    if isinstance(result, Fetched):
+        return result.payload, result.meta
+    return result, None
+
+
+class AssistStore:
+    """
+    Persistent store for ASSIST reference data (years, institutions, major lists, parsed agreements).
+    Fresh entries are returned directly; stale entries are returned immediately while a
+    background refresh replaces them (stale-while-revalidate). Misses fetch synchronously.
+    """
+
+    def __init__(self, url: Optional[str] = None, ttls: Optional[Dict[str, int]] = None):
+        self.url = url or settings.ASSIST_STORE_URL
+        self.ttls = dict(ENTITY_TTLS, **(ttls or {}))
+        connect_args = {"check_same_thread": False} if self.url.startswith("sqlite") else {}
+        self.engine = create_engine(self.url, connect_args=connect_args)
+        metadata.create_all(self.engine)
+
+        # Decoded payloads, so warm reads skip both SQLite and json.loads.
+        self._memory: Dict[Tuple[str, str], StoreEntry] = {}
+        self._lock = threading.Lock()
+        self._refreshing: set = set()
+        self._tasks: set = set()
+        self._executor = ThreadPoolExecutor(max_workers=settings.ASSIST_REFRESH_WORKERS,
+                                            thread_name_prefix="assist-refresh")
+
+    # --- Low-level access ---
+    def lookup(self, entity: str, key: str) -> Optional[StoreEntry]:
+        cached = self._memory.get((entity, key))
+        if cached is not None:
+            return cached
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(assist_entries.c.payload, assist_entries.c.fetched_at, assist_entries.c.meta)
+                .where(assist_entries.c.entity == entity, assist_entries.c.key == key)
+            ).first()
+        if row is None:
+            return None
+        entry = StoreEntry(json.loads(row.payload), row.fetched_at, json.loads(row.meta) if row.meta else {})
+        with self._lock:
+            self._memory[(entity, key)] = entry
+        return entry
+
+    def put(self, entity: str, key: str, payload: Any, meta: Optional[Dict[str, Any]] = None) -> StoreEntry:
+        entry = StoreEntry(payload, time.time(), meta or {})
+        with self.engine.begin() as conn:
+            conn.execute(assist_entries.delete().where(
+                assist_entries.c.entity == entity, assist_entries.c.key == key))
+            conn.execute(assist_entries.insert().values(
+                entity=entity, key=key, payload=json.dumps(payload),
+                fetched_at=entry.fetched_at, meta=json.dumps(entry.meta)))
+        with self._lock:
+            self._memory[(entity, key)] = entry
+        return entry
+
+    def touch(self, entity: str, key: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        """Marks an entry fresh again without reading or rewriting its payload."""
+        now = time.time()
+        values: Dict[str, Any] = {"fetched_at": now}
+        if meta is not None:
+            values["meta"] = json.dumps(meta)
+        with self.engine.begin() as conn:
+            conn.execute(assist_entries.update().where(
+                assist_entries.c.entity == entity, assist_entries.c.key == key).values(**values))
+        with self._lock:
+            cached = self._memory.get((entity, key))
+            if cached is not None:
+                self._memory[(entity, key)] = StoreEntry(cached.payload, now, meta if meta is not None else cached.meta)
+
+    def keys(self, entity: str) -> List[str]:
+        with self.engine.connect() as conn:
+            return [r.key for r in conn.execute(
+                select(assist_entries.c.key).where(assist_entries.c.entity == entity))]
+
+    def entry_metas(self, entity: str) -> Dict[str, Tuple[float, Dict[str, Any]]]:
+        """key -> (fetched_at, meta) for every entry of `entity`, without decoding payloads."""
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(assist_entries.c.key, assist_entries.c.fetched_at, assist_entries.c.meta)
+                                .where(assist_entries.c.entity == entity))
+            return {r.key: (r.fetched_at, json.loads(r.meta) if r.meta else {}) for r in rows}
+
+    def is_fresh(self, entity: str, entry: StoreEntry) -> bool:
+        return time.time() - entry.fetched_at < self.ttls.get(entity, 0)
+
+    # --- Read-through with stale-while-revalidate ---
+    def get_or_fetch(self, entity: str, key: str, fetcher: Callable[[], Any],
+                     is_valid: Callable[[Any], bool] = bool,
+                     refresher: Optional[Callable[[StoreEntry], Any]] = None) -> Any:
+        """
+        Returns the stored payload for (entity, key). A stale hit is served as-is and refreshed
+        in the background; a miss calls `fetcher` inline. Results failing `is_valid` (empty lists,
+        error dicts) are returned but never stored. Fetchers may return Fetched(payload, meta).
+
+        `refresher`, if given, replaces `fetcher` for stale hits: it receives the stale entry and
+        returns Unchanged(meta) when upstream content did not change, so nothing is re-parsed.
+        """
+        entry = self.lookup(entity, key)
+        if entry is not None:
+            if not self.is_fresh(entity, entry):
+                self.refresh_in_background(entity, key, fetcher, is_valid, refresher)
+            return entry.payload
+
+        payload, meta = _unpack(fetcher())
+        if is_valid(payload):
+            self.put(entity, key, payload, meta)
+        return payload
+
+    def refresh_in_background(self, entity: str, key: str, fetcher: Callable[[], Any],
+                              is_valid: Callable[[Any], bool] = bool,
+                              refresher: Optional[Callable[[StoreEntry], Any]] = None) -> None:
+        with self._lock:
+            if (entity, key) in self._refreshing:
+                return
+            self._refreshing.add((entity, key))
+        self._executor.submit(self._refresh, entity, key, fetcher, is_valid, refresher)
+
+    def _apply_refresh(self, entity: str, key: str, result: Any, is_valid: Callable[[Any], bool]) -> None:
+        if isinstance(result, Unchanged):
+            self.touch(entity, key, result.meta)
+            return
+        payload, meta = _unpack(result)
+        if is_valid(payload):
+            self.put(entity, key, payload, meta)
+            print(f"Refreshed stale {entity} entry: {key}")
+        else:
+            print(f"Background refresh of {entity} '{key}' returned no usable data; keeping stale entry.")
+
+    def _refresh(self, entity: str, key: str, fetcher: Callable[[], Any], is_valid: Callable[[Any], bool],
+                 refresher: Optional[Callable[[StoreEntry], Any]] = None) -> None:
+        try:
+            entry = self.lookup(entity, key)
+            result = refresher(entry) if refresher and entry else fetcher()
+            self._apply_refresh(entity, key, result, is_valid)
+        except Exception as e:
+            print(f"Background refresh of {entity} '{key}' failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard((entity, key))
+
+    # --- Async read-through (same semantics, for the asyncio client) ---
+    async def aget_or_fetch(self, entity: str, key: str, fetcher: Callable[[], Awaitable[Any]],
+                            is_valid: Callable[[Any], bool] = bool,
+                            refresher: Optional[Callable[[StoreEntry], Any]] = None) -> Any:
+        """
+        Async counterpart of get_or_fetch; stale hits are refreshed in a task on the running loop.
+        Memory hits return inline and the SQLite lookup runs in a worker thread. `refresher` is
+        a plain (blocking) callable and also runs in a worker thread.
+        """
+        entry = await self._alookup(entity, key)
+        if entry is not None:
+            if not self.is_fresh(entity, entry):
+                self._refresh_in_task(entity, key, fetcher, is_valid, refresher)
+            return entry.payload
+
+        payload, meta = _unpack(await fetcher())
+        if is_valid(payload):
+            await asyncio.to_thread(self.put, entity, key, payload, meta)
+        return payload
+
+    async def _alookup(self, entity: str, key: str) -> Optional[StoreEntry]:
+        cached = self._memory.get((entity, key))
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self.lookup, entity, key)
+
+    def _refresh_in_task(self, entity: str, key: str, fetcher: Callable[[], Awaitable[Any]],
+                         is_valid: Callable[[Any], bool],
+                         refresher: Optional[Callable[[StoreEntry], Any]] = None) -> None:
+        with self._lock:
+            if (entity, key) in self._refreshing:
+                return
+            self._refreshing.add((entity, key))
+        task = asyncio.get_running_loop().create_task(self._arefresh(entity, key, fetcher, is_valid, refresher))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _arefresh(self, entity: str, key: str, fetcher: Callable[[], Awaitable[Any]],
+                        is_valid: Callable[[Any], bool],
+                        refresher: Optional[Callable[[StoreEntry], Any]] = None) -> None:
+        try:
+            entry = await self._alookup(entity, key)
+            if refresher and entry:
+                result = await asyncio.to_thread(refresher, entry)
+            else:
+                result = await fetcher()
+            await asyncio.to_thread(self._apply_refresh, entity, key, result, is_valid)
+        except Exception as e:
+            print(f"Background refresh of {entity} '{key}' failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard((entity, key))
+
+
+_store: Optional[AssistStore] = None
+_store_lock = threading.Lock()
+
+
+def get_assist_store() -> AssistStore:
+    """Returns the process-wide store, creating the database on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AssistStore()
+    return _store
@@ -0,0 +1,278 @@
+# backend/app/modules/browser_pool.py
+
+import base64
+import json
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from app.config import settings
+
+SCRAPER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/99.0.4844.84 Safari/537.36"
+
+
+def chrome_options(headless: bool = True) -> Options:
+    """Chrome options used by the ASSIST Selenium scraper."""
+    options = Options()
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument("--window-size=1366,768")
+    options.add_argument(f"--user-agent={SCRAPER_USER_AGENT}")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option("useAutomationExtension", False)
+    # DevTools network events, read back through driver.get_log("performance").
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def drain_performance_log(driver: webdriver.Chrome) -> None:
+    """Discards buffered DevTools events so a new scrape only sees its own traffic."""
+    try:
+        driver.get_log("performance")
+    except Exception:
+        pass
+
+
+def wait_for_response_body(driver: webdriver.Chrome, url_fragment: str, timeout: float = 20.0,
+                           poll_interval: float = 0.1) -> Optional[Any]:
+    """
+    Watches the DevTools network log for a response whose URL contains `url_fragment` and
+    returns its JSON-decoded body (base64-decoded first if DevTools sent it that way) as soon
+    as it has finished loading, or None on timeout or if that body can't be decoded.
+    """
+    deadline = time.monotonic() + timeout
+    pending: Dict[str, str] = {}  # requestId -> url
+    finished: set = set()
+    while time.monotonic() < deadline:
+        for entry in driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method, params = message.get("method"), message.get("params", {})
+            if method == "Network.responseReceived" and url_fragment in params.get("response", {}).get("url", ""):
+                if params["response"].get("status") == 200:
+                    pending[params["requestId"]] = params["response"]["url"]
+            elif method == "Network.loadingFinished":
+                finished.add(params.get("requestId"))
+        for request_id, url in list(pending.items()):
+            if request_id not in finished:
+                continue
+            del pending[request_id]
+            try:
+                body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+                text = body.get("body", "")
+                if body.get("base64Encoded"):
+                    text = base64.b64decode(text).decode("utf-8")
+                return json.loads(text)
+            except Exception as e:
+                # the response has been seen and won't come again: let the caller fall back now
+                print(f"Could not read captured response body for {url}: {e}")
+                return None
+        time.sleep(poll_interval)
+    return None
+
+
+class ChromeDriverPool:
+    """
+    Bounded pool of warm headless Chrome sessions.
+
+    At most `size` drivers exist at once; callers beyond that wait (up to `checkout_timeout`)
+    for one to be returned. Idle drivers are health-checked on checkout and retired after
+    `max_uses` checkouts or once the page's JS heap passes `max_memory_mb`. The chromedriver
+    binary is resolved once per process instead of on every scrape.
+    """
+
+    def __init__(self, size: Optional[int] = None, max_uses: Optional[int] = None,
+                 max_memory_mb: Optional[int] = None, checkout_timeout: Optional[float] = None,
+                 driver_path: Optional[str] = None):
+        self.size = size or settings.SELENIUM_POOL_SIZE
+        self.max_uses = max_uses or settings.SELENIUM_MAX_USES
+        self.max_memory_mb = max_memory_mb or settings.SELENIUM_MAX_MEMORY_MB
+        self.checkout_timeout = checkout_timeout if checkout_timeout is not None else settings.SELENIUM_CHECKOUT_TIMEOUT
+        self._driver_path = driver_path or settings.CHROMEDRIVER_PATH or None
+        self._path_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle: "queue.LifoQueue[webdriver.Chrome]" = queue.LifoQueue()
+        self._uses: Dict[int, int] = {}
+        self._dedicated: set = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"launched": 0, "reused": 0, "retired": 0, "waits": 0}
+
+    # --- Driver lifecycle ---
+    def driver_path(self) -> str:
+        if self._driver_path is None:
+            with self._path_lock:
+                if self._driver_path is None:
+                    self._driver_path = ChromeDriverManager().install()
+                    print(f"Resolved chromedriver at {self._driver_path}")
+        return self._driver_path
+
+    def launch(self, headless: bool = True) -> webdriver.Chrome:
+        started = time.monotonic()
+        driver = webdriver.Chrome(service=Service(self.driver_path()), options=chrome_options(headless))
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+        except Exception as e:
+            print(f"Could not enable DevTools network domain: {e}")
+        with self._lock:
+            self._uses[id(driver)] = 0
+            self.stats["launched"] += 1
+        print(f"Launched Chrome ({'headless' if headless else 'headed'}) in {time.monotonic() - started:.1f}s")
+        return driver
+
+    def _quit(self, driver: webdriver.Chrome) -> None:
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self._dedicated.discard(id(driver))
+            self.stats["retired"] += 1
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error quitting browser: {e}")
+
+    @staticmethod
+    def is_healthy(driver: webdriver.Chrome) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def _memory_mb(self, driver: webdriver.Chrome) -> float:
+        try:
+            used = driver.execute_script("return window.performance && performance.memory ? performance.memory.usedJSHeapSize : 0")
+            return (used or 0) / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    def _should_retire(self, driver: webdriver.Chrome) -> bool:
+        if self._uses.get(id(driver), 0) >= self.max_uses:
+            return True
+        return self._memory_mb(driver) >= self.max_memory_mb
+
+    # --- Checkout / return ---
+    def acquire(self, dedicated: bool = False) -> webdriver.Chrome:
+        """
+        Checks out a warm headless driver, waiting for a free slot if all are busy.
+        `dedicated=True` launches a one-off headed browser (debugging) that is quit on release.
+        """
+        if dedicated:
+            driver = self.launch(headless=False)
+            with self._lock:
+                self._dedicated.add(id(driver))
+            return driver
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["waits"] += 1
+            print("All pooled browsers are busy; waiting for one to be returned...")
+            if not self._slots.acquire(timeout=self.checkout_timeout):
+                raise TimeoutError(f"No pooled browser became available within {self.checkout_timeout}s")
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    driver = self.launch(headless=True)
+                    break
+                if self.is_healthy(driver):
+                    with self._lock:
+                        self.stats["reused"] += 1
+                    break
+                print("Discarding unhealthy pooled browser.")
+                self._quit(driver)
+            with self._lock:
+                self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            return driver
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver: webdriver.Chrome, healthy: bool = True) -> None:
+        """Returns a driver to the pool, or retires it if it is broken, worn out or too large."""
+        if id(driver) in self._dedicated:
+            self._quit(driver)
+            return
+        try:
+            if healthy and not self._closed and self.is_healthy(driver) and not self._should_retire(driver):
+                try:
+                    driver.delete_all_cookies()
+                    driver.get("about:blank")
+                    drain_performance_log(driver)
+                    self._idle.put(driver)
+                    return
+                except Exception as e:
+                    print(f"Failed to reset pooled browser: {e}")
+            self._quit(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def checkout(self, dedicated: bool = False) -> Iterator[webdriver.Chrome]:
+        driver = self.acquire(dedicated=dedicated)
+        healthy = True
+        try:
+            yield driver
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            self.release(driver, healthy=healthy)
+
+    def warm(self, count: Optional[int] = None) -> None:
+        """Pre-launches up to `count` (default: pool size) idle drivers."""
+        for _ in range(min(count or self.size, self.size) - self._idle.qsize()):
+            if self._closed or not self._slots.acquire(blocking=False):
+                break
+            try:
+                driver = self.launch(headless=True)
+                if self._closed:
+                    self._quit(driver)
+                else:
+                    self._idle.put(driver)
+            except Exception as e:
+                print(f"Failed to pre-launch pooled browser: {e}")
+            finally:
+                self._slots.release()
+
+    def close(self) -> None:
+        """Quits every idle driver; drivers still checked out are quit when they are returned."""
+        self._closed = True
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+_pool: Optional[ChromeDriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> ChromeDriverPool:
+    """Returns the process-wide Chrome pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ChromeDriverPool()
+    return _pool
+
+
+def close_browser_pool() -> None:
+    """Quits the process-wide pool's browsers (if it was ever created); the next use starts a new pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,242 @@
+# backend/app/modules/course_codes.py
+
+import functools
+import json
+import os
+import re
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+
+# prefix letters (spaces, dots, "&" allowed: "C S", "C.I.S.", "E&M"), then the number, then a suffix
+_COURSE_CODE = re.compile(r"^\s*([A-Za-z][A-Za-z.&\s]*?)[\s\-_.]*0*(\d+)\s*([A-Za-z]*)\s*$")
+_NON_ALNUM = re.compile(r"[^A-Z0-9]")
+
+DEFAULT_EQUIVALENCES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "course_equivalences.json")
+
+
+class CourseCode(NamedTuple):
+    prefix: str
+    number: int
+    suffix: str
+
+    def __str__(self) -> str:
+        return f"{self.prefix} {self.number}{self.suffix}"
+
+
+def parse_course_code(code: str) -> Optional[CourseCode]:
+    """'MATH-001A', 'math 1a' and 'MATH1A' all parse to CourseCode('MATH', 1, 'A')."""
+    match = _COURSE_CODE.match(code or "")
+    if not match:
+        return None
+    prefix = _NON_ALNUM.sub("", match.group(1).upper())
+    return CourseCode(prefix, int(match.group(2)), match.group(3).upper()) if prefix else None
+
+
+@functools.lru_cache(maxsize=65536)
+def course_key(code: str) -> str:
+    """
+    Compact, interned key for a course code ("MATH 1A"). Codes that don't look like
+    PREFIX NUMBER SUFFIX fall back to their uppercased alphanumerics.
+    """
+    parsed = parse_course_code(code)
+    return sys.intern(str(parsed) if parsed else _NON_ALNUM.sub("", (code or "").upper()))
+
+
+def sequence_prerequisites(codes: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    course key -> keys of its in-sequence predecessor among `codes`: lettered sequences share a
+    prefix and number ("MATH 1A" -> "MATH 1B" -> "MATH 1C"), so 1B requires 1A when both are
+    listed. Courses outside a lettered sequence get no entry.
+    """
+    keys = {course_key(code) for code in codes if code}
+    prerequisites: Dict[str, List[str]] = {}
+    for key in keys:
+        parsed = parse_course_code(key)
+        if not parsed or len(parsed.suffix) != 1 or parsed.suffix == "A":
+            continue
+        previous = str(CourseCode(parsed.prefix, parsed.number, chr(ord(parsed.suffix) - 1)))
+        if previous in keys:
+            prerequisites[key] = [previous]
+    return prerequisites
+
+
+class CourseEquivalences:
+    """
+    Interned union-find over course keys: cross-listed courses, honors sections and renumbered
+    courses collapse to one representative, so a match is a single hashed lookup.
+    """
+
+    def __init__(self, groups: Iterable[Iterable[str]] = ()):
+        self._parent: Dict[str, str] = {}
+        for group in groups:
+            self.add(*group)
+
+    def _find(self, key: str) -> str:
+        root = key
+        while self._parent.get(root, root) != root:
+            root = self._parent[root]
+        while key != root:  # path compression
+            self._parent[key], key = root, self._parent[key]
+        return root
+
+    def add(self, *codes: str) -> None:
+        keys = [course_key(code) for code in codes if code]
+        for key in keys:
+            self._parent.setdefault(key, key)
+        for key in keys[1:]:
+            root_a, root_b = self._find(keys[0]), self._find(key)
+            if root_a != root_b:
+                self._parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def canonical(self, code: str) -> str:
+        key = course_key(code)
+        return self._find(key) if key in self._parent else key
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+
+_equivalences: Optional[CourseEquivalences] = None
+_equivalences_lock = threading.Lock()
+
+
+def get_course_equivalences() -> CourseEquivalences:
+    """Process-wide table loaded from app/data/course_equivalences.json."""
+    global _equivalences
+    if _equivalences is None:
+        with _equivalences_lock:
+            if _equivalences is None:
+                groups: List[List[str]] = []
+                try:
+                    with open(DEFAULT_EQUIVALENCES_PATH) as f:
+                        groups = json.load(f).get("equivalent", [])
+                except (OSError, ValueError) as e:
+                    print(f"No course equivalences loaded: {e}")
+                _equivalences = CourseEquivalences(groups)
+    return _equivalences
+
+
+class CompletionMatcher:
+    """A student's completed courses as a set of canonical keys; every check is O(1)."""
+
+    def __init__(self, completed_courses: Optional[Iterable[str]], equivalences: Optional[CourseEquivalences] = None):
+        self.equivalences = equivalences or get_course_equivalences()
+        self._completed: Set[str] = {self.equivalences.canonical(c) for c in completed_courses or () if c and c.strip()}
+
+    def key(self, code: str) -> str:
+        return self.equivalences.canonical(code)
+
+    def is_completed(self, code: str) -> bool:
+        return self.key(code) in self._completed
+
+    def alternative_satisfiers(self, requirement_groups: Optional[List[Dict[str, Any]]]) -> Dict[str, str]:
+        """
+        canonical key -> completed course that makes it unnecessary, from agreement structure:
+        an {"any_of": [...]} item with one alternative completed, or an "Or" group with one
+        section fully completed. One pass over the groups.
+        """
+        satisfied: Dict[str, str] = {}
+        for group in requirement_groups or ():
+            section_done: List[Optional[str]] = []
+            section_keys: List[List[str]] = []
+            for section in group.get("sections", ()):
+                keys: List[str] = []
+                done_by: Optional[str] = None
+                complete = True
+                for item in section.get("courses", ()):
+                    alternatives = item["any_of"] if isinstance(item, dict) else [item]
+                    item_keys = [self.key(code) for code in alternatives]
+                    taken = next((code for code, key in zip(alternatives, item_keys) if key in self._completed), None)
+                    keys.extend(item_keys)
+                    if taken is None:
+                        complete = False
+                        continue
+                    done_by = done_by or taken
+                    for key in item_keys:
+                        if key not in self._completed:
+                            satisfied.setdefault(key, taken)
+                section_keys.append(keys)
+                section_done.append(done_by if complete and keys else None)
+            if group.get("conjunction") == "Or":
+                winner = next((done for done in section_done if done), None)
+                if winner:
+                    for keys in section_keys:
+                        for key in keys:
+                            if key not in self._completed:
+                                satisfied.setdefault(key, winner)
+        return satisfied
+
+    def choose_alternatives(self, requirement_groups: Optional[List[Dict[str, Any]]]) -> "AlternativeChoice":
+        """
+        One course per {"any_of": [...]} item and one section per "Or" group (the completed
+        one, else the first), so a plan takes each requirement once. `dropped` holds the keys of
+        the alternatives not chosen (unless another item requires them); `alternatives` maps a
+        chosen key to what could replace it ("CIS 36A", or "CIS 36A + CIS 36B" for a section).
+        """
+        chosen: Set[str] = set()
+        offered: Set[str] = set()
+        alternatives: Dict[str, List[str]] = {}
+
+        def codes_of(item: Any) -> List[str]:
+            return item["any_of"] if isinstance(item, dict) else [item]
+
+        def choose_item(item: Any) -> str:
+            codes = codes_of(item)
+            keys = [self.key(code) for code in codes]
+            offered.update(keys)
+            pick = next((i for i, key in enumerate(keys) if key in self._completed), 0)
+            chosen.add(keys[pick])
+            alternatives.setdefault(keys[pick], []).extend(code for i, code in enumerate(codes) if i != pick)
+            return keys[pick]
+
+        for group in requirement_groups or ():
+            sections = [section.get("courses") for section in group.get("sections", ()) if section.get("courses")]
+            if group.get("conjunction") != "Or" or len(sections) < 2:
+                for items in sections:
+                    for item in items:
+                        choose_item(item)
+                continue
+            done = [all(any(self.key(code) in self._completed for code in codes_of(item)) for item in items)
+                    for items in sections]
+            pick = done.index(True) if True in done else 0
+            others = []
+            for i, items in enumerate(sections):
+                if i != pick:
+                    offered.update(self.key(code) for item in items for code in codes_of(item))
+                    others.append(" + ".join(f"({' or '.join(codes_of(item))})" if isinstance(item, dict)
+                                             else item for item in items))
+            for item in sections[pick]:
+                alternatives[choose_item(item)].extend(others)
+        return AlternativeChoice(offered - chosen, {key: alts for key, alts in alternatives.items() if alts})
+
+
+class AlternativeChoice(NamedTuple):
+    dropped: Set[str]
+    alternatives: Dict[str, List[str]]
+
+
+def mark_requirements(requirements: List[Dict[str, Any]], completed_courses: Optional[Iterable[str]],
+                      requirement_groups: Optional[List[Dict[str, Any]]] = None,
+                      equivalences: Optional[CourseEquivalences] = None) -> List[Dict[str, Any]]:
+    """
+    Copies of `requirements` with "status" set to "completed", "satisfied" (an alternative in
+    the agreement was completed; see "satisfied_by") or "remaining". O(len(requirements) +
+    len(completed) + size of requirement_groups).
+    """
+    matcher = CompletionMatcher(completed_courses, equivalences)
+    satisfied = matcher.alternative_satisfiers(requirement_groups)
+    marked = []
+    for req in requirements:
+        out = {k: v for k, v in req.items() if k != "satisfied_by"}
+        code = str(req.get("code") or "")
+        key = matcher.key(code)
+        if code and key in matcher._completed:
+            out["status"] = "completed"
+        elif key in satisfied:
+            out["status"] = "satisfied"
+            out["satisfied_by"] = satisfied[key]
+        else:
+            out["status"] = "remaining"
+        marked.append(out)
+    return marked
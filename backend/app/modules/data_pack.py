@@ -0,0 +1,344 @@
+# backend/app/modules/data_pack.py
+"""
+Versioned, memory-mapped articulation data packs.
+
+A pack holds parsed agreements keyed by (sending institution, receiving institution, academic
+year, major) and is read straight out of an mmap, so loading one costs page-cache pages rather
+than Python objects. Build one from the seed JSON and/or the local ASSIST store (from backend/):
+
+    python -m app.modules.data_pack build --seed app/data/seed_agreements.json --from-store
+    python -m app.modules.data_pack info
+
+Layout (little-endian):
+
+    header      HEADER
+    strings     u32 offsets[string_count + 1] into the string blob
+    agreements  AGREEMENT * agreement_count, sorted by (sending, receiving, year, major)
+    courses     COURSE * course_count, each agreement's courses contiguous
+    blob        UTF-8 strings, interned and sorted, so string ids order like the strings do
+
+An agreement's requirement_groups (the any_of / "Or" structure the flat course lists lose) are
+stored as one compact JSON string. Agreements built without them are marked NO_GROUPS and are
+not served, since every alternative would otherwise read as a separate requirement.
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.modules.major_index import MajorIndex
+
+MAGIC = b"ACPK"
+FORMAT_VERSION = 2
+
+# magic, format version, flags, string count, agreement count, course count, built_at, content digest
+HEADER = struct.Struct("<4sHHIIId16s")
+# sending, receiving, year, major key, agreement name (string ids), first course, course count,
+# requirement_groups JSON (string id, or NO_GROUPS)
+AGREEMENT = struct.Struct("<8I")
+# code, title (string ids), units * 100, kind
+COURSE = struct.Struct("<IIHBx")
+OFFSET = struct.Struct("<I")
+
+KIND_REQUIRED = 1
+KIND_RECOMMENDED = 2
+NO_GROUPS = 0xFFFFFFFF
+
+# Packs answer without the network, so they only take confident major matches; anything
+# weaker falls through to the live API.
+PACK_MIN_SCORE = 0.6
+
+DEFAULT_PACK_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "articulation.pack")
+DEFAULT_SEED_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "seed_agreements.json")
+
+
+def pack_key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+class _KeyView:
+    """Sequence of agreement sort keys read lazily from the mmap, for bisect."""
+
+    def __init__(self, pack: "DataPack"):
+        self.pack = pack
+
+    def __len__(self) -> int:
+        return self.pack.agreement_count
+
+    def __getitem__(self, idx: int) -> Tuple[int, int, int, int]:
+        return self.pack._agreement(idx)[:4]
+
+
+class _StringView:
+    def __init__(self, pack: "DataPack"):
+        self.pack = pack
+
+    def __len__(self) -> int:
+        return self.pack.string_count
+
+    def __getitem__(self, idx: int) -> str:
+        return self.pack.string(idx)
+
+
+class DataPack:
+    """Read-only view over a pack file; nothing is decoded until a lookup touches it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            raise ValueError(f"{path}: too small to be a data pack")
+        magic, version, _, self.string_count, self.agreement_count, self.course_count, self.built_at, digest = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not an articulation data pack")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: pack format v{version}, this build reads v{FORMAT_VERSION}")
+        self.format_version = version
+        self.digest = digest.hex()
+        self._offsets_at = HEADER.size
+        self._agreements_at = self._offsets_at + OFFSET.size * (self.string_count + 1)
+        self._courses_at = self._agreements_at + AGREEMENT.size * self.agreement_count
+        self._blob_at = self._courses_at + COURSE.size * self.course_count
+        if len(self._mm) < self._blob_at + self._string_offset(self.string_count):
+            raise ValueError(f"{path}: truncated data pack")
+        self._indexes: Dict[Tuple[int, int, int], Tuple[List[int], MajorIndex]] = {}
+        self._lock = threading.Lock()
+
+    # --- Raw access ---
+    def _string_offset(self, sid: int) -> int:
+        return OFFSET.unpack_from(self._mm, self._offsets_at + OFFSET.size * sid)[0]
+
+    def string(self, sid: int) -> str:
+        start = self._blob_at + self._string_offset(sid)
+        end = self._blob_at + self._string_offset(sid + 1)
+        return str(self._mm[start:end], "utf-8")
+
+    def string_id(self, value: str) -> Optional[int]:
+        strings = _StringView(self)
+        idx = bisect.bisect_left(strings, value)
+        return idx if idx < self.string_count and strings[idx] == value else None
+
+    def _agreement(self, idx: int) -> Tuple[int, ...]:
+        return AGREEMENT.unpack_from(self._mm, self._agreements_at + AGREEMENT.size * idx)
+
+    def _courses(self, start: int, count: int) -> Iterator[Tuple[int, int, int, int]]:
+        for i in range(start, start + count):
+            yield COURSE.unpack_from(self._mm, self._courses_at + COURSE.size * i)
+
+    @property
+    def version(self) -> Dict[str, Any]:
+        return {"format_version": self.format_version, "digest": self.digest, "built_at": self.built_at,
+                "agreements": self.agreement_count, "courses": self.course_count, "strings": self.string_count}
+
+    # --- Lookups ---
+    def agreement(self, idx: int) -> Dict[str, Any]:
+        """
+        Agreement `idx` in the shape parse_agreement_response returns. "requirement_groups" is
+        left out when the agreement was packed without them.
+        """
+        _, _, year, _, name, course_start, course_count, groups = self._agreement(idx)
+        required, recommended = [], []
+        for code, title, units, kind in self._courses(course_start, course_count):
+            course = {"code": self.string(code), "title": self.string(title), "units": units / 100}
+            (required if kind == KIND_REQUIRED else recommended).append(course)
+        agreement = {"data_available": True, "required_courses": required, "recommended_courses": recommended,
+                     "year": self.string(year), "agreement_name": self.string(name)}
+        if groups != NO_GROUPS:
+            agreement["requirement_groups"] = json.loads(self.string(groups))
+        return agreement
+
+    def _pathway_range(self, sending: str, receiving: str) -> Tuple[int, int]:
+        send_id, recv_id = self.string_id(pack_key(sending)), self.string_id(pack_key(receiving))
+        if send_id is None or recv_id is None:
+            return 0, 0
+        keys = _KeyView(self)
+        return bisect.bisect_left(keys, (send_id, recv_id)), bisect.bisect_left(keys, (send_id, recv_id + 1))
+
+    def _major_index(self, send_id: int, recv_id: int, year_id: int, rows: List[int]) -> MajorIndex:
+        with self._lock:
+            cached = self._indexes.get((send_id, recv_id, year_id))
+            if cached is None:
+                majors = [{"key": idx, "name": self.string(self._agreement(idx)[4])} for idx in rows]
+                cached = self._indexes[(send_id, recv_id, year_id)] = (rows, MajorIndex(majors))
+            return cached[1]
+
+    def find(self, sending: str, receiving: str, major: str, year: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Best packed agreement for a pathway, matching `major` with the same token index the API
+        path uses. Without `year`, the newest packed year is used. Returns None if not packed.
+        """
+        start, end = self._pathway_range(sending, receiving)
+        if start == end:
+            return None
+        rows = [(self._agreement(idx), idx) for idx in range(start, end)]
+        if year is not None:
+            year_id = self.string_id(year)
+        else:
+            year_id = max(record[2] for record, _ in rows)
+        rows_for_year = [idx for record, idx in rows if record[2] == year_id]
+        if not rows_for_year:
+            return None
+        send_id, recv_id = rows[0][0][0], rows[0][0][1]
+        candidates = self._major_index(send_id, recv_id, year_id, rows_for_year).search(major, k=1)
+        if not candidates or candidates[0]["score"] < PACK_MIN_SCORE:
+            return None
+        return self.agreement(candidates[0]["key"])
+
+    def pathways(self) -> Iterator[Dict[str, str]]:
+        for idx in range(self.agreement_count):
+            sending, receiving, year, major, *_, groups = self._agreement(idx)
+            yield {"sending": self.string(sending), "receiving": self.string(receiving),
+                   "year": self.string(year), "major": self.string(major), "has_groups": groups != NO_GROUPS}
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+# --- Builder ---
+def build_pack(agreements: Iterable[Dict[str, Any]], path: str) -> Dict[str, Any]:
+    """
+    Writes a pack from agreement dicts with "sending", "receiving", "year", "major" (or
+    "agreement_name"), "required_courses", "recommended_courses" and "requirement_groups"
+    (agreements without it are packed as NO_GROUPS). Later duplicates of a key replace
+    earlier ones. The file is replaced atomically, so mapped readers keep the old one.
+    """
+    by_key: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
+    for agreement in agreements:
+        name = agreement.get("major") or agreement.get("agreement_name") or ""
+        key = (pack_key(agreement["sending"]), pack_key(agreement["receiving"]), str(agreement["year"]), pack_key(name))
+        groups = agreement.get("requirement_groups")
+        by_key[key] = dict(agreement, agreement_name=agreement.get("agreement_name") or name,
+                           groups_json=None if groups is None else json.dumps(groups, separators=(",", ":")))
+
+    strings = set()
+    for key, agreement in by_key.items():
+        strings.update(key)
+        strings.add(agreement["agreement_name"])
+        if agreement["groups_json"] is not None:
+            strings.add(agreement["groups_json"])
+        for course in agreement.get("required_courses", []) + agreement.get("recommended_courses", []):
+            strings.update((course["code"], course.get("title") or ""))
+    string_list = sorted(strings)
+    sid = {value: i for i, value in enumerate(string_list)}
+
+    offsets, blob = [0], bytearray()
+    for value in string_list:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    agreement_rows, course_rows = bytearray(), bytearray()
+    course_count = 0
+    for key in sorted(by_key, key=lambda k: tuple(sid[part] for part in k)):
+        agreement = by_key[key]
+        courses = [(c, KIND_REQUIRED) for c in agreement.get("required_courses", [])] + \
+                  [(c, KIND_RECOMMENDED) for c in agreement.get("recommended_courses", [])]
+        groups = NO_GROUPS if agreement["groups_json"] is None else sid[agreement["groups_json"]]
+        agreement_rows += AGREEMENT.pack(sid[key[0]], sid[key[1]], sid[key[2]], sid[key[3]],
+                                         sid[agreement["agreement_name"]], course_count, len(courses), groups)
+        for course, kind in courses:
+            units = int(round(float(course.get("units") or 0) * 100))
+            course_rows += COURSE.pack(sid[course["code"]], sid[course.get("title") or ""], units, kind)
+        course_count += len(courses)
+
+    body = b"".join(OFFSET.pack(o) for o in offsets) + bytes(agreement_rows) + bytes(course_rows) + bytes(blob)
+    digest = hashlib.blake2b(body, digest_size=16).digest()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(string_list), len(by_key), course_count, time.time(), digest)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header + body)
+    os.replace(tmp_path, path)
+    missing = sum(agreement["groups_json"] is None for agreement in by_key.values())
+    if missing:
+        print(f"{missing} agreement(s) have no requirement_groups and won't be served from the pack.")
+    summary = {"path": path, "agreements": len(by_key), "courses": course_count, "strings": len(string_list),
+               "bytes": len(header) + len(body), "digest": digest.hex()}
+    print(f"Built data pack: {summary}")
+    return summary
+
+
+def load_seed_agreements(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return json.load(f)["agreements"]
+
+
+def store_agreements(store=None) -> List[Dict[str, Any]]:
+    """Parsed agreements from the local ASSIST store, named via the stored institutions list."""
+    from app.modules.assist_store import get_assist_store
+    store = store or get_assist_store()
+    institutions = (store.lookup("institutions", "all") or (None, None, None))[0] or []
+    names = {inst["id"]: inst["name"] for inst in institutions}
+    agreements = []
+    for key in store.keys("agreement"):
+        entry = store.lookup("agreement", key)
+        year_id, sending_id, _, receiving_id, _ = key.split("/", 4)
+        if entry is None or not entry.payload.get("data_available"):
+            continue
+        sending, receiving = names.get(int(sending_id)), names.get(int(receiving_id))
+        if not sending or not receiving:
+            continue
+        agreements.append(dict(entry.payload, sending=sending, receiving=receiving))
+    return agreements
+
+
+# --- Process-wide pack ---
+_pack: Optional[DataPack] = None
+_pack_loaded = False
+_pack_lock = threading.Lock()
+
+
+def get_data_pack() -> Optional[DataPack]:
+    """The mapped pack at settings.DATA_PACK_PATH, or None if there is no usable pack."""
+    global _pack, _pack_loaded
+    if not _pack_loaded:
+        with _pack_lock:
+            if not _pack_loaded:
+                path = settings.DATA_PACK_PATH or DEFAULT_PACK_PATH
+                try:
+                    _pack = DataPack(path)
+                    print(f"Mapped articulation data pack {path}: {_pack.version}")
+                except (OSError, ValueError) as e:
+                    print(f"No articulation data pack loaded: {e}")
+                _pack_loaded = True
+    return _pack
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or inspect articulation data packs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Build a pack from seed JSON files and/or the local ASSIST store")
+    build.add_argument("--seed", nargs="*", default=[DEFAULT_SEED_PATH], help="Seed JSON files")
+    build.add_argument("--from-store", action="store_true", help="Include agreements cached in the ASSIST store")
+    build.add_argument("--out", default=DEFAULT_PACK_PATH, help="Output pack path")
+    info = sub.add_parser("info", help="Print a pack's version and pathways")
+    info.add_argument("path", nargs="?", default=DEFAULT_PACK_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        agreements: List[Dict[str, Any]] = []
+        for seed_path in args.seed:
+            agreements.extend(load_seed_agreements(seed_path))
+        if args.from_store:
+            agreements.extend(store_agreements())
+        build_pack(agreements, args.out)
+    else:
+        pack = DataPack(args.path)
+        print(json.dumps(pack.version, indent=2))
+        for pathway in pack.pathways():
+            note = "" if pathway["has_groups"] else "  (no requirement groups; not served)"
+            print(f"  {pathway['year']}  {pathway['sending']} -> {pathway['receiving']}: {pathway['major']}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# backend/app/modules/fingerprints.py
+"""
+Canonical fingerprints of request inputs, so requests that differ only in spelling, casing,
+ordering or abbreviations share coalescing and cache keys.
+"""
+
+import hashlib
+import json
+from typing import Any, Iterable, List, Optional
+
+from app.modules.course_codes import course_key
+from app.modules.institution_resolver import INSTITUTION_ALIASES
+from app.modules.major_index import tokenize_major
+
+
+def canonical_institution(name: Optional[str]) -> str:
+    name = " ".join((name or "").lower().split())
+    return INSTITUTION_ALIASES.get(name, name)
+
+
+def canonical_major(name: Optional[str]) -> str:
+    return " ".join(sorted(set(tokenize_major(name or ""))))
+
+
+def canonical_course_codes(codes: Optional[Iterable[str]]) -> List[str]:
+    return sorted({course_key(code) for code in codes or () if code and code.strip()})
+
+
+def fingerprint(kind: str, **parts: Any) -> str:
+    """Stable digest of `parts` (JSON with sorted keys), prefixed with `kind` for readability."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{kind}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]}"
+
+
+def transfer_fingerprint(source_institution: str, target_institution: str, major: str,
+                         academic_year: Optional[str] = None, mode: str = "api") -> str:
+    """Identity of a requirements lookup. Completed courses are applied per caller, so they are not part of it."""
+    return fingerprint("transfer", source=canonical_institution(source_institution),
+                       target=canonical_institution(target_institution), major=canonical_major(major),
+                       year=(academic_year or "").strip(), mode=mode)
+
+
+def schedule_fingerprint(completed_courses: Optional[Iterable[str]], target_major: str, target_institution: str,
+                         academic_year: str, unit_range: Optional[List[int]] = None,
+                         preferred_times: Optional[List[str]] = None, origin_institution: Optional[str] = None,
+                         prompt_mode: Optional[str] = None, planner: Optional[str] = None,
+                         current_gpa: Optional[float] = None) -> str:
+    """
+    Identity of a schedule request, built from the inputs the prompt is built from. `planner`
+    and `current_gpa` only matter to the local solver, so Sonar cache keys leave them out.
+    """
+    return fingerprint("schedule", completed=canonical_course_codes(completed_courses),
+                       major=canonical_major(target_major), institution=canonical_institution(target_institution),
+                       year=(academic_year or "").strip(), units=list(unit_range or []),
+                       times=sorted(t.strip().lower() for t in preferred_times or ()),
+                       origin=canonical_institution(origin_institution), prompt=prompt_mode or "",
+                       **({"planner": planner, "gpa": current_gpa} if planner else {}))
@@ -0,0 +1,189 @@
+# backend/app/modules/institution_resolver.py
+
+import hashlib
+import json
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Common aliases and abbreviations, mapped to the official ASSIST name.
+INSTITUTION_ALIASES: Dict[str, str] = {
+    "uc berkeley": "university of california, berkeley",
+    "berkeley": "university of california, berkeley",
+    "ucb": "university of california, berkeley",
+    "ucla": "university of california, los angeles",
+    "uc davis": "university of california, davis",
+    "ucd": "university of california, davis",
+    "uc irvine": "university of california, irvine",
+    "uci": "university of california, irvine",
+    "uc san diego": "university of california, san diego",
+    "ucsd": "university of california, san diego",
+    "uc santa barbara": "university of california, santa barbara",
+    "ucsb": "university of california, santa barbara",
+    "uc santa cruz": "university of california, santa cruz",
+    "ucsc": "university of california, santa cruz",
+    "uc riverside": "university of california, riverside",
+    "ucr": "university of california, riverside",
+    "uc merced": "university of california, merced",
+    "de anza": "de anza college",
+    "foothill": "foothill college",
+    "san jose city": "san jose city college",
+    "sjcc": "san jose city college",
+    "sjsu": "san jose state university",
+    "san jose state": "san jose state university",
+}
+
+# Minimum trigram similarity for a fuzzy match to count as a resolution.
+FUZZY_THRESHOLD = 0.55
+
+_PUNCTUATION = re.compile(r"[^a-z0-9 ]+")
+_SPACES = re.compile(r"\s+")
+
+
+def clean_institution_name(name: str) -> str:
+    """Lowercases, drops punctuation and collapses whitespace ("U.C. Berkeley" -> "uc berkeley")."""
+    name = name.lower().replace("&", " and ").replace(".", "")
+    name = _PUNCTUATION.sub(" ", name)
+    name = _SPACES.sub(" ", name).strip()
+    if name.startswith("the "):
+        name = name[4:]
+    return name
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def institutions_fingerprint(institutions: List[Dict[str, Any]]) -> str:
+    """Stable hash of the identifying fields of an institution list."""
+    digest = hashlib.sha1()
+    for inst in sorted(institutions, key=lambda i: i.get("id") or 0):
+        digest.update(json.dumps([inst.get("id"), inst.get("code"), inst.get("all_names")]).encode())
+    return digest.hexdigest()
+
+
+class InstitutionResolver:
+    """
+    Name/code -> institution lookup built once from fetch_institutions_api output.
+    Exact hits (normalized names, historical names, codes, aliases) are a single dict probe;
+    everything else goes through a trigram index ranked by Dice similarity.
+    """
+
+    def __init__(self, institutions: List[Dict[str, Any]]):
+        self.institutions = institutions
+        self.fingerprint = institutions_fingerprint(institutions)
+        self._exact: Dict[str, int] = {}
+        # Fuzzy candidates: (cleaned name, institution index, trigram count)
+        self._names: List[Tuple[str, int, int]] = []
+        self._trigram_index: Dict[str, List[int]] = defaultdict(list)
+
+        for idx, inst in enumerate(institutions):
+            names = set(inst.get("all_names") or [])
+            names.add(inst.get("name") or "")
+            for raw in names:
+                cleaned = clean_institution_name(raw)
+                if not cleaned:
+                    continue
+                self._exact.setdefault(cleaned, idx)
+                self._index_fuzzy(cleaned, idx)
+            code = clean_institution_name(inst.get("code") or "")
+            if code:
+                self._exact.setdefault(code, idx)
+
+        for alias, full_name in INSTITUTION_ALIASES.items():
+            target = self._exact.get(clean_institution_name(full_name))
+            if target is not None:
+                cleaned_alias = clean_institution_name(alias)
+                self._exact.setdefault(cleaned_alias, target)
+                self._index_fuzzy(cleaned_alias, target)
+
+    def _index_fuzzy(self, cleaned: str, inst_idx: int) -> None:
+        grams = _trigrams(cleaned)
+        name_id = len(self._names)
+        self._names.append((cleaned, inst_idx, len(grams)))
+        for gram in grams:
+            self._trigram_index[gram].append(name_id)
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, Dict[str, Any]]]:
+        """Ranked (score, institution) candidates; an exact hit scores 1.0."""
+        cleaned = clean_institution_name(query)
+        if not cleaned:
+            return []
+        exact = self._exact.get(cleaned)
+        if exact is not None:
+            return [(1.0, self.institutions[exact])]
+
+        query_grams = _trigrams(cleaned)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for name_id in self._trigram_index.get(gram, ()):
+                shared[name_id] += 1
+
+        best: Dict[int, float] = {}
+        for name_id, count in shared.items():
+            _, inst_idx, gram_count = self._names[name_id]
+            score = 2.0 * count / (len(query_grams) + gram_count)
+            if score > best.get(inst_idx, 0.0):
+                best[inst_idx] = score
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(round(score, 3), self.institutions[idx]) for idx, score in ranked]
+
+    def resolve(self, query: str) -> Optional[Dict[str, Any]]:
+        """Best institution for `query`, or None when nothing is similar enough."""
+        candidates = self.search(query, limit=1)
+        if candidates and candidates[0][0] >= FUZZY_THRESHOLD:
+            return candidates[0][1]
+        return None
+
+
+_resolver: Optional[InstitutionResolver] = None
+_resolver_source: Optional[List[Dict[str, Any]]] = None
+_rebuilding = False
+_resolver_lock = threading.Lock()
+
+
+def _install(institutions: List[Dict[str, Any]]) -> InstitutionResolver:
+    global _resolver, _resolver_source
+    resolver = InstitutionResolver(institutions)
+    _resolver, _resolver_source = resolver, institutions
+    return resolver
+
+
+def _rebuild_in_background(institutions: List[Dict[str, Any]]) -> None:
+    global _rebuilding
+    try:
+        _install(institutions)
+        print(f"Rebuilt institution resolver ({len(institutions)} institutions).")
+    except Exception as e:
+        print(f"Institution resolver rebuild failed: {e}")
+    finally:
+        _rebuilding = False
+
+
+def get_institution_resolver(institutions: List[Dict[str, Any]]) -> InstitutionResolver:
+    """
+    Returns the shared resolver for `institutions`. The first call builds it inline; when a
+    different institution list shows up later, the current resolver keeps answering while a
+    replacement is built in the background.
+    """
+    global _resolver_source, _rebuilding
+    resolver = _resolver
+    if resolver is not None and institutions is _resolver_source:
+        return resolver
+    if resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                return _install(institutions)
+            return _resolver
+
+    if institutions_fingerprint(institutions) == resolver.fingerprint:
+        _resolver_source = institutions
+        return resolver
+    with _resolver_lock:
+        if not _rebuilding:
+            _rebuilding = True
+            threading.Thread(target=_rebuild_in_background, args=(institutions,), daemon=True,
+                             name="institution-resolver-rebuild").start()
+    return resolver
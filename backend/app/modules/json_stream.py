@@ -0,0 +1,88 @@
+# backend/app/modules/json_stream.py
+
+import json
+from typing import Any, Dict, List, Optional
+
+
+class ArrayItemStream:
+    """
+    Incremental scanner for a streamed JSON object: feed() it text as it arrives and it returns
+    each element of the top-level `array_key` array as soon as that element's closing brace
+    (or bracket) arrives. Text before the first "{" (a stray ``` fence, a preamble) is ignored.
+
+    The scanner only tracks string/escape state and nesting depth, so each character is looked
+    at once; complete elements are decoded with json.loads. `text` keeps everything from the
+    opening brace on, for decoding the whole document at the end.
+    """
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self.text = ""
+        self.done = False
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._top_key: Optional[str] = None
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        if self.done or not chunk:
+            return []
+        if not self.text:
+            brace = chunk.find("{")
+            if brace < 0:
+                return []
+            chunk = chunk[brace:]
+        self.text += chunk
+
+        items: List[Any] = []
+        text, stack = self.text, self._stack
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(stack) == 1:
+                        self._last_key = text[self._string_start + 1:i]
+                continue
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":" and len(stack) == 1:
+                self._top_key = self._last_key
+            elif ch in "{[":
+                if len(stack) == 2 and stack[1] == "[" and self._top_key == self.array_key:
+                    self._item_start = i
+                stack.append(ch)
+            elif ch in "}]":
+                if stack:
+                    stack.pop()
+                if len(stack) == 2 and self._item_start is not None:
+                    try:
+                        items.append(json.loads(text[self._item_start:i + 1]))
+                    except json.JSONDecodeError as e:
+                        print(f"Skipping malformed streamed {self.array_key} element: {e}")
+                    self._item_start = None
+                elif not stack:
+                    self.done = True
+                    self.text = text[:i + 1]
+                    break
+        self._pos = len(self.text)
+        return items
+
+    def document(self) -> Optional[Dict[str, Any]]:
+        """The full object once it has closed, or None if it never did or doesn't decode."""
+        if not self.done:
+            return None
+        try:
+            parsed = json.loads(self.text)
+        except json.JSONDecodeError:
+            return None
+        return parsed if isinstance(parsed, dict) else None
@@ -0,0 +1,269 @@
+# backend/app/modules/llm_json.py
+"""
+Tolerant decoding of JSON written by an LLM: the object is dug out of code fences or prose,
+trailing commas are dropped, truncated output is closed off, and the result is validated
+against the schedule schema element by element, so one bad course doesn't cost the plan.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.S)
+_STRING = r'"(?:[^"\\]|\\.)*"'
+# a trailing member whose value is missing or may be cut off ("units": 4 could have been 4.5)
+_DANGLING_MEMBER = re.compile(r",?\s*" + _STRING + r"\s*:\s*[-+.\w]*$")
+_DANGLING_KEY = re.compile(r"([{,])\s*" + _STRING + r"$")
+_DANGLING_SCALAR = re.compile(r",?\s*[-+.\w]+$")
+MISSING_QUARTERS = "missing or invalid 'quarters'"
+
+
+class ExtractedJson(NamedTuple):
+    value: Any
+    diagnostics: List[str]
+    truncated: bool
+
+
+def _strip_trailing_commas(text: str) -> Tuple[str, int]:
+    """Removes commas that directly precede a closing brace/bracket (outside strings)."""
+    out: List[str] = []
+    removed = 0
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch in "}]":
+            j = len(out) - 1
+            while j >= 0 and out[j].isspace():
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+                removed += 1
+        elif ch == '"':
+            in_string = True
+        out.append(ch)
+    return "".join(out), removed
+
+
+def _scan(text: str, start: int):
+    """
+    Walks one JSON value from `start`. Returns (end index or None if it never closes, open
+    stack, start of the unterminated string or None, checkpoints). A checkpoint is (index just
+    past a closed container element, stack at that point), for falling back to the last whole element.
+    """
+    stack: List[str] = []
+    in_string = escape = False
+    string_start = 0
+    checkpoints: List[Tuple[int, List[str]]] = []
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string, string_start = True, i
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return i + 1, stack, None, checkpoints
+            checkpoints.append((i + 1, list(stack)))
+    return None, stack, string_start if in_string else None, checkpoints
+
+
+def _close(fragment: str, stack: List[str]) -> str:
+    """
+    Closes a truncated fragment: drops the one dangling key or cut-off value at its end, then
+    closes the containers. A comma left in front of a closing bracket is removed later by
+    _strip_trailing_commas; complete values before it are kept.
+    """
+    trimmed = fragment.rstrip()
+    if stack and stack[-1] == "{":
+        member = _DANGLING_MEMBER.sub("", trimmed, count=1)
+        trimmed = member if member != trimmed else _DANGLING_KEY.sub(r"\1", trimmed, count=1)
+    elif stack and stack[-1] == "[" and not trimmed.endswith(("[", "}", "]", '"', ",")):
+        trimmed = _DANGLING_SCALAR.sub("", trimmed, count=1)
+    return trimmed + "".join("}" if c == "{" else "]" for c in reversed(stack))
+
+
+def extract_json_object(text: str) -> ExtractedJson:
+    """
+    The first JSON object in `text`, repaired where needed. Raises ValueError if there is no
+    object to salvage. Diagnostics say what had to be fixed.
+    """
+    diagnostics: List[str] = []
+    source = text or ""
+    try:
+        value = json.loads(source)
+    except json.JSONDecodeError:
+        pass
+    else:
+        if isinstance(value, str):
+            # the model sometimes double-encodes the object as a JSON string
+            inner = extract_json_object(value)
+            return ExtractedJson(inner.value, ["decoded JSON nested in a string"] + inner.diagnostics, inner.truncated)
+        if isinstance(value, dict):
+            return ExtractedJson(value, diagnostics, False)
+
+    fence = _FENCE.search(source)
+    if fence and "{" in fence.group(1):
+        source = fence.group(1)
+        diagnostics.append("stripped markdown code fence")
+
+    start = source.find("{")
+    if start < 0:
+        raise ValueError(f"No JSON object in Sonar response:\n{text}")
+    if source[:start].strip():
+        diagnostics.append(f"skipped {len(source[:start].strip())} characters of text before the JSON")
+
+    end, stack, open_string, checkpoints = _scan(source, start)
+    truncated = end is None
+    if truncated:
+        # cut back to the last complete element (a partial course code or term is worse than none);
+        # with no complete element yet, close what there is minus any cut-off string or value
+        candidates = [(_close(source[start:index], saved), "dropped a truncated trailing element")
+                      for index, saved in reversed(checkpoints)]
+        tail_end = open_string if open_string is not None else len(source)
+        candidates.append((_close(source[start:tail_end], stack), "closed truncated output"))
+    else:
+        if source[end:].strip():
+            diagnostics.append("ignored text after the JSON")
+        candidates = [(source[start:end], None)]
+
+    for candidate, fix in candidates:
+        cleaned, commas = _strip_trailing_commas(candidate)
+        try:
+            value = json.loads(cleaned)
+        except json.JSONDecodeError:
+            continue
+        if commas:
+            diagnostics.append(f"removed {commas} trailing comma(s)")
+        if fix:
+            diagnostics.append(fix)
+        return ExtractedJson(value, diagnostics, truncated)
+    raise ValueError(f"Failed to JSON-decode Sonar response:\n{text}")
+
+
+# --- Schedule schema ---
+
+class CourseItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    code: str
+    title: Optional[str] = None
+    units: Optional[float] = None
+    no_articulation: bool = False
+    must_take_at_university: bool = False
+
+
+class QuarterItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    term: str
+    courses: List[Dict[str, Any]] = []
+
+
+class WarningItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    term: Optional[str] = None
+    code: Optional[str] = None
+    message: str
+
+
+def _error_summary(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'value'}: {err['msg']}" for err in e.errors())
+
+
+def validate_course(raw: Any, where: str, diagnostics: List[str]) -> Optional[Dict[str, Any]]:
+    try:
+        return CourseItem.model_validate(raw).model_dump()
+    except ValidationError as e:
+        if isinstance(raw, dict) and raw.get("code") and "units" in raw:
+            # keep the course; units like "4-5" are the usual culprit
+            try:
+                course = CourseItem.model_validate(dict(raw, units=None)).model_dump()
+                diagnostics.append(f"{where}: unreadable units {raw.get('units')!r} for {raw['code']}")
+                return course
+            except ValidationError:
+                pass
+        diagnostics.append(f"{where}: dropped course ({_error_summary(e)})")
+        return None
+
+
+def validate_quarter(raw: Any, where: str, diagnostics: List[str]) -> Optional[Dict[str, Any]]:
+    """A schema-checked quarter with invalid courses dropped, or None if the quarter itself is unusable."""
+    try:
+        quarter = QuarterItem.model_validate(raw).model_dump()
+    except ValidationError as e:
+        diagnostics.append(f"{where}: dropped quarter ({_error_summary(e)})")
+        return None
+    courses = [validate_course(c, f"{where} ({quarter['term']})", diagnostics) for c in quarter["courses"]]
+    quarter["courses"] = [c for c in courses if c is not None]
+    return quarter
+
+
+def validate_schedule_payload(value: Any, diagnostics: List[str]) -> Dict[str, Any]:
+    """
+    Coerces a decoded Sonar answer to {"quarters", "warnings", "reminder_to_meet_counselor",
+    "citations"}, keeping every valid element and noting each one it had to drop.
+    """
+    if not isinstance(value, dict):
+        raise ValueError(f"Unexpected Sonar response type: {type(value)}, content:\n{value}")
+    payload = dict(value)
+    quarters = value.get("quarters")
+    if not isinstance(quarters, list):
+        diagnostics.append(MISSING_QUARTERS)
+        quarters = []
+    payload["quarters"] = [q for q in (validate_quarter(raw, f"quarters[{i}]", diagnostics)
+                                       for i, raw in enumerate(quarters)) if q is not None]
+    warnings = []
+    for i, raw in enumerate(value.get("warnings") or []):
+        try:
+            warnings.append(WarningItem.model_validate(raw).model_dump())
+        except ValidationError as e:
+            diagnostics.append(f"warnings[{i}]: dropped ({_error_summary(e)})")
+    payload["warnings"] = warnings
+    payload["reminder_to_meet_counselor"] = bool(value.get("reminder_to_meet_counselor", False))
+    citations = value.get("citations")
+    if citations is not None:
+        payload["citations"] = [c for c in citations if isinstance(c, str)] if isinstance(citations, list) else []
+    return payload
+
+
+def parse_schedule_content(raw: str) -> Dict[str, Any]:
+    """
+    Decodes and validates a schedule completion. The payload carries "diagnostics" (what was
+    repaired or dropped) and "truncated" when anything needed fixing; ValueError only if no
+    JSON object can be recovered at all.
+    """
+    extracted = extract_json_object(raw)
+    diagnostics = list(extracted.diagnostics)
+    payload = validate_schedule_payload(extracted.value, diagnostics)
+    if diagnostics:
+        payload["diagnostics"] = diagnostics
+    if extracted.truncated:
+        payload["truncated"] = True
+    return payload
+
+
+def is_complete_schedule(payload: Dict[str, Any]) -> bool:
+    """
+    Whether a parsed schedule is worth caching: not truncated, "quarters" present, and at least
+    one quarter survived validation. A reply like {"note": "sorry"} parses, but isn't a plan.
+    """
+    return (not payload.get("truncated") and MISSING_QUARTERS not in payload.get("diagnostics", ())
+            and bool(payload.get("quarters")))
@@ -0,0 +1,190 @@
+# backend/app/modules/major_index.py
+
+import bisect
+import math
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Abbreviations students actually type, expanded before matching.
+MAJOR_ABBREVIATIONS: Dict[str, str] = {
+    "cs": "computer science",
+    "compsci": "computer science",
+    "comp sci": "computer science",
+    "cse": "computer science engineering",
+    "eecs": "electrical engineering computer science",
+    "ee": "electrical engineering",
+    "me": "mechanical engineering",
+    "mech": "mechanical",
+    "civ": "civil",
+    "engr": "engineering",
+    "eng": "engineering",
+    "math": "mathematics",
+    "maths": "mathematics",
+    "stats": "statistics",
+    "stat": "statistics",
+    "ds": "data science",
+    "phys": "physics",
+    "chem": "chemistry",
+    "biochem": "biochemistry",
+    "bio": "biology",
+    "mcb": "molecular cell biology",
+    "neuro": "neuroscience",
+    "psych": "psychology",
+    "econ": "economics",
+    "poli sci": "political science",
+    "polisci": "political science",
+    "anthro": "anthropology",
+    "soc": "sociology",
+    "phil": "philosophy",
+    "hist": "history",
+    "lit": "literature",
+    "comm": "communication",
+    "env": "environmental",
+    "bus": "business",
+    "biz": "business",
+    "admin": "administration",
+}
+
+# Degree labels and filler words that carry no meaning for matching.
+STOPWORDS = frozenset({
+    "a", "an", "and", "of", "the", "in", "for", "with", "to", "major", "degree", "program",
+    "ba", "bs", "ab", "bfa", "bsc", "lower", "division", "option", "emphasis", "concentration",
+})
+
+# A runner-up within this fraction of the best score makes the query ambiguous.
+AMBIGUITY_RATIO = 0.85
+# Best scores below this are treated as "not found".
+MIN_SCORE = 0.3
+# Weight of a prefix hit ("comp" -> "computer") relative to an exact token hit.
+PREFIX_WEIGHT = 0.7
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _stem(token: str) -> str:
+    """Light plural stripping so "sciences"/"science" and "studies"/"study" collide."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize_major(name: str) -> List[str]:
+    """Lowercase, strip degree labels, expand abbreviations and stem."""
+    text = name.lower().replace(".", "").replace("&", " and ")
+    words = _TOKEN.findall(text)
+    expanded: List[str] = []
+    i = 0
+    while i < len(words):
+        pair = f"{words[i]} {words[i + 1]}" if i + 1 < len(words) else None
+        if pair and pair in MAJOR_ABBREVIATIONS:
+            expanded.extend(MAJOR_ABBREVIATIONS[pair].split())
+            i += 2
+            continue
+        expanded.extend(MAJOR_ABBREVIATIONS.get(words[i], words[i]).split())
+        i += 1
+    return [_stem(w) for w in expanded if w not in STOPWORDS]
+
+
+class MajorIndex:
+    """
+    Token index over one institution pair's major agreements. Scores are IDF-weighted
+    overlap between query and major tokens, so word order and degree labels don't matter
+    and rare words ("applied") outweigh common ones ("science").
+    """
+
+    def __init__(self, majors: List[Dict[str, Any]]):
+        self.majors = majors
+        self._tokens: List[frozenset] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for idx, major in enumerate(majors):
+            tokens = frozenset(tokenize_major(major.get("name", "")))
+            self._tokens.append(tokens)
+            for token in tokens:
+                self._postings[token].append(idx)
+        total = max(len(majors), 1)
+        self._idf: Dict[str, float] = {t: math.log(1.0 + total / len(ids)) for t, ids in self._postings.items()}
+        self._vocabulary: List[str] = sorted(self._postings)
+
+    def _prefix_matches(self, token: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, token)
+        matches = []
+        for word in self._vocabulary[start:]:
+            if not word.startswith(token):
+                break
+            matches.append(word)
+        return matches
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Top-k {"key", "name", "score"} candidates, best first."""
+        query_tokens = set(tokenize_major(query))
+        if not query_tokens:
+            return []
+
+        # per candidate: query token -> (weight, major token it matched)
+        hits: Dict[int, Dict[str, Tuple[float, str]]] = defaultdict(dict)
+        for token in query_tokens:
+            if token in self._postings:
+                for idx in self._postings[token]:
+                    hits[idx][token] = (self._idf[token], token)
+                continue
+            if len(token) < 3:
+                continue
+            for word in self._prefix_matches(token):
+                weight = self._idf[word] * PREFIX_WEIGHT
+                for idx in self._postings[word]:
+                    if weight > hits[idx].get(token, (0.0, ""))[0]:
+                        hits[idx][token] = (weight, word)
+
+        default_idf = math.log(1.0 + max(len(self.majors), 1))
+        query_weight = sum(self._idf.get(t, default_idf) for t in query_tokens)
+        scored: List[Tuple[float, int]] = []
+        for idx, matched in hits.items():
+            # blend of query coverage and weighted Jaccard, so a query fully contained in a
+            # longer major name still ranks well but exact token matches rank first
+            matched_weight = sum(w for w, _ in matched.values())
+            matched_words = {word for _, word in matched.values()}
+            union = query_weight + sum(self._idf[t] for t in self._tokens[idx] if t not in matched_words)
+            scored.append((0.5 * matched_weight / query_weight + 0.5 * matched_weight / union, idx))
+
+        scored.sort(key=lambda item: (-item[0], len(self._tokens[item[1]])))
+        return [
+            {"key": self.majors[idx].get("key"), "name": self.majors[idx].get("name"), "score": round(score, 3)}
+            for score, idx in scored[:k]
+        ]
+
+    @staticmethod
+    def is_ambiguous(candidates: List[Dict[str, Any]]) -> bool:
+        """
+        True when the runner-up scores within AMBIGUITY_RATIO of the best, including exact ties
+        ("Math" against "Mathematics, B.A." and "Mathematics, B.S." both score 1.0).
+        """
+        if len(candidates) < 2:
+            return False
+        return candidates[1]["score"] >= candidates[0]["score"] * AMBIGUITY_RATIO
+
+
+_MAX_INDEXES = 512
+_indexes: "OrderedDict[Tuple[int, int, int], Tuple[List[Dict[str, Any]], MajorIndex]]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_major_index(year_id: int, sending_id: int, receiving_id: int,
+                    majors: List[Dict[str, Any]]) -> MajorIndex:
+    """Returns the index for (year, sending, receiving), rebuilding it only if `majors` changed."""
+    key = (year_id, sending_id, receiving_id)
+    with _indexes_lock:
+        cached: Optional[Tuple[List[Dict[str, Any]], MajorIndex]] = _indexes.get(key)
+        if cached is not None and cached[0] is majors:
+            _indexes.move_to_end(key)
+            return cached[1]
+    index = MajorIndex(majors)
+    with _indexes_lock:
+        _indexes[key] = (majors, index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > _MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
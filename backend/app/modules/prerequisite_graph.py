@@ -0,0 +1,241 @@
+# backend/app/modules/prerequisite_graph.py
+
+import json
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from app.config import settings
+from app.modules.course_codes import CourseEquivalences, get_course_equivalences, sequence_prerequisites
+from app.modules.fingerprints import canonical_institution
+
+DEFAULT_PREREQUISITES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "prerequisites.json")
+
+
+class PrerequisiteCycle(ValueError):
+    pass
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class PrerequisiteGraph:
+    """
+    Prerequisite DAG for one institution. Courses are interned to integer ids (canonical course
+    keys, so honors/cross-listed codes share a node); each node keeps its direct prerequisites,
+    the bitset of all transitive prerequisites and its depth (longest prerequisite chain above it).
+
+    ancestors/missing_prerequisites/depth are bitset lookups. Adding or removing an edge only
+    revisits the course and its descendants.
+    """
+
+    def __init__(self, equivalences: Optional[CourseEquivalences] = None):
+        self.equivalences = equivalences or get_course_equivalences()
+        self._ids: Dict[str, int] = {}
+        self._codes: List[str] = []
+        self._parents: List[Set[int]] = []
+        self._children: List[Set[int]] = []
+        self._ancestors: List[int] = []
+        self._depth: List[int] = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __contains__(self, code: str) -> bool:
+        return self.equivalences.canonical(code) in self._ids
+
+    def node(self, code: str) -> int:
+        key = self.equivalences.canonical(code)
+        with self._lock:
+            node = self._ids.get(key)
+            if node is None:
+                node = self._ids[key] = len(self._codes)
+                self._codes.append(key)
+                self._parents.append(set())
+                self._children.append(set())
+                self._ancestors.append(0)
+                self._depth.append(0)
+            return node
+
+    def code(self, node: int) -> str:
+        return self._codes[node]
+
+    def mask(self, codes: Iterable[str]) -> int:
+        """Bitset of the known courses among `codes` (unknown codes are ignored)."""
+        mask = 0
+        for code in codes or ():
+            node = self._ids.get(self.equivalences.canonical(code)) if code else None
+            if node is not None:
+                mask |= 1 << node
+        return mask
+
+    # --- Updates ---
+    def add_edge(self, course: str, prerequisite: str) -> bool:
+        """Records that `prerequisite` must come before `course`; False if already known."""
+        with self._lock:
+            c, p = self.node(course), self.node(prerequisite)
+            if c == p or (self._ancestors[p] >> c) & 1:
+                raise PrerequisiteCycle(f"{self._codes[p]} already requires {self._codes[c]}")
+            if p in self._parents[c]:
+                return False
+            self._parents[c].add(p)
+            self._children[p].add(c)
+            # closures and depths only grow: push the change down until nothing changes
+            pending = [c]
+            while pending:
+                n = pending.pop()
+                ancestors = self._ancestors[n]
+                depth = self._depth[n]
+                for parent in self._parents[n]:
+                    ancestors |= self._ancestors[parent] | (1 << parent)
+                    depth = max(depth, self._depth[parent] + 1)
+                if ancestors != self._ancestors[n] or depth != self._depth[n]:
+                    self._ancestors[n], self._depth[n] = ancestors, depth
+                    pending.extend(self._children[n])
+            return True
+
+    def remove_edge(self, course: str, prerequisite: str) -> bool:
+        with self._lock:
+            c = self._ids.get(self.equivalences.canonical(course))
+            p = self._ids.get(self.equivalences.canonical(prerequisite))
+            if c is None or p is None or p not in self._parents[c]:
+                return False
+            self._parents[c].discard(p)
+            self._children[p].discard(c)
+            # closures may shrink: recompute the course and its descendants, parents first
+            for n in self._descendants_in_order(c):
+                ancestors, depth = 0, 0
+                for parent in self._parents[n]:
+                    ancestors |= self._ancestors[parent] | (1 << parent)
+                    depth = max(depth, self._depth[parent] + 1)
+                self._ancestors[n], self._depth[n] = ancestors, depth
+            return True
+
+    def _descendants_in_order(self, start: int) -> List[int]:
+        """`start` and everything that depends on it, in topological order."""
+        order: List[int] = []
+        seen: Set[int] = set()
+        stack = [(start, iter(self._children[start]))]
+        seen.add(start)
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                order.append(node)
+            elif child not in seen:
+                seen.add(child)
+                stack.append((child, iter(self._children[child])))
+        order.reverse()
+        return order
+
+    def add_prerequisites(self, prerequisites: Dict[str, Iterable[str]]) -> int:
+        """Adds {course: [prerequisites]}; edges that would form a cycle are skipped. Returns edges added."""
+        added = 0
+        for course, prereqs in prerequisites.items():
+            for prereq in prereqs:
+                try:
+                    added += self.add_edge(course, prereq)
+                except PrerequisiteCycle as e:
+                    print(f"Skipping prerequisite {prereq} -> {course}: {e}")
+        return added
+
+    def with_sequence_guesses(self, codes: Iterable[str]) -> "PrerequisiteGraph":
+        """
+        A copy of this graph plus the lettered-sequence edges implied by `codes` (MATH 1A -> 1B)
+        for courses that have no recorded prerequisites. For one request; this graph is unchanged.
+        """
+        with self._lock:
+            copy = PrerequisiteGraph(self.equivalences)
+            copy._ids, copy._codes = dict(self._ids), list(self._codes)
+            copy._parents = [set(parents) for parents in self._parents]
+            copy._children = [set(children) for children in self._children]
+            copy._ancestors, copy._depth = list(self._ancestors), list(self._depth)
+        guesses = {course: prereqs for course, prereqs in sequence_prerequisites(codes).items()
+                   if not copy.prerequisites(course)}
+        copy.add_prerequisites(guesses)
+        return copy
+
+    # --- Queries ---
+    def prerequisites(self, code: str) -> List[str]:
+        node = self._ids.get(self.equivalences.canonical(code))
+        return sorted(self._codes[p] for p in self._parents[node]) if node is not None else []
+
+    def ancestors(self, code: str) -> List[str]:
+        node = self._ids.get(self.equivalences.canonical(code))
+        return [self._codes[a] for a in _bits(self._ancestors[node])] if node is not None else []
+
+    def ancestor_mask(self, code: str) -> int:
+        node = self._ids.get(self.equivalences.canonical(code))
+        return self._ancestors[node] if node is not None else 0
+
+    def depth(self, code: str) -> int:
+        """Longest prerequisite chain above `code`: the earliest quarter index with nothing completed."""
+        node = self._ids.get(self.equivalences.canonical(code))
+        return self._depth[node] if node is not None else 0
+
+    def missing_prerequisites(self, code: str, completed: Iterable[str] = (), completed_mask: Optional[int] = None) -> List[str]:
+        """Every transitive prerequisite of `code` not covered by `completed`, shallowest first."""
+        mask = self.ancestor_mask(code) & ~(completed_mask if completed_mask is not None else self.mask(completed))
+        return sorted((self._codes[a] for a in _bits(mask)), key=lambda key: (self._depth[self._ids[key]], key))
+
+    def earliest_quarter(self, code: str, completed: Iterable[str] = (), completed_mask: Optional[int] = None) -> int:
+        """
+        Quarters that must pass before `code` can be taken given `completed`: the longest chain of
+        missing prerequisites. Walks the missing ancestors once, shallowest first.
+        """
+        done = completed_mask if completed_mask is not None else self.mask(completed)
+        node = self._ids.get(self.equivalences.canonical(code))
+        if node is None:
+            return 0
+        missing = self._ancestors[node] & ~done
+        if missing == self._ancestors[node]:
+            return self._depth[node]
+        level: Dict[int, int] = {}
+        for a in sorted(_bits(missing), key=self._depth.__getitem__):
+            level[a] = 1 + max((level.get(p, 0) for p in self._parents[a] if (missing >> p) & 1), default=0)
+        return max((level[p] for p in self._parents[node] if p in level), default=0)
+
+
+class PrerequisiteGraphStore:
+    """One PrerequisiteGraph per origin institution, seeded from app/data/prerequisites.json."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.PREREQUISITES_PATH or DEFAULT_PREREQUISITES_PATH
+        self._graphs: Dict[str, PrerequisiteGraph] = {}
+        self._seed: Dict[str, Dict[str, List[str]]] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                institutions = json.load(f).get("institutions", {})
+            self._seed = {canonical_institution(name): edges for name, edges in institutions.items()}
+        except (OSError, ValueError) as e:
+            print(f"No prerequisite data loaded: {e}")
+
+    def graph(self, institution: str) -> PrerequisiteGraph:
+        key = canonical_institution(institution)
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is None:
+                graph = self._graphs[key] = PrerequisiteGraph()
+                graph.add_prerequisites(self._seed.get(key, {}))
+            return graph
+
+
+_store: Optional[PrerequisiteGraphStore] = None
+_store_lock = threading.Lock()
+
+
+def get_prerequisite_store() -> PrerequisiteGraphStore:
+    """Returns the process-wide prerequisite graphs."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PrerequisiteGraphStore()
+    return _store
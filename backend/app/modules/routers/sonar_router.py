@@ -1,10 +1,21 @@
 # backend/app/modules/routers/sonar_router.py
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+import time
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Import your wrapper
+from app.config import settings
+from app.modules.fingerprints import schedule_fingerprint, transfer_fingerprint
 from app.modules.scheduler import Scheduler
+from app.modules.sonar_cache import get_sonar_cache
+from app.modules.sonar_client import get_sonar_usage
+from app.modules.sonar_resilience import SonarUnavailable, get_sonar_resilience
+from app.modules.single_flight import coalescing_stats, get_single_flight
 
 router = APIRouter()
 sched = Scheduler()
@@ -18,20 +29,131 @@ class ScheduleRequest(BaseModel):
     target_institution:        str       = Field(..., alias="target_institution")
     target_major:              str       = Field(..., alias="target_major")
     target_year:               str       = Field(..., alias="target_year")
+    prompt_mode:               Optional[str] = Field(None, alias="prompt_mode")  # "grounded" | "research"
+    planner:                   Optional[str] = Field(None, alias="planner")      # "auto" | "local" | "sonar"
+
+class BatchScheduleRequest(BaseModel):
+    requests:    List[ScheduleRequest] = Field(..., alias="requests")
+    concurrency: Optional[int]         = Field(None, alias="concurrency", ge=1)  # capped at SCHEDULE_BATCH_CONCURRENCY
+
+@router.on_event("shutdown")
+async def close_sonar_client():
+    await sched.sonar.aclose()
+
+def _schedule_params(req: ScheduleRequest) -> Dict[str, Any]:
+    # Pass `desired_units_per_quarter` in as `unit_range` for scheduler
+    return dict(
+        completed_courses=req.completed_courses,
+        target_major=req.target_major,
+        target_institution=req.target_institution,
+        academic_year=req.academic_year,
+        unit_range=[req.desired_units_per_quarter, req.desired_units_per_quarter],
+        preferred_times=None,              # or extract from req if you add it
+        origin_institution=req.origin_institution,
+        prompt_mode=sched.resolve_prompt_mode(req.prompt_mode, req.origin_institution),
+        current_gpa=req.current_gpa,
+        planner=sched.resolve_planner(req.planner),
+    )
 
 @router.post("/schedule", response_model=Dict[str, Any])
 async def schedule(req: ScheduleRequest):
+    params = _schedule_params(req)
     try:
-        # Pass `desired_units_per_quarter` in as `unit_range` for scheduler
-        result = sched.generate_schedule(
-            completed_courses=req.completed_courses,
-            target_major=req.target_major,
-            target_institution=req.target_institution,
-            academic_year=req.academic_year,
-            unit_range=[req.desired_units_per_quarter, req.desired_units_per_quarter],
-            preferred_times=None,              # or extract from req if you add it
-        )
+        # identical concurrent requests share one Sonar query
+        result = await get_single_flight("schedule").do(
+            schedule_fingerprint(**params),
+            lambda: sched.generate_schedule(**params))
+    except SonarUnavailable as e:
+        # upstream down and nothing cached or local to fall back on: fail fast
+        raise HTTPException(status_code=503, detail=f"Scheduling unavailable: {e}",
+                            headers={"Retry-After": str(max(1, round(get_sonar_resilience().breaker.retry_after())))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scheduling failed: {e}")
 
-    return result
\ No newline at end of file
+    return result
+
+@router.post("/schedule/batch")
+async def schedule_batch(batch: BatchScheduleRequest):
+    """
+    Plans a cohort. Requests are grouped by pathway (origin, target, major, year) and each
+    pathway's ASSIST requirements are looked up once; at most `concurrency` requests are
+    looking up or generating at a time, and identical students share one generation. The
+    response is NDJSON in completion order: one {"event": "result", "index", "result"} or
+    {"event": "error", "index", "error"} per request (`index` is its position in `requests`),
+    then {"event": "done"} with counts.
+    """
+    if len(batch.requests) > settings.SCHEDULE_BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.SCHEDULE_BATCH_MAX_REQUESTS} requests per batch.")
+    limit = min(batch.concurrency or settings.SCHEDULE_BATCH_CONCURRENCY, settings.SCHEDULE_BATCH_CONCURRENCY)
+    semaphore = asyncio.Semaphore(limit)
+    pathways: Dict[str, asyncio.Task] = {}
+    started = time.perf_counter()
+
+    async def plan(index: int, req: ScheduleRequest) -> Dict[str, Any]:
+        params = _schedule_params(req)
+        key = transfer_fingerprint(req.origin_institution, req.target_institution, req.target_major, req.academic_year)
+        try:
+            # lookups start under the same limit as generations, so a batch of distinct
+            # pathways doesn't fire every ASSIST lookup at once
+            async with semaphore:
+                if key not in pathways:
+                    pathways[key] = asyncio.ensure_future(sched.resolve_pathway(
+                        req.origin_institution, req.target_institution, req.target_major, req.academic_year))
+                pathway = await asyncio.shield(pathways[key])
+                result = await get_single_flight("schedule").do(
+                    schedule_fingerprint(**params),
+                    lambda: sched.generate_schedule(**params, pathway=pathway))
+        except Exception as e:
+            return {"event": "error", "index": index, "error": f"Scheduling failed: {e}"}
+        return {"event": "result", "index": index, "result": result}
+
+    async def body():
+        tasks = [asyncio.ensure_future(plan(i, req)) for i, req in enumerate(batch.requests)]
+        errors = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                record = await finished
+                errors += record["event"] == "error"
+                yield json.dumps(record) + "\n"
+        finally:
+            # client went away: stop the generations nobody will read
+            for task in tasks + list(pathways.values()):
+                task.cancel()
+        yield json.dumps({"event": "done", "count": len(tasks), "errors": errors, "pathways": len(pathways),
+                          "concurrency": limit, "seconds": round(time.perf_counter() - started, 3)}) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.post("/schedule/stream")
+async def schedule_stream(req: ScheduleRequest, format: str = Query("ndjson", pattern="^(ndjson|sse)$")):
+    """
+    Streams the plan while Sonar writes it: one "quarter" event per finished quarter, a
+    "repaired" event with the corrected plan if local validation had to move courses, then a
+    "done" event with warnings, citations and the counselor flag (or an "error" event).
+    `format=ndjson` sends one JSON object per line; `format=sse` sends server-sent events.
+    """
+    events = sched.stream_schedule(**_schedule_params(req))
+
+    async def body():
+        seq = 0
+        async for record in events:
+            if format == "sse":
+                yield f"id: {seq}\nevent: {record['event']}\ndata: {json.dumps(record)}\n\n"
+            else:
+                yield json.dumps(record) + "\n"
+            seq += 1
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/metrics", response_model=Dict[str, Any])
+async def metrics():
+    """
+    Counters for the scheduling endpoints: request coalescing, the Sonar response cache,
+    Sonar token usage and latency per prompt mode (totals plus the most recent requests), and
+    the circuit breaker state, retries and hedge win rate.
+    """
+    return {"coalescing": coalescing_stats("schedule"), "cache": get_sonar_cache().stats(),
+            "sonar": get_sonar_usage().snapshot(), "resilience": get_sonar_resilience().snapshot()}
\ No newline at end of file
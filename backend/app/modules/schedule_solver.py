@@ -0,0 +1,220 @@
+# backend/app/modules/schedule_solver.py
+
+import heapq
+import re
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from app.modules.course_codes import course_key, parse_course_code
+
+QUARTERS = ("Fall", "Winter", "Spring")
+GE_PLACEHOLDER = {"code": "GE", "title": "General Education", "units": 4}
+DEFAULT_UNITS = 4.0
+DEFAULT_UNIT_RANGE = [12, 16]
+
+
+def quarter_terms(academic_year: Optional[str]) -> Iterator[str]:
+    """
+    "Fall 2025", "Winter 2026", "Spring 2026", "Fall 2026", ... starting from an academic year
+    ("2025-2026") or a term ("Winter 2026"); "Quarter 1", "Quarter 2", ... if neither parses.
+    """
+    text = academic_year or ""
+    term = re.match(r"^\s*(fall|winter|spring)\s+(\d{4})", text, re.I)
+    year = re.match(r"^\s*(\d{4})", text)
+    if term:
+        index = QUARTERS.index(term.group(1).capitalize())
+        fall_year = int(term.group(2)) - (1 if index > 0 else 0)
+    elif year:
+        index, fall_year = 0, int(year.group(1))
+    else:
+        n = 1
+        while True:
+            yield f"Quarter {n}"
+            n += 1
+    while True:
+        name = QUARTERS[index]
+        yield f"{name} {fall_year if name == 'Fall' else fall_year + 1}"
+        index = (index + 1) % len(QUARTERS)
+        if index == 0:
+            fall_year += 1
+
+
+def slot_pattern(current_gpa: Optional[float]) -> List[str]:
+    """The major/GE alternation from build_prompt: below 3.0 alternate, otherwise two majors per GE."""
+    return ["major", "ge"] if current_gpa is not None and current_gpa < 3.0 else ["major", "major", "ge"]
+
+
+def _subject(code: str) -> str:
+    parsed = parse_course_code(code)
+    return parsed.prefix if parsed else code.split(" ")[0].upper()
+
+
+def _cycles(requires: Dict[str, Set[str]]) -> List[Set[str]]:
+    """Strongly connected components with more than one course (Tarjan's algorithm, iterative)."""
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: Set[str] = set()
+    components: List[Set[str]] = []
+    for root in requires:
+        if root in index:
+            continue
+        work = [(root, iter(requires[root]))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, edges = work[-1]
+            nxt = next(edges, None)
+            if nxt is not None:
+                if nxt not in index:
+                    index[nxt] = low[nxt] = len(index)
+                    stack.append(nxt)
+                    on_stack.add(nxt)
+                    work.append((nxt, iter(requires[nxt])))
+                elif nxt in on_stack:
+                    low[node] = min(low[node], index[nxt])
+                continue
+            work.pop()
+            if work:
+                low[work[-1][0]] = min(low[work[-1][0]], low[node])
+            if low[node] == index[node]:
+                component = set()
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.add(member)
+                    if member == node:
+                        break
+                if len(component) > 1:
+                    components.append(component)
+    return components
+
+
+def solve_schedule(requirements: List[Dict[str, Any]], academic_year: Optional[str],
+                   unit_range: Optional[List[int]] = None, current_gpa: Optional[float] = None,
+                   max_quarters: int = 24) -> Dict[str, Any]:
+    """
+    Deterministic quarter plan for `requirements` (rows with code, units, title, requires — the
+    grounded requirement table) in the generate_schedule response shape.
+
+    Courses are layered topologically: a course becomes available the quarter after all of its
+    listed prerequisites are placed. Each quarter is then packed greedily, longest remaining
+    prerequisite chain first, within the unit range and with at most one course per subject,
+    following the GPA-based major/GE pattern; GE placeholders top quarters up to the minimum.
+    Prerequisites that are not in `requirements` are treated as already satisfied.
+    """
+    low, high = (list(unit_range) + [unit_range[0]])[:2] if unit_range else DEFAULT_UNIT_RANGE
+    warnings: List[Dict[str, Any]] = []
+
+    courses: Dict[str, Dict[str, Any]] = {}
+    for req in requirements:
+        code = req.get("code")
+        if code and course_key(code) not in courses:
+            courses[course_key(code)] = req
+    requires: Dict[str, Set[str]] = {
+        key: {course_key(p) for p in req.get("requires") or () if course_key(p) in courses and course_key(p) != key}
+        for key, req in courses.items()
+    }
+    dependents: Dict[str, List[str]] = {key: [] for key in courses}
+    for key, prereqs in requires.items():
+        for p in prereqs:
+            dependents[p].append(key)
+
+    # only edges inside a cycle are dropped; courses that merely depend on one keep their ordering
+    for component in _cycles(requires):
+        for key in sorted(component):
+            warnings.append({"term": None, "code": courses[key]["code"],
+                             "message": "Circular prerequisites; scheduled without ordering—please confirm with counselor."})
+            inside = requires[key] & component
+            requires[key] -= inside
+            for p in inside:
+                dependents[p].remove(key)
+
+    # chain length below each course (Kahn order reversed)
+    order: List[str] = []
+    indegree = {key: len(prereqs) for key, prereqs in requires.items()}
+    ready = [key for key, n in indegree.items() if n == 0]
+    while ready:
+        key = ready.pop()
+        order.append(key)
+        for d in dependents[key]:
+            indegree[d] -= 1
+            if indegree[d] == 0:
+                ready.append(d)
+    chain = {key: 0 for key in courses}
+    for key in reversed(order):
+        chain[key] = max((chain[d] + 1 for d in dependents[key]), default=0)
+
+    def units_of(key: str) -> float:
+        units = courses[key].get("units")
+        return float(units) if isinstance(units, (int, float)) else DEFAULT_UNITS
+
+    def priority(key: str):
+        return (-chain[key], -units_of(key), key)
+
+    placed: Set[str] = set()
+    available = [priority(key) for key in courses if not requires[key]]
+    heapq.heapify(available)
+    pending = {key: set(prereqs) for key, prereqs in requires.items() if prereqs}
+    pattern = slot_pattern(current_gpa)
+    schedule: List[Dict[str, Any]] = []
+    terms = quarter_terms(academic_year)
+
+    while len(placed) < len(courses) and len(schedule) < max_quarters:
+        term = next(terms)
+        quarter: List[Dict[str, Any]] = []
+        total, subjects, taken, deferred = 0.0, set(), [], []
+        for slot in pattern * len(courses):
+            if slot == "ge":
+                if total + GE_PLACEHOLDER["units"] <= high and available:
+                    quarter.append(dict(GE_PLACEHOLDER))
+                    total += GE_PLACEHOLDER["units"]
+                continue
+            chosen = None
+            while available:
+                item = heapq.heappop(available)
+                key = item[2]
+                fits = total + units_of(key) <= high or not quarter
+                if fits and _subject(courses[key]["code"]) not in subjects:
+                    chosen = key
+                    break
+                deferred.append(item)
+            for item in deferred:
+                heapq.heappush(available, item)
+            deferred.clear()
+            if chosen is None:
+                break
+            req = courses[chosen]
+            quarter.append({"code": req["code"], "title": req.get("title"), "units": req.get("units")})
+            if units_of(chosen) > high:
+                warnings.append({"term": term, "code": req["code"],
+                                 "message": f"Course alone exceeds the {high}-unit maximum."})
+            total += units_of(chosen)
+            subjects.add(_subject(req["code"]))
+            taken.append(chosen)
+        while total + GE_PLACEHOLDER["units"] <= high and total < low:
+            quarter.append(dict(GE_PLACEHOLDER))
+            total += GE_PLACEHOLDER["units"]
+
+        # courses unlocked by this quarter become available next quarter
+        placed.update(taken)
+        for key in taken:
+            for d in dependents[key]:
+                if d in pending:
+                    pending[d].discard(key)
+                    if not pending[d]:
+                        del pending[d]
+                        heapq.heappush(available, priority(d))
+        schedule.append({"term": term, "courses": quarter})
+
+    for key in courses:
+        if key not in placed:
+            warnings.append({"term": None, "code": courses[key]["code"],
+                             "message": f"Could not be placed within {max_quarters} quarters."})
+
+    return {
+        "schedule": schedule,
+        "warnings": warnings,
+        "citations": [],
+        "reminder_to_meet_counselor": bool(warnings),
+    }
@@ -0,0 +1,230 @@
+# backend/app/modules/schedule_validator.py
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.modules.course_codes import get_course_equivalences, parse_course_code, sequence_prerequisites
+from app.modules.prerequisite_graph import PrerequisiteGraph
+from app.modules.schedule_solver import DEFAULT_UNITS, DEFAULT_UNIT_RANGE, quarter_terms
+
+# Placeholders the scheduler inserts; they carry no subject or prerequisites.
+PLACEHOLDER_CODES = {"GE", "ELECTIVE"}
+
+
+def _units(course: Dict[str, Any]) -> float:
+    units = course.get("units")
+    return float(units) if isinstance(units, (int, float)) else DEFAULT_UNITS
+
+
+def _next_term(schedule: List[Dict[str, Any]]) -> str:
+    last = schedule[-1]["term"] if schedule else None
+    if last and re.match(r"^\s*(fall|winter|spring)\s+\d{4}", last, re.I):
+        terms = quarter_terms(last)
+        next(terms)
+        return next(terms)
+    return f"Quarter {len(schedule) + 1}"
+
+
+class _Plan:
+    """Working copy of a schedule with per-course keys, subjects and prerequisites."""
+
+    def __init__(self, schedule: List[Dict[str, Any]], graph: Optional[PrerequisiteGraph]):
+        self.equivalences = graph.equivalences if graph is not None else get_course_equivalences()
+        self.quarters: List[Dict[str, Any]] = [
+            {"term": q.get("term"), "courses": [dict(c) for c in q.get("courses", []) if isinstance(c, dict)]}
+            for q in schedule
+        ]
+        codes = [c.get("code") for q in self.quarters for c in q["courses"] if not self.placeholder(c)]
+        sequences = sequence_prerequisites(codes)
+        self.requires: Dict[str, Set[str]] = {}
+        for code in codes:
+            key = self.key(code)
+            prereqs = set(graph.ancestors(code)) if graph is not None else set()
+            if graph is None or not graph.prerequisites(code):
+                # the lettered-sequence guess only stands in where the graph knows nothing
+                prereqs.update(sequences.get(key, ()))
+            self.requires[key] = prereqs
+
+    def key(self, code: Optional[str]) -> str:
+        return self.equivalences.canonical(code or "")
+
+    @staticmethod
+    def placeholder(course: Dict[str, Any]) -> bool:
+        return not course.get("code") or str(course["code"]).strip().upper() in PLACEHOLDER_CODES
+
+    def subject(self, course: Dict[str, Any]) -> Optional[str]:
+        if self.placeholder(course):
+            return None
+        parsed = parse_course_code(course["code"])
+        return parsed.prefix if parsed else str(course["code"]).split(" ")[0].upper()
+
+    def positions(self) -> Dict[str, int]:
+        """course key -> index of the first quarter it appears in."""
+        positions: Dict[str, int] = {}
+        for i, quarter in enumerate(self.quarters):
+            for course in quarter["courses"]:
+                if not self.placeholder(course):
+                    positions.setdefault(self.key(course["code"]), i)
+        return positions
+
+
+def _unscheduled_prerequisites(plan: _Plan, completed: Set[str], graph: Optional[PrerequisiteGraph]) -> Dict[str, List[str]]:
+    """code -> prerequisites that are neither scheduled nor completed (nor implied by a completed course)."""
+    if graph is None:
+        return {}
+    positions = plan.positions()
+    implied = set(completed)
+    for key in completed:
+        implied.update(graph.ancestors(key))
+    missing: Dict[str, List[str]] = {}
+    for quarter in plan.quarters:
+        for course in quarter["courses"]:
+            if plan.placeholder(course):
+                continue
+            absent = sorted(p for p in graph.ancestors(course["code"]) if p not in positions and p not in implied)
+            if absent:
+                missing[course["code"]] = absent
+    return missing
+
+
+def find_violations(schedule: List[Dict[str, Any]], completed_courses: Optional[Iterable[str]] = None,
+                    unit_range: Optional[List[int]] = None,
+                    graph: Optional[PrerequisiteGraph] = None) -> List[Dict[str, Any]]:
+    """
+    Every rule a plan breaks, as {"term", "code", "rule", "message"}: "completed" (a completed
+    course is listed), "duplicate" (a course appears twice), "prerequisite" (a prerequisite is in
+    the same or a later quarter), "subject" (two courses from one subject in a quarter) and
+    "overload" (a quarter above the unit maximum), plus "missing_prerequisite" when a known
+    prerequisite is neither completed nor anywhere in the plan.
+    """
+    plan = _Plan(schedule, graph)
+    high = (unit_range or DEFAULT_UNIT_RANGE)[-1]
+    completed = {plan.key(c) for c in completed_courses or () if c and c.strip()}
+    positions = plan.positions()
+    seen: Set[str] = set()
+    violations: List[Dict[str, Any]] = []
+
+    def flag(term, code, rule, message):
+        violations.append({"term": term, "code": code, "rule": rule, "message": message})
+
+    for i, quarter in enumerate(plan.quarters):
+        term, subjects, total = quarter["term"], set(), 0.0
+        for course in quarter["courses"]:
+            total += _units(course)
+            if plan.placeholder(course):
+                continue
+            code, key = course["code"], plan.key(course["code"])
+            if key in completed:
+                flag(term, code, "completed", "Already completed.")
+            if key in seen:
+                flag(term, code, "duplicate", "Scheduled more than once.")
+            seen.add(key)
+            for prereq in sorted(plan.requires.get(key, ())):
+                if prereq not in completed and positions.get(prereq, -1) >= i:
+                    flag(term, code, "prerequisite", f"Prerequisite {prereq} is not scheduled in an earlier quarter.")
+            subject = plan.subject(course)
+            if subject in subjects:
+                flag(term, code, "subject", f"Second {subject} course in the same quarter.")
+            subjects.add(subject)
+        if total > high:
+            flag(term, None, "overload", f"{total:g} units exceeds the {high}-unit maximum.")
+    for code, absent in _unscheduled_prerequisites(plan, completed, graph).items():
+        flag(next(q["term"] for q in plan.quarters if any(c.get("code") == code for c in q["courses"])), code,
+             "missing_prerequisite", f"Requires {', '.join(absent)}, which is not completed or scheduled.")
+    return violations
+
+
+def repair_schedule(schedule: List[Dict[str, Any]], completed_courses: Optional[Iterable[str]] = None,
+                    unit_range: Optional[List[int]] = None,
+                    graph: Optional[PrerequisiteGraph] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Fixes the violations find_violations reports with the fewest local moves and returns
+    (repaired schedule, warnings describing each change).
+
+    Completed and duplicate courses are dropped. Then quarters are walked in order: a course
+    that sits with or before one of its prerequisites, repeats a subject, or pushes the quarter
+    past the unit maximum is shifted to the earliest later quarter where it fits all three
+    rules; if none does, a quarter is appended for it (split). A course that is alone in its
+    quarter and still over the maximum is left in place with a warning, and prerequisites that
+    are nowhere in the plan are reported rather than invented.
+    """
+    plan = _Plan(schedule, graph)
+    high = (unit_range or DEFAULT_UNIT_RANGE)[-1]
+    completed = {plan.key(c) for c in completed_courses or () if c and c.strip()}
+    warnings: List[Dict[str, Any]] = []
+
+    def note(term, code, action, message, **extra):
+        warnings.append({"term": term, "code": code, "action": action, "message": message, **extra})
+
+    seen: Set[str] = set()
+    for quarter in plan.quarters:
+        kept = []
+        for course in quarter["courses"]:
+            if not plan.placeholder(course):
+                key = plan.key(course["code"])
+                if key in completed:
+                    note(quarter["term"], course["code"], "removed", "Already completed; removed from the plan.")
+                    continue
+                if key in seen:
+                    note(quarter["term"], course["code"], "removed", "Listed more than once; kept the first.")
+                    continue
+                seen.add(key)
+            kept.append(course)
+        quarter["courses"] = kept
+
+    positions = plan.positions()
+
+    def blocked(course: Dict[str, Any], index: int, subjects: Set[str], total: float) -> Optional[str]:
+        """Why `course` can't be in quarter `index` next to `subjects`/`total`, or None."""
+        if not plan.placeholder(course):
+            late = [p for p in plan.requires.get(plan.key(course["code"]), ()) if positions.get(p, -1) >= index]
+            if late:
+                return "prerequisite"
+            if plan.subject(course) in subjects:
+                return "subject"
+        if total + _units(course) > high:
+            return "overload"
+        return None
+
+    def fits(course: Dict[str, Any], index: int) -> bool:
+        quarter = plan.quarters[index]["courses"]
+        subjects = {plan.subject(c) for c in quarter} - {None}
+        return blocked(course, index, subjects, sum(_units(c) for c in quarter)) is None
+
+    i = 0
+    while i < len(plan.quarters):
+        quarter = plan.quarters[i]
+        kept, subjects, total = [], set(), 0.0
+        for course in quarter["courses"]:
+            reason = blocked(course, i, subjects, total)
+            if reason == "overload" and not kept:
+                note(quarter["term"], course.get("code"), "kept", f"Course alone exceeds the {high}-unit maximum.")
+                reason = None
+            if reason is None:
+                kept.append(course)
+                subjects.add(plan.subject(course))
+                total += _units(course)
+                continue
+            target = next((k for k in range(i + 1, len(plan.quarters)) if fits(course, k)), None)
+            action = "shifted"
+            if target is None:
+                plan.quarters.append({"term": _next_term(plan.quarters), "courses": []})
+                target, action = len(plan.quarters) - 1, "split"
+            plan.quarters[target]["courses"].append(course)
+            if not plan.placeholder(course):
+                positions[plan.key(course["code"])] = target
+            messages = {"prerequisite": "a prerequisite was not scheduled earlier",
+                        "subject": "another course from the same subject was in that quarter",
+                        "overload": f"the quarter exceeded {high} units"}
+            note(quarter["term"], course.get("code"), action,
+                 f"Moved to {plan.quarters[target]['term']}: {messages[reason]}.",
+                 rule=reason, moved_to=plan.quarters[target]["term"])
+        quarter["courses"] = kept
+        i += 1
+
+    while plan.quarters and not plan.quarters[-1]["courses"]:
+        plan.quarters.pop()
+    for code, absent in _unscheduled_prerequisites(plan, completed, graph).items():
+        note(None, code, "flagged", f"Requires {', '.join(absent)}, which is not completed or scheduled—"
+             "please confirm with your counselor.", rule="missing_prerequisite")
+    return plan.quarters, warnings
@@ -1,7 +1,26 @@
 # backend/app/modules/scheduler.py
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
+from app.config import settings
+from app.modules.assist_async import get_transfer_courses_async
+from app.modules.assist_scraper import apply_completed_courses
+from app.modules.course_codes import CompletionMatcher
+from app.modules.fingerprints import schedule_fingerprint
+from app.modules.json_stream import ArrayItemStream
+from app.modules.llm_json import is_complete_schedule, validate_quarter
+from app.modules.prerequisite_graph import get_prerequisite_store
+from app.modules.schedule_solver import solve_schedule
+from app.modules.schedule_validator import repair_schedule
+from app.modules.sonar_cache import get_sonar_cache
 from app.modules.sonar_client import SonarClient
+from app.modules.sonar_resilience import SonarUnavailable
+
+# "grounded": resolve the remaining requirements from ASSIST and ask Sonar only to sequence them.
+# "research": the original prompt, where Sonar researches articulation and catalogs itself.
+PROMPT_MODES = ("grounded", "research")
+# "auto": plan locally when ASSIST has the requirements, else ask Sonar; "local": never ask Sonar;
+# "sonar": always ask Sonar.
+PLANNERS = ("auto", "local", "sonar")
 
 class Scheduler:
     """
@@ -11,24 +30,307 @@ class Scheduler:
 
     def __init__(self):
         self.sonar = SonarClient()
+        self.cache = get_sonar_cache()
+
+    @staticmethod
+    def resolve_prompt_mode(prompt_mode: Optional[str], origin_institution: Optional[str]) -> str:
+        mode = (prompt_mode or settings.SONAR_PROMPT_MODE).lower()
+        if mode not in PROMPT_MODES:
+            print(f"Unknown prompt mode '{mode}', using 'research'.")
+            mode = "research"
+        # grounding needs the origin institution to look up the agreement
+        return mode if origin_institution else "research"
+
+    @staticmethod
+    def resolve_planner(planner: Optional[str]) -> str:
+        planner = (planner or settings.SCHEDULE_PLANNER).lower()
+        if planner not in PLANNERS:
+            print(f"Unknown planner '{planner}', using 'auto'.")
+            planner = "auto"
+        return planner
+
+    async def _local_plan(self, params: Dict[str, Any], planner: str, current_gpa: Optional[float],
+                          pathway: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """The local solver's plan, or None when Sonar should plan instead."""
+        if planner == "sonar":
+            return None
+        requirements = await self._remaining_requirements(params, pathway) if params["origin_institution"] else None
+        if requirements is None:
+            if planner == "local":
+                raise ValueError("No ASSIST requirements available for local planning "
+                                 "(origin_institution is required).")
+            return None
+        plan = solve_schedule(requirements, params["academic_year"], params["unit_range"], current_gpa)
+        plan["planner"] = "local"
+        return plan
 
-    def generate_schedule(
+    async def generate_schedule(
         self,
         completed_courses: List[str],
         target_major: str,
         target_institution: str,
         academic_year: str,
         unit_range: Optional[List[int]] = None,
-        preferred_times: Optional[List[str]] = None
+        preferred_times: Optional[List[str]] = None,
+        origin_institution: Optional[str] = None,
+        prompt_mode: Optional[str] = None,
+        current_gpa: Optional[float] = None,
+        planner: Optional[str] = None,
+        pathway: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
+        """
+        `pathway`, if given, is the resolve_pathway() result for this origin/target/major/year,
+        so callers planning many students on one pathway look the requirements up once.
+        """
+        params = dict(completed_courses=completed_courses, target_major=target_major,
+                      target_institution=target_institution, academic_year=academic_year,
+                      unit_range=unit_range, preferred_times=preferred_times,
+                      origin_institution=origin_institution,
+                      prompt_mode=self.resolve_prompt_mode(prompt_mode, origin_institution))
+
+        # 0. Deterministic fast path: plan locally from the ASSIST requirements
+        plan = await self._local_plan(params, self.resolve_planner(planner), current_gpa, pathway)
+        if plan is not None:
+            return plan
+
+        # 0a. Identical inputs (after canonicalization) reuse the earlier Sonar answer
+        cache_key = schedule_fingerprint(**params)
+        result = await self.cache.aget(cache_key)
+        if result is None:
+            prompt, used_mode = await self._build_prompt(params, pathway)
+            try:
+                result = await self._query_sonar(prompt, used_mode)
+            except SonarUnavailable as e:
+                return await self._fallback(params, cache_key, current_gpa, e, pathway)
+            # only complete plans are worth replaying, and not ones from a fallback prompt
+            if is_complete_schedule(result) and used_mode == params["prompt_mode"]:
+                await self.cache.aput(cache_key, result)
+
+        return dict(self._repair(self._postprocess(result), params), planner="sonar")
+
+    async def stream_schedule(
+        self,
+        completed_courses: List[str],
+        target_major: str,
+        target_institution: str,
+        academic_year: str,
+        unit_range: Optional[List[int]] = None,
+        preferred_times: Optional[List[str]] = None,
+        origin_institution: Optional[str] = None,
+        prompt_mode: Optional[str] = None,
+        current_gpa: Optional[float] = None,
+        planner: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Same plan as generate_schedule, as events: one {"event": "quarter"} per quarter as soon
+        as Sonar finishes writing it (post-processed the same way), then {"event": "done"} with
+        the warnings, citations and counselor flag — or {"event": "error"}.
+        """
+        params = dict(completed_courses=completed_courses, target_major=target_major,
+                      target_institution=target_institution, academic_year=academic_year,
+                      unit_range=unit_range, preferred_times=preferred_times,
+                      origin_institution=origin_institution,
+                      prompt_mode=self.resolve_prompt_mode(prompt_mode, origin_institution))
+        try:
+            plan = await self._local_plan(params, self.resolve_planner(planner), current_gpa)
+        except Exception as e:
+            yield {"event": "error", "error": f"Scheduling failed: {e}"}
+            return
+        if plan is not None:
+            for event in self._plan_events(plan, cached=False):
+                yield event
+            return
+
+        cache_key = schedule_fingerprint(**params)
+        warnings: List[Dict[str, Any]] = []
+        reminder_to_meet = False
+
+        result = await self.cache.aget(cache_key)
+        if result is not None:
+            processed = dict(self._repair(self._postprocess(result), params), planner="sonar")
+            for event in self._plan_events(processed, cached=True):
+                yield event
+            return
+
+        parser = ArrayItemStream("quarters")
+        streamed: List[Dict[str, Any]] = []
+        diagnostics: List[str] = []
+        try:
+            prompt, used_mode = await self._build_prompt(params)
+            async for chunk in self.sonar.stream(user_query=prompt, label=used_mode):
+                for q in parser.feed(self.sonar.delta_text(chunk)):
+                    q = validate_quarter(q, f"quarters[{len(streamed)}]", diagnostics)
+                    if q is None:
+                        continue
+                    quarter, quarter_warnings, reminder = self._process_quarter(q)
+                    warnings.extend(quarter_warnings)
+                    reminder_to_meet = reminder_to_meet or reminder
+                    streamed.append(quarter)
+                    yield {"event": "quarter", "quarter": quarter, "warnings": quarter_warnings}
+        except Exception as e:
+            if isinstance(e, SonarUnavailable) and not streamed:
+                try:
+                    plan = await self._fallback(params, cache_key, current_gpa, e)
+                except Exception as fallback_error:
+                    yield {"event": "error", "error": f"Scheduling failed: {fallback_error}"}
+                    return
+                for event in self._plan_events(plan, cached=plan.get("degraded") == "stale_cache"):
+                    yield event
+                return
+            yield {"event": "error", "error": f"Scheduling failed: {e}"}
+            return
+
+        print("\n🛰️ Sonar streamed output:\n", parser.text, "\n")
+        try:
+            result = self.sonar.parse_content(parser.text)
+        except ValueError:
+            yield {"event": "error", "error": "Sonar stream ended without a usable JSON schedule."}
+            return
+        if result.get("truncated"):
+            # the stream was cut off: send whatever complete part of the next quarter was recovered
+            for q in result["quarters"][len(streamed):]:
+                quarter, quarter_warnings, reminder = self._process_quarter(q)
+                warnings.extend(quarter_warnings)
+                reminder_to_meet = reminder_to_meet or reminder
+                streamed.append(quarter)
+                yield {"event": "quarter", "quarter": quarter, "warnings": quarter_warnings}
+        elif is_complete_schedule(result) and used_mode == params["prompt_mode"]:
+            await self.cache.aput(cache_key, result)
+        diagnostics = list(dict.fromkeys(diagnostics + result.get("diagnostics", [])))
+        # quarters already went out as written; if the plan needed fixing, send the repaired whole
+        repaired = self._repair({"schedule": streamed, "warnings": warnings,
+                                 "reminder_to_meet_counselor": reminder_to_meet}, params)
+        repairs = repaired["warnings"][len(warnings):]
+        if repairs:
+            yield {"event": "repaired", "schedule": repaired["schedule"], "warnings": repairs}
+        yield {
+            "event": "done",
+            "cached": False,
+            "planner": "sonar",
+            "warnings": repaired["warnings"],
+            "citations": result.get("citations", []),
+            "reminder_to_meet_counselor": repaired["reminder_to_meet_counselor"],
+            **({"diagnostics": diagnostics} if diagnostics else {})
+        }
+
+    @staticmethod
+    def _plan_events(plan: Dict[str, Any], cached: bool) -> List[Dict[str, Any]]:
+        """A finished plan as stream events: its quarters, then "done" with everything else."""
+        events = [{"event": "quarter", "quarter": quarter,
+                   "warnings": [w for w in plan["warnings"] if w["term"] == quarter["term"]]}
+                  for quarter in plan["schedule"]]
+        events.append({"event": "done", "cached": cached, **{k: v for k, v in plan.items() if k != "schedule"}})
+        return events
+
+    async def _fallback(self, params: Dict[str, Any], cache_key: str, current_gpa: Optional[float],
+                        error: SonarUnavailable, pathway: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        A plan without Sonar, marked "degraded": an expired cached answer if one is still on
+        disk, else the local solver's plan. Re-raises `error` when neither is available.
+        """
+        print(f"Sonar unavailable, falling back: {error}")
+        stale = await self.cache.aget(cache_key, stale_ok=True)
+        if stale is not None:
+            plan = dict(self._repair(self._postprocess(stale), params), planner="sonar", degraded="stale_cache")
+            message = "The live planner is unavailable; this is an earlier saved plan for the same request."
+        else:
+            try:
+                plan = await self._local_plan(params, "local", current_gpa, pathway)
+            except ValueError:
+                raise error
+            plan["degraded"] = "local"
+            message = "The live planner is unavailable; this plan was built locally from ASSIST requirements."
+        plan["warnings"] = [{"term": None, "code": None, "message": message}] + plan["warnings"]
+        return plan
+
+    async def _query_sonar(self, prompt: str, label: str) -> Dict[str, Any]:
+        # 2. Query Sonar; it returns a dict already parsed from JSON
+        try:
+            return await self.sonar.query(user_query=prompt, label=label)
+        except Exception:
+            # Let FastAPI handler catch and convert to HTTP error
+            raise
+
+    async def _build_prompt(self, params: Dict[str, Any],
+                            pathway: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """The prompt and the mode it was built in; grounded falls back to research if ASSIST has no data."""
+        if params["prompt_mode"] == "grounded":
+            requirements = await self._remaining_requirements(params, pathway)
+            if requirements is not None:
+                prompt = self.sonar.build_grounded_prompt(
+                    requirements,
+                    params["origin_institution"],
+                    params["target_major"],
+                    params["target_institution"],
+                    params["academic_year"],
+                    params["unit_range"],
+                    params["preferred_times"]
+                )
+                return prompt, "grounded"
+        return self._build_research_prompt(params), "research"
+
+    async def resolve_pathway(self, origin_institution: str, target_institution: str, target_major: str,
+                              academic_year: str) -> Dict[str, Any]:
+        """
+        The ASSIST requirements for one pathway with no completed courses applied. A failed
+        lookup comes back as {"error": ...}, so it isn't retried for every student on the pathway.
+        """
+        try:
+            transfer = await get_transfer_courses_async(origin_institution, target_institution, target_major,
+                                                        target_academic_year_str=academic_year)
+        except Exception as e:
+            print(f"Requirement lookup for {origin_institution} -> {target_institution} ({target_major}) failed: {e}")
+            return {"error": str(e)}
+        return transfer
+
+    async def _remaining_requirements(self, params: Dict[str, Any],
+                                      pathway: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Requirement table rows (code, units, title, requires, alternatives) for the articulated
+        courses the student still needs, one row per canonical course; None if the lookup found
+        nothing. Where the agreement offers a choice ("CIS 22A or CIS 36A", or one of several
+        course sets) only one option becomes a row; the others are listed in its "alternatives".
+        """
+        if pathway is None:
+            pathway = await self.resolve_pathway(params["origin_institution"], params["target_institution"],
+                                                 params["target_major"], params["academic_year"])
+        if not pathway.get("requirements"):
+            print(f"No ASSIST requirements for grounded prompt ({pathway.get('error', 'empty agreement')}); "
+                  "using the research prompt.")
+            return None
+        transfer = apply_completed_courses(pathway, params["completed_courses"])
+        # prerequisite chains at the origin, plus sequence guesses for this agreement's courses
+        # the origin has no data for (kept to this request, never written to the shared graph)
+        graph = get_prerequisite_store().graph(params["origin_institution"]).with_sequence_guesses(
+            req.get("code") for req in transfer["requirements"])
+        choice = CompletionMatcher(params["completed_courses"], graph.equivalences).choose_alternatives(
+            transfer.get("requirement_groups"))
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        for req in transfer["requirements"]:
+            code = req.get("code")
+            if not code or req.get("status") != "remaining":
+                continue
+            key = graph.equivalences.canonical(code)
+            if key in choice.dropped:
+                continue
+            row = rows.setdefault(key, {"code": code, "units": req.get("units"), "title": req.get("title")})
+            if choice.alternatives.get(key):
+                row["alternatives"] = choice.alternatives[key]
+        for row in rows.values():
+            # transitive, so ordering holds even through courses outside the table
+            row["requires"] = [rows[key]["code"] for key in graph.ancestors(row["code"]) if key in rows]
+        return list(rows.values())
+
+    def _build_research_prompt(self, params: Dict[str, Any]) -> str:
         # 1. Build the free-form prompt string
         prompt = self.sonar.build_prompt(
-            completed_courses,
-            target_major,
-            target_institution,
-            academic_year,
-            unit_range,
-            preferred_times
+            params["completed_courses"],
+            params["target_major"],
+            params["target_institution"],
+            params["academic_year"],
+            params["unit_range"],
+            params["preferred_times"]
         )
 
         # 1a. Add scheduling guidelines for prerequisites, subject distribution, course prioritization, and transfer timing
@@ -38,64 +340,85 @@ class Scheduler:
             "prioritize major-required courses before general education (GE) courses, "
             "and plan courses across upcoming quarters to complete all major requirements before the UC application period opens and finish all required coursework prior to transfer."
         )
-        prompt = f"{prompt}\n\n{guidelines}"
+        return f"{prompt}\n\n{guidelines}"
 
-        # 2. Query Sonar; it returns a dict already parsed from JSON
-        try:
-            result = self.sonar.query(user_query=prompt, timeout=30)
-        except Exception:
-            # Let FastAPI handler catch and convert to HTTP error
-            raise
+    def _repair(self, processed: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Checks the model's plan against prerequisites, the unit maximum, one course per subject
+        per quarter and completed courses, fixes it locally and appends what changed to warnings.
+        """
+        graph = get_prerequisite_store().graph(params["origin_institution"]) if params["origin_institution"] else None
+        schedule, repairs = repair_schedule(processed["schedule"], params["completed_courses"],
+                                            params["unit_range"], graph)
+        if not repairs:
+            return processed
+        flagged = any(r["action"] in ("flagged", "kept") for r in repairs)
+        return dict(processed, schedule=schedule, warnings=processed["warnings"] + repairs,
+                    reminder_to_meet_counselor=processed["reminder_to_meet_counselor"] or flagged)
 
+    def _postprocess(self, result: Dict[str, Any]) -> Dict[str, Any]:
         warnings: List[Dict[str, Any]] = []
         schedule: List[Dict[str, Any]] = []
         reminder_to_meet = False
 
         # 3. Process each quarter returned
         for q in result.get("quarters", []):
-            term = q.get("term")
-            courses_out = []
-            for c in q.get("courses", []):
-                code = c.get("code")
-                units = c.get("units")
-                title = c.get("title")
-
-                if c.get("no_articulation"):
-                    reminder_to_meet = True
-                    warnings.append({
-                        "term": term,
-                        "code": code,
-                        "message": "No articulation found—please meet your ISP counselor."
-                    })
-                    continue
-
-                if c.get("must_take_at_university"):
-                    reminder_to_meet = True
-                    warnings.append({
-                        "term": term,
-                        "code": code,
-                        "message": "This course must be taken after transfer—please consult counselor."
-                    })
-                    # insert an elective placeholder
-                    courses_out.append({
-                        "code": "ELECTIVE",
-                        "title": "Advisor-chosen elective",
-                        "units": units or 3
-                    })
-                    continue
-
-                # normal articulated course
-                courses_out.append({
-                    "code": code,
-                    "title": title,
-                    "units": units
-                })
-
-            schedule.append({"term": term, "courses": courses_out})
+            quarter, quarter_warnings, reminder = self._process_quarter(q)
+            schedule.append(quarter)
+            warnings.extend(quarter_warnings)
+            reminder_to_meet = reminder_to_meet or reminder
 
-        return {
+        processed = {
             "schedule": schedule,
             "warnings": warnings,
             "citations": result.get("citations", []),
             "reminder_to_meet_counselor": reminder_to_meet
         }
+        if result.get("diagnostics"):
+            # what the tolerant parser had to repair or drop in Sonar's JSON
+            processed["diagnostics"] = result["diagnostics"]
+        return processed
+
+    def _process_quarter(self, q: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]], bool]:
+        """Drops unarticulated courses and swaps university-only ones for an elective placeholder."""
+        warnings: List[Dict[str, Any]] = []
+        reminder_to_meet = False
+        term = q.get("term")
+        courses_out = []
+        for c in q.get("courses", []):
+            code = c.get("code")
+            units = c.get("units")
+            title = c.get("title")
+
+            if c.get("no_articulation"):
+                reminder_to_meet = True
+                warnings.append({
+                    "term": term,
+                    "code": code,
+                    "message": "No articulation found—please meet your ISP counselor."
+                })
+                continue
+
+            if c.get("must_take_at_university"):
+                reminder_to_meet = True
+                warnings.append({
+                    "term": term,
+                    "code": code,
+                    "message": "This course must be taken after transfer—please consult counselor."
+                })
+                # insert an elective placeholder
+                courses_out.append({
+                    "code": "ELECTIVE",
+                    "title": "Advisor-chosen elective",
+                    "units": units or 3
+                })
+                continue
+
+            # normal articulated course
+            courses_out.append({
+                "code": code,
+                "title": title,
+                "units": units
+            })
+
+        return {"term": term, "courses": courses_out}, warnings, reminder_to_meet
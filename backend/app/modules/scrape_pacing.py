@@ -0,0 +1,88 @@
+# backend/app/modules/scrape_pacing.py
+
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+
+class PacingPolicy:
+    """
+    How the Selenium scraper paces itself between steps.
+
+    "humanized" keeps the randomized pauses and per-character typing. "fast" drops every fixed
+    sleep: steps wait only on readiness conditions (document.readyState plus the explicit
+    WebDriverWaits at each step) and text is sent in one call.
+    """
+
+    def __init__(self, name: str, jitter: bool, keystroke_delay: Optional[Tuple[float, float]] = None):
+        self.name = name
+        self.jitter = jitter
+        self.keystroke_delay = keystroke_delay
+
+    def settle(self, driver, min_seconds: float = 0.3, max_seconds: float = 1.0, timeout: float = 15.0) -> None:
+        """Pause after an action: a random delay when humanized, otherwise until the document is ready."""
+        if self.jitter:
+            time.sleep(random.uniform(min_seconds, max_seconds))
+            return
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if driver.execute_script("return document.readyState") == "complete":
+                    return
+            except Exception:
+                return
+            time.sleep(0.05)
+
+    def type_text(self, element, text: str) -> None:
+        if not self.keystroke_delay:
+            element.send_keys(text)
+            return
+        for char in text:
+            element.send_keys(char)
+            time.sleep(random.uniform(*self.keystroke_delay))
+
+
+PACING_PROFILES: Dict[str, PacingPolicy] = {
+    "humanized": PacingPolicy("humanized", jitter=True, keystroke_delay=(0.03, 0.08)),
+    "fast": PacingPolicy("fast", jitter=False),
+}
+
+
+def get_pacing_policy(name: Optional[str] = None) -> PacingPolicy:
+    name = (name or settings.SELENIUM_PACING).lower()
+    if name not in PACING_PROFILES:
+        print(f"Unknown pacing profile '{name}', using 'humanized'.")
+        name = "humanized"
+    return PACING_PROFILES[name]
+
+
+class StepTimer:
+    """
+    Wall-clock time per named scraper step, in the order the steps ran. Steps are sequential:
+    begin() closes the running step and starts the next; summary() closes the last one.
+    """
+
+    def __init__(self, on_step: Optional[Callable[[str], None]] = None):
+        self.started = time.perf_counter()
+        self.steps: List[Dict[str, object]] = []
+        self._current: Optional[Tuple[str, float]] = None
+        self._on_step = on_step
+
+    def begin(self, name: str) -> None:
+        self._close(ok=True)
+        self._current = (name, time.perf_counter())
+        if self._on_step:
+            self._on_step(name)
+
+    def _close(self, ok: bool) -> None:
+        if self._current is not None:
+            name, started = self._current
+            self.steps.append({"step": name, "seconds": round(time.perf_counter() - started, 3), "ok": ok})
+            self._current = None
+
+    def summary(self, failed: bool = False) -> Dict[str, object]:
+        """Timings so far; `failed` marks the step that was running as the one that failed."""
+        self._close(ok=not failed)
+        return {"total_seconds": round(time.perf_counter() - self.started, 3), "steps": list(self.steps)}
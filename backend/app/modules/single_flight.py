@@ -0,0 +1,60 @@
+# backend/app/modules/single_flight.py
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls with the same key: the first caller starts the call as a
+    task and later callers await that same task. The task is shielded, so a disconnecting
+    caller never cancels the work others are waiting on. Keys are released once the call ends;
+    this is coalescing, not caching.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {"calls": 0, "upstream": 0, "coalesced": 0, "errors": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["upstream"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._finish(key, t))
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats, in_flight=len(self._inflight))
+
+
+_flights: Dict[str, SingleFlight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Returns the process-wide coalescing group `name` (e.g. "transfers", "schedule")."""
+    with _flights_lock:
+        if name not in _flights:
+            _flights[name] = SingleFlight(name)
+        return _flights[name]
+
+
+def coalescing_stats(name: Optional[str] = None) -> Dict[str, Any]:
+    with _flights_lock:
+        flights = dict(_flights)
+    if name is not None:
+        return flights[name].snapshot() if name in flights else {}
+    return {flight_name: flight.snapshot() for flight_name, flight in flights.items()}
@@ -0,0 +1,193 @@
+# backend/app/modules/sonar_cache.py
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, Text, create_engine, delete, func, select
+
+from app.config import settings
+
+metadata = MetaData()
+
+sonar_responses = Table(
+    "sonar_responses",
+    metadata,
+    Column("key", String(128), primary_key=True),
+    Column("payload", Text, nullable=False),
+    Column("size", Integer, nullable=False),
+    Column("created_at", Float, nullable=False),
+    Column("last_used", Float, nullable=False),
+)
+
+
+class SonarResponseCache:
+    """
+    Parsed Sonar completions keyed by request fingerprint (see fingerprints.schedule_fingerprint).
+
+    Two tiers: an in-memory LRU of decoded payloads in front of a SQLite table that survives
+    restarts. Entries expire `ttl` seconds after they were fetched; the disk tier is trimmed
+    least-recently-used first once it holds more than `max_entries` rows or `max_bytes` of JSON.
+    Expired rows are kept another `stale_ttl` seconds, readable only with stale_ok=True (used
+    when Sonar is unavailable).
+    """
+
+    def __init__(self, url: Optional[str] = None, ttl: Optional[int] = None, memory_entries: Optional[int] = None,
+                 max_entries: Optional[int] = None, max_bytes: Optional[int] = None, stale_ttl: Optional[int] = None):
+        self.url = url or settings.SONAR_CACHE_URL
+        self.ttl = ttl if ttl is not None else settings.SONAR_CACHE_TTL
+        self.stale_ttl = stale_ttl if stale_ttl is not None else settings.SONAR_CACHE_STALE_TTL
+        self.memory_entries = memory_entries if memory_entries is not None else settings.SONAR_CACHE_MEMORY_ENTRIES
+        self.max_entries = max_entries if max_entries is not None else settings.SONAR_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes if max_bytes is not None else settings.SONAR_CACHE_MAX_BYTES
+        connect_args = {"check_same_thread": False} if self.url.startswith("sqlite") else {}
+        self.engine = create_engine(self.url, connect_args=connect_args)
+        metadata.create_all(self.engine)
+
+        self._memory: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "stale_hits": 0, "stores": 0,
+                       "memory_evictions": 0, "disk_evictions": 0}
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += n
+
+    def _remember(self, key: str, payload: Dict[str, Any], created_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (payload, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+                self._stats["memory_evictions"] += 1
+
+    def get(self, key: str, stale_ok: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        The cached payload for `key`, or None on a miss or an expired entry. With `stale_ok`
+        (Sonar is down) an expired entry that hasn't been trimmed yet is returned instead.
+        """
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit and now - hit[1] <= self.ttl:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return hit[0]
+            if hit and stale_ok and now - hit[1] <= self.ttl + self.stale_ttl:
+                self._stats["stale_hits"] += 1
+                return hit[0]
+            if hit:
+                del self._memory[key]
+
+        stale = False
+        with self.engine.begin() as conn:
+            row = conn.execute(
+                select(sonar_responses.c.payload, sonar_responses.c.created_at)
+                .where(sonar_responses.c.key == key)
+            ).first()
+            if row is not None and now - row.created_at > self.ttl:
+                # expired rows stay on disk for the stale window (see _trim) as a fallback
+                if stale_ok and now - row.created_at <= self.ttl + self.stale_ttl:
+                    stale = True
+                else:
+                    self._count("expired")
+                    row = None
+            elif row is not None:
+                conn.execute(sonar_responses.update().where(sonar_responses.c.key == key).values(last_used=now))
+        if row is None:
+            self._count("misses")
+            return None
+
+        payload = json.loads(row.payload)
+        if stale:
+            self._count("stale_hits")
+            return payload
+        self._remember(key, payload, row.created_at)
+        self._count("disk_hits")
+        return payload
+
+    async def aget(self, key: str, stale_ok: bool = False) -> Optional[Dict[str, Any]]:
+        """get() for the event loop: memory hits return inline, disk lookups run in a worker thread."""
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit and time.time() - hit[1] <= self.ttl:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return hit[0]
+        return await asyncio.to_thread(self.get, key, stale_ok)
+
+    async def aput(self, key: str, payload: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self.put, key, payload)
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        now = time.time()
+        encoded = json.dumps(payload)
+        with self.engine.begin() as conn:
+            conn.execute(delete(sonar_responses).where(sonar_responses.c.key == key))
+            conn.execute(sonar_responses.insert().values(key=key, payload=encoded, size=len(encoded),
+                                                         created_at=now, last_used=now))
+        self._remember(key, payload, now)
+        self._count("stores")
+        self._trim()
+
+    def _trim(self) -> None:
+        """Drops rows past the stale window, then least-recently-used rows until both disk limits hold."""
+        with self.engine.begin() as conn:
+            expired = conn.execute(
+                delete(sonar_responses).where(sonar_responses.c.created_at < time.time() - self.ttl - self.stale_ttl)
+            ).rowcount or 0
+            count, total = conn.execute(
+                select(func.count(), func.coalesce(func.sum(sonar_responses.c.size), 0))
+            ).one()
+            evicted = []
+            if count > self.max_entries or total > self.max_bytes:
+                rows = conn.execute(
+                    select(sonar_responses.c.key, sonar_responses.c.size).order_by(sonar_responses.c.last_used)
+                ).all()
+                for key, size in rows:
+                    if count <= self.max_entries and total <= self.max_bytes:
+                        break
+                    evicted.append(key)
+                    count, total = count - 1, total - size
+                conn.execute(delete(sonar_responses).where(sonar_responses.c.key.in_(evicted)))
+        if expired:
+            self._count("expired", expired)
+        if evicted:
+            self._count("disk_evictions", len(evicted))
+            with self._lock:
+                for key in evicted:
+                    self._memory.pop(key, None)
+
+    def clear(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(sonar_responses))
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.engine.connect() as conn:
+            count, total = conn.execute(
+                select(func.count(), func.coalesce(func.sum(sonar_responses.c.size), 0))
+            ).one()
+        with self._lock:
+            stats = dict(self._stats, memory_entries=len(self._memory), disk_entries=count, disk_bytes=total)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_cache: Optional[SonarResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_sonar_cache() -> SonarResponseCache:
+    """Returns the process-wide Sonar response cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SonarResponseCache()
+    return _cache
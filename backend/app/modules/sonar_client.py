@@ -1,27 +1,130 @@
 # backend/app/modules/sonar_client.py
 
-import requests
+import asyncio
 import json
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
 from app.config import settings
+from app.modules.llm_json import parse_schedule_content
+from app.modules.sonar_resilience import get_sonar_resilience, is_retryable
+
+class SonarUsage:
+    """
+    Per-request token counts (from the API's "usage" block) and latency, totalled per prompt
+    label ("grounded", "research", ...) so prompt variants can be compared, plus how often the
+    completion parsed cleanly, needed repair, or could not be parsed at all.
+    """
+
+    PARSE_OUTCOMES = ("clean", "repaired", "failed")
+
+    def __init__(self, recent: int = 50):
+        self._totals: Dict[str, Dict[str, float]] = {}
+        self._parses: Dict[str, int] = dict.fromkeys(self.PARSE_OUTCOMES, 0)
+        self._recent: deque = deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    def record(self, label: str, usage: Optional[Dict[str, Any]], latency: float, prompt_chars: int,
+               first_token_seconds: Optional[float] = None) -> None:
+        usage = usage or {}
+        record = {
+            "label": label,
+            "at": round(time.time(), 3),
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "prompt_chars": prompt_chars,
+            "latency_seconds": round(latency, 3),
+        }
+        if first_token_seconds is not None:
+            record["first_token_seconds"] = round(first_token_seconds, 3)
+        with self._lock:
+            totals = self._totals.setdefault(label, {"requests": 0, "with_usage": 0, "prompt_tokens": 0,
+                                                     "completion_tokens": 0, "prompt_chars": 0,
+                                                     "latency_seconds": 0.0})
+            totals["requests"] += 1
+            totals["prompt_chars"] += prompt_chars
+            totals["latency_seconds"] += latency
+            if usage:
+                totals["with_usage"] += 1
+                totals["prompt_tokens"] += usage.get("prompt_tokens") or 0
+                totals["completion_tokens"] += usage.get("completion_tokens") or 0
+            self._recent.append(record)
+
+    def record_parse(self, outcome: str) -> None:
+        with self._lock:
+            self._parses[outcome] = self._parses.get(outcome, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            by_label = {}
+            for label, t in self._totals.items():
+                counted = t["with_usage"] or 1
+                by_label[label] = {
+                    "requests": t["requests"],
+                    "avg_prompt_tokens": round(t["prompt_tokens"] / counted, 1),
+                    "avg_completion_tokens": round(t["completion_tokens"] / counted, 1),
+                    "avg_prompt_chars": round(t["prompt_chars"] / t["requests"], 1),
+                    "avg_latency_seconds": round(t["latency_seconds"] / t["requests"], 3),
+                    "total_prompt_tokens": t["prompt_tokens"],
+                    "total_completion_tokens": t["completion_tokens"],
+                }
+            return {"by_prompt": by_label, "parses": dict(self._parses), "recent": list(self._recent)}
+
+
+_usage = SonarUsage()
+
+
+def get_sonar_usage() -> SonarUsage:
+    return _usage
+
 
 class SonarClient:
     """
     Queries Perplexity’s Sonar API via chat/completions.
     Ensures the response is parsed into a Python dict,
     handling cases where JSON is returned as a string, and logs raw output for debugging.
+    Requests share one keep-alive httpx pool per event loop, so concurrent schedule
+    generations reuse TLS connections instead of opening one each.
     """
 
     BASE_URL = "https://api.perplexity.ai/chat/completions"
 
-    def __init__(self):
+    def __init__(self, max_connections: Optional[int] = None):
         self.headers = {
             "Authorization": f"Bearer {settings.SONAR_API_KEY}",
             "Content-Type": "application/json",
             "Accept": "application/json",
         }
+        self.max_connections = max_connections or settings.SONAR_MAX_CONNECTIONS
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                timeout=self._timeout(),
+            )
+            self._client_loop = loop
+        return self._client
 
-    def query(self, user_query: str, timeout: int = 30) -> Dict[str, Any]:
+    @staticmethod
+    def _timeout(read_timeout: Optional[float] = None) -> httpx.Timeout:
+        return httpx.Timeout(read_timeout or settings.SONAR_READ_TIMEOUT, connect=settings.SONAR_CONNECT_TIMEOUT)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _payload(self, user_query: str, stream: bool = False) -> Dict[str, Any]:
         payload = {
             "model": "sonar-pro",
             "messages": [
@@ -53,34 +156,115 @@ class SonarClient:
                 }
             ]
         }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    async def query(self, user_query: str, timeout: Optional[float] = None, label: str = "default") -> Dict[str, Any]:
+        """
+        `timeout` overrides the read timeout (SONAR_READ_TIMEOUT) of each attempt; retries and
+        hedges share SONAR_REQUEST_BUDGET (see sonar_resilience). Token usage and latency are
+        recorded under `label`. Raises SonarUnavailable when the upstream can't answer in time.
+        """
+        started = time.perf_counter()
+        body = await get_sonar_resilience().call(lambda t: self._post(user_query, t), read_timeout=timeout)
+        raw = body["choices"][0]["message"]["content"]
+        get_sonar_usage().record(label, body.get("usage"), time.perf_counter() - started, len(user_query))
 
-        resp = requests.post(
+        print("\n🛰️ Sonar raw output:\n", raw, "\n")
+
+        return self.parse_content(raw)
+
+    async def _post(self, user_query: str, timeout: float) -> Dict[str, Any]:
+        resp = await self._get_client().post(
             self.BASE_URL,
-            headers=self.headers,
-            json=payload,
-            timeout=timeout
+            json=self._payload(user_query),
+            timeout=self._timeout(timeout)
         )
         resp.raise_for_status()
+        return resp.json()
 
-        body = resp.json()
-        raw = body["choices"][0]["message"]["content"]
-
-        print("\n🛰️ Sonar raw output:\n", raw, "\n")
+    async def stream(self, user_query: str, timeout: Optional[float] = None,
+                     label: str = "default") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streamed completion: yields each server-sent chunk as a dict. The text delta is in
+        chunk["choices"][0]["delta"]["content"] (see delta_text). Usage (sent with the last
+        chunks), latency and time to first chunk are recorded under `label`.
 
+        Failures before the first chunk are retried like query(); once text has been yielded
+        the error is raised to the caller. Streams are not hedged.
+        """
+        resilience = get_sonar_resilience()
+        started = time.perf_counter()
+        first_chunk: Optional[float] = None
+        usage: Optional[Dict[str, Any]] = None
         try:
-            parsed = json.loads(raw)
-        except json.JSONDecodeError:
-            raise ValueError(f"Failed to JSON-decode Sonar response:\n{raw}")
+            request_started, attempt = resilience.start(), 0
+            while first_chunk is None:
+                resilience.before_attempt()
+                read_timeout = min(timeout or settings.SONAR_READ_TIMEOUT, resilience.remaining(request_started))
+                try:
+                    async for chunk in self._stream_chunks(user_query, read_timeout):
+                        if first_chunk is None:
+                            first_chunk = time.perf_counter() - started
+                            # no latency sample: time to first chunk would drag down the hedge
+                            # delay that full query() completions are measured against
+                            resilience.record_success()
+                        usage = chunk.get("usage") or usage
+                        yield chunk
+                    if first_chunk is None:
+                        resilience.record_success()
+                        return
+                except Exception as e:
+                    if first_chunk is not None:
+                        if is_retryable(e):
+                            resilience.breaker.record_failure()
+                        raise
+                    await resilience.after_failure(e, attempt, request_started)
+                    attempt += 1
+        finally:
+            get_sonar_usage().record(label, usage, time.perf_counter() - started, len(user_query), first_chunk)
 
-        if isinstance(parsed, str):
-            try:
-                parsed = json.loads(parsed)
-            except json.JSONDecodeError:
-                raise ValueError(f"Failed second-pass decode of Sonar response:\n{parsed}")
+    async def _stream_chunks(self, user_query: str, timeout: Optional[float]) -> AsyncIterator[Dict[str, Any]]:
+        async with self._get_client().stream(
+            "POST",
+            self.BASE_URL,
+            json=self._payload(user_query, stream=True),
+            headers={"Accept": "text/event-stream"},
+            timeout=self._timeout(timeout)
+        ) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return
+                try:
+                    yield json.loads(data)
+                except json.JSONDecodeError:
+                    print(f"Skipping undecodable Sonar stream chunk: {data[:200]}")
 
-        if not isinstance(parsed, dict):
-            raise ValueError(f"Unexpected Sonar response type: {type(parsed)}, content:\n{parsed}")
+    @staticmethod
+    def delta_text(chunk: Dict[str, Any]) -> str:
+        choices = chunk.get("choices") or [{}]
+        delta = choices[0].get("delta") or {}
+        return delta.get("content") or ""
 
+    @staticmethod
+    def parse_content(raw: str) -> Dict[str, Any]:
+        """
+        Decodes the completion text into a schema-checked dict (see llm_json.parse_schedule_content):
+        fences, surrounding prose, double encoding, trailing commas and truncation are tolerated.
+        """
+        try:
+            parsed = parse_schedule_content(raw)
+        except ValueError:
+            get_sonar_usage().record_parse("failed")
+            raise
+        get_sonar_usage().record_parse("repaired" if parsed.get("diagnostics") else "clean")
+        if parsed.get("diagnostics"):
+            print(f"Repaired Sonar response: {parsed['diagnostics']}")
         return parsed
 
     def build_prompt(
@@ -152,4 +336,46 @@ class SonarClient:
             " Use the exact structure shown above."
         )
 
-        return "\n\n".join(steps)
\ No newline at end of file
+        return "\n\n".join(steps)
+
+    def build_grounded_prompt(
+        self,
+        requirements: List[Dict[str, Any]],
+        origin_institution: str,
+        target_major: str,
+        target_institution: str,
+        academic_year: str,
+        unit_range: Optional[List[int]] = None,
+        preferred_times: Optional[List[str]] = None
+    ) -> str:
+        """
+        Prompt for sequencing only: `requirements` (rows with code, units, title, requires and
+        optional alternatives) were already resolved from ASSIST and filtered against completed
+        courses, so the model gets a compact table instead of instructions to research
+        articulation and catalogs itself. Alternatives are options for a row, not extra courses.
+        """
+        unit_range = unit_range or [12, 16]
+        rows = [
+            f"{r['code']} | {r.get('units') if r.get('units') is not None else '?'} | {r.get('title') or ''} | "
+            + (", ".join(r.get("requires") or []) or "-") + " | "
+            + ("; ".join(r.get("alternatives") or []) or "-")
+            for r in requirements
+        ]
+        lines = [
+            f"Schedule quarters starting in {academic_year} for a student at {origin_institution} "
+            f"transferring to {target_institution} for {target_major}.",
+            "Remaining articulated major requirements (from ASSIST; authoritative and complete, "
+            "do not look up or add other major courses):",
+            "code | units | title | requires | may be replaced by",
+            *rows,
+            f"Rules: {unit_range[0]}-{unit_range[1]} units per quarter. Place a course only after every "
+            "course in its 'requires' column. At most one course per subject prefix per quarter. "
+            "Schedule every listed course once, major requirements first. A 'may be replaced by' entry "
+            "is an option, not an additional requirement: schedule either the listed course or that "
+            "option, never both. Fill spare units with "
+            "{\"code\": \"GE\", \"title\": \"General Education\"} placeholders.",
+        ]
+        if preferred_times:
+            lines.append("Prefer course times in " + ", ".join(preferred_times) + ".")
+        lines.append("Respond only with the JSON object in the format shown.")
+        return "\n".join(lines)
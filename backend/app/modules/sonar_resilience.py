@@ -0,0 +1,254 @@
+# backend/app/modules/sonar_resilience.py
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from app.config import settings
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class SonarUnavailable(RuntimeError):
+    """Sonar could not answer within the request budget (or the circuit is open)."""
+
+
+class CircuitOpen(SonarUnavailable):
+    pass
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Timeouts, connection errors and 408/429/5xx responses; other 4xx mean the request itself is wrong."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS
+    return isinstance(error, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failures` consecutive failures; open rejects calls for `reset` seconds,
+    then half-open lets a single probe through: success closes the circuit, failure reopens it.
+    """
+
+    def __init__(self, failures: int, reset: float):
+        self.failures = failures
+        self.reset = reset
+        self.state = "closed"
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probe_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"opened": 0, "rejected": 0}
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self.state == "closed":
+                return True
+            # a probe that never reported back (cancelled) doesn't hold the circuit half-open forever
+            if (self.state == "open" and now - self._opened_at >= self.reset) or \
+                    (self.state == "half_open" and now - self._probe_at >= self.reset):
+                self.state, self._probe_at = "half_open", now
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self._opened_at + self.reset - time.monotonic())
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state, self._consecutive = "closed", 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive += 1
+            if self.state == "half_open" or (self.state == "closed" and self._consecutive >= self.failures):
+                self.state, self._opened_at = "open", time.monotonic()
+                self.stats["opened"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, state=self.state, consecutive_failures=self._consecutive)
+
+
+class SonarResilience:
+    """
+    Retries, hedging and a circuit breaker around Sonar calls.
+
+    Each request gets a time budget (SONAR_REQUEST_BUDGET) shared by all of its attempts.
+    Retryable failures back off exponentially with full jitter, and retries draw from a token
+    bucket refilled by SONAR_RETRY_RATIO per request, so an outage can't multiply upstream load.
+    Once there are enough latency samples, an attempt still running at the SONAR_HEDGE_PERCENTILE
+    latency gets a duplicate request; the first to succeed wins and the other is cancelled.
+    Hedges draw from the same token bucket.
+    """
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(settings.SONAR_BREAKER_FAILURES, settings.SONAR_BREAKER_RESET)
+        self._latencies: deque = deque(maxlen=200)
+        self._tokens = 10.0
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "attempts": 0, "retries": 0, "retry_budget_denied": 0,
+                      "gave_up": 0, "hedges": 0, "hedge_wins": 0, "failures": 0}
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += n
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while hedging is off or samples are too few."""
+        if settings.SONAR_HEDGE_PERCENTILE <= 0 or len(self._latencies) < settings.SONAR_HEDGE_MIN_SAMPLES:
+            return None
+        return self.percentile(settings.SONAR_HEDGE_PERCENTILE)
+
+    # --- Attempt bookkeeping (shared by call() and streamed requests) ---
+    def start(self) -> float:
+        """Registers a request; returns its start time for remaining()."""
+        with self._lock:
+            self.stats["requests"] += 1
+            self._tokens = min(10.0, self._tokens + settings.SONAR_RETRY_RATIO)
+        return time.monotonic()
+
+    def before_attempt(self) -> None:
+        if not self.breaker.allow():
+            raise CircuitOpen(f"Sonar circuit open after repeated failures; retry in {self.breaker.retry_after():.0f}s.")
+        self._count("attempts")
+
+    def remaining(self, started: float, budget: Optional[float] = None) -> float:
+        return (budget or settings.SONAR_REQUEST_BUDGET) - (time.monotonic() - started)
+
+    def record_success(self, latency: Optional[float] = None) -> None:
+        """`latency` feeds the hedge delay, so only whole (non-streamed) completions should pass one."""
+        self.breaker.record_success()
+        if latency is not None:
+            with self._lock:
+                self._latencies.append(latency)
+
+    async def after_failure(self, error: BaseException, attempt: int, started: float,
+                            budget: Optional[float] = None) -> None:
+        """
+        Sleeps before the next attempt, or raises: `error` itself if it isn't retryable,
+        SonarUnavailable once attempts, the time budget or the retry tokens run out.
+        """
+        if not is_retryable(error):
+            # the upstream answered; the request was the problem
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        self._count("failures")
+        delay = random.uniform(0, min(settings.SONAR_RETRY_MAX_DELAY, settings.SONAR_RETRY_BASE_DELAY * 2 ** attempt))
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = error.response.headers.get("retry-after", "")
+            if retry_after.replace(".", "", 1).isdigit():
+                delay = max(delay, float(retry_after))
+        if attempt + 1 >= settings.SONAR_MAX_ATTEMPTS or self.remaining(started, budget) - delay < 1:
+            self._count("gave_up")
+            raise SonarUnavailable(f"Sonar unavailable after {attempt + 1} attempt(s): {error!r}") from error
+        if not self._take_token():
+            self._count("retry_budget_denied")
+            raise SonarUnavailable(f"Sonar unavailable (retry budget spent): {error!r}") from error
+        self._count("retries")
+        print(f"Sonar attempt {attempt + 1} failed ({error!r}); retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    # --- Calls ---
+    async def call(self, attempt: Callable[[float], Awaitable[Any]], read_timeout: Optional[float] = None,
+                   budget: Optional[float] = None) -> Any:
+        """
+        Runs `attempt(timeout)` with retries and hedging inside the request budget. `timeout` is
+        the read timeout for that attempt: `read_timeout` (default SONAR_READ_TIMEOUT) capped by
+        what is left of the budget.
+        """
+        started = self.start()
+        n = 0
+        while True:
+            self.before_attempt()
+            timeout = min(read_timeout or settings.SONAR_READ_TIMEOUT, self.remaining(started, budget))
+            try:
+                return await self._hedged(attempt, timeout)
+            except Exception as e:
+                await self.after_failure(e, n, started, budget)
+            n += 1
+
+    async def _hedged(self, attempt: Callable[[float], Awaitable[Any]], timeout: float) -> Any:
+        async def timed(t: float) -> Any:
+            began = time.monotonic()
+            result = await attempt(t)
+            return result, time.monotonic() - began
+
+        primary = asyncio.ensure_future(timed(timeout))
+        tasks = [primary]
+        try:
+            delay = self.hedge_delay()
+            if delay is not None and delay < timeout:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done and self._take_token():
+                    self._count("hedges")
+                    tasks.append(asyncio.ensure_future(timed(timeout - delay)))
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        result, latency = task.result()
+                        if task is not primary:
+                            self._count("hedge_wins")
+                        self.record_success(latency)
+                        return result
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            samples = len(self._latencies)
+            tokens = round(self._tokens, 2)
+        stats["hedge_win_rate"] = round(stats["hedge_wins"] / stats["hedges"], 3) if stats["hedges"] else 0.0
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "breaker": self.breaker.snapshot(),
+            "calls": stats,
+            "retry_tokens": tokens,
+            "latency": {"samples": samples, "p50_seconds": round(p50, 3) if p50 is not None else None,
+                        "p95_seconds": round(p95, 3) if p95 is not None else None},
+            "hedge_delay_seconds": self.hedge_delay(),
+        }
+
+
+_resilience: Optional[SonarResilience] = None
+_resilience_lock = threading.Lock()
+
+
+def get_sonar_resilience() -> SonarResilience:
+    """Returns the process-wide breaker, retry budget and latency window for Sonar."""
+    global _resilience
+    if _resilience is None:
+        with _resilience_lock:
+            if _resilience is None:
+                _resilience = SonarResilience()
+    return _resilience
@@ -0,0 +1,152 @@
+# backend/app/modules/transfer_jobs.py
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.modules.assist_scraper import get_transfer_courses
+
+# Terminal job states; anything else is still queued or running.
+FINISHED_STATES = ("done", "failed")
+
+
+class TransferJob:
+    """One background get_transfer_courses call and the progress events it has emitted."""
+
+    def __init__(self, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.events: List[Dict[str, Any]] = []
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def emit(self, event: str, **data: Any) -> None:
+        """Records an event and pushes it to every SSE subscriber's loop (safe from worker threads)."""
+        with self._lock:
+            record = {"seq": len(self.events), "event": event, "at": round(time.time(), 3), **data}
+            self.events.append(record)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, record)
+
+    def snapshot(self, include_events: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {"job_id": self.id, "status": self.status, "created_at": self.created_at,
+                        "finished_at": self.finished_at, "result": self.result}
+            if include_events:
+                snapshot["events"] = list(self.events)
+            return snapshot
+
+    async def stream(self) -> AsyncIterator[Dict[str, Any]]:
+        """Replays past events, then yields new ones until the job finishes."""
+        queue: asyncio.Queue = asyncio.Queue()
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            backlog = list(self.events)
+            self._subscribers.append(entry)
+        try:
+            for record in backlog:
+                yield record
+            if backlog and backlog[-1]["event"] in FINISHED_STATES:
+                return
+            while True:
+                record = await queue.get()
+                if record["seq"] < len(backlog):
+                    continue
+                yield record
+                if record["event"] in FINISHED_STATES:
+                    return
+        finally:
+            with self._lock:
+                self._subscribers.remove(entry)
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class TransferJobManager:
+    """
+    Runs transfer-requirement lookups on a capped worker pool. At most `max_pending` jobs may
+    be queued or running; finished jobs are kept for `ttl` seconds and at most `retention` of
+    them are retained, oldest first out.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 retention: Optional[int] = None, ttl: Optional[int] = None):
+        self.workers = workers or settings.TRANSFER_JOB_WORKERS
+        self.max_pending = max_pending or settings.TRANSFER_JOB_MAX_PENDING
+        self.retention = retention or settings.TRANSFER_JOB_RETENTION
+        self.ttl = ttl or settings.TRANSFER_JOB_TTL
+        self._jobs: "OrderedDict[str, TransferJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="transfer-job")
+
+    def submit(self, params: Dict[str, Any]) -> TransferJob:
+        with self._lock:
+            self._prune_locked()
+            pending = sum(1 for job in self._jobs.values() if not job.finished)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} transfer jobs already queued or running")
+            job = TransferJob(params)
+            self._jobs[job.id] = job
+        job.emit("queued")
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[TransferJob]:
+        with self._lock:
+            self._prune_locked()
+            return self._jobs.get(job_id)
+
+    def _prune_locked(self) -> None:
+        # self._jobs is in submission order, so trimming from the front drops the oldest first.
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+        live = [job for job in finished if now - job.finished_at <= self.ttl]
+        drop = [job for job in finished if now - job.finished_at > self.ttl]
+        drop += live[:max(0, len(live) - self.retention)]
+        for job in drop:
+            del self._jobs[job.id]
+
+    def _run(self, job: TransferJob) -> None:
+        job.status = "running"
+        job.emit("running")
+        try:
+            result = get_transfer_courses(**job.params, progress=lambda step: job.emit("step", step=step))
+            status = "failed" if result.get("error") and not result.get("requirements") else "done"
+        except Exception as e:
+            print(f"Transfer job {job.id} crashed: {e}")
+            result, status = {"error": f"Transfer job failed: {e}", "requirements": []}, "failed"
+        with job._lock:
+            job.result = result
+            job.finished_at = time.time()
+            job.status = status
+        job.emit(status, error=result.get("error"))
+
+
+_manager: Optional[TransferJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_transfer_job_manager() -> TransferJobManager:
+    """Returns the process-wide job manager."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = TransferJobManager()
+    return _manager
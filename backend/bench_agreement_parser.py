@@ -0,0 +1,124 @@
+"""
+Benchmark: single-pass agreement parser vs. the previous nested-loop parser.
+
+Usage (from backend/):
+    python bench_agreement_parser.py                  # synthetic payloads
+    python bench_agreement_parser.py recorded/*.json  # recorded api/articulation/Agreements bodies
+"""
+import json
+import random
+import sys
+import time
+
+from app.modules.agreement_parser import parse_template_assets
+
+
+def legacy_parse(template_assets, include_series=False):
+    """
+    The parsing loop fetch_agreement_data_api used before agreement_parser (list-scan dedup).
+    It skipped "Series" cells; with `include_series` each course in a series is treated like a
+    "Course" cell, which is what parse_template_assets does with them.
+    """
+    required_courses, recommended_courses = [], []
+    current_section_is_required = False
+    for asset in template_assets:
+        asset_type = asset.get("type"); content = asset.get("content", "").upper()
+        if asset_type == "RequirementTitle":
+            current_section_is_required = "REQUIREMENT" in content and "RECOMMENDED" not in content
+        elif asset_type == "RequirementGroup":
+            for section in asset.get("sections", []):
+                for row in section.get("rows", []):
+                    for cell in row.get("cells", []):
+                        if cell.get("type") == "Course":
+                            course_cells = [cell.get("course")]
+                        elif cell.get("type") == "Series" and include_series:
+                            course_cells = (cell.get("series") or {}).get("courses") or []
+                        else:
+                            continue
+                        for course_data in course_cells:
+                            if not course_data: continue
+                            code = f"{course_data.get('prefix', '')} {course_data.get('courseNumber', '')}".strip()
+                            title = course_data.get("courseTitle", "Unknown Title")
+                            try: units = float(course_data.get("minUnits", 0.0))
+                            except (ValueError, TypeError): units = 0.0
+                            course_info = {'code': code, 'title': title, 'units': units}
+                            is_recommended_attr = any("RECOMMENDED" in attr.get("content", "").upper() for attr in course_data.get("courseAttributes", []) if isinstance(attr, dict))
+                            if is_recommended_attr:
+                                if course_info not in recommended_courses: recommended_courses.append(course_info)
+                            elif current_section_is_required:
+                                if course_info not in required_courses: required_courses.append(course_info)
+                            else:
+                                    if course_info not in recommended_courses: recommended_courses.append(course_info)
+    return required_courses, recommended_courses
+
+
+def synthetic_template_assets(groups=60, sections=4, rows=12, distinct_courses=1500, seed=7):
+    """Builds a templateAssets list shaped like a large ASSIST agreement."""
+    rng = random.Random(seed)
+    prefixes = ["MATH", "PHYS", "CHEM", "BIOL", "CIS", "ENGL", "ECON", "PSYC", "STAT", "HIST"]
+    catalog = [{"prefix": rng.choice(prefixes), "courseNumber": f"{n}{rng.choice('ABCD')}",
+                "courseTitle": f"Course {n}", "minUnits": rng.choice([3, 4, 4.5, 5]),
+                "courseAttributes": [{"content": "Recommended"}] if n % 17 == 0 else []}
+               for n in range(distinct_courses)]
+
+    def cell(row):
+        # every fourth row is a series: "CIS 22A or CIS 36A" (Or) or a two-course sequence (And)
+        if row % 4 == 3:
+            return {"type": "Series", "series": {"conjunction": rng.choice(["Or", "And"]),
+                                                 "courses": rng.sample(catalog, rng.choice([2, 3]))}}
+        return {"type": "Course", "course": rng.choice(catalog)}
+
+    assets = []
+    for g in range(groups):
+        title = "Recommended Preparation" if g % 5 == 4 else "Requirements for Admission"
+        assets.append({"type": "RequirementTitle", "content": title})
+        assets.append({
+            "type": "RequirementGroup",
+            "instruction": {"conjunction": "Or" if g % 3 == 0 else "And"},
+            "sections": [{"rows": [{"cells": [cell(r)]} for r in range(rows)]}
+                         for _ in range(sections)],
+        })
+    return assets
+
+
+def time_it(fn, assets, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(assets)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(payloads, repeat=5):
+    for label, assets in payloads:
+        cells = sum(len(r.get("cells", [])) for a in assets if a.get("type") == "RequirementGroup"
+                    for s in a.get("sections", []) for r in s.get("rows", []))
+        legacy_req, legacy_rec = legacy_parse(assets, include_series=True)
+        new_req, new_rec, groups = parse_template_assets(assets)
+        assert new_req == legacy_req and new_rec == legacy_rec, f"{label}: parsers disagree"
+        # courses the old loop never saw because they only appear inside a series
+        old_req, old_rec = legacy_parse(assets)
+        series_only = len(new_req) + len(new_rec) - len(old_req) - len(old_rec)
+        legacy = time_it(lambda a: legacy_parse(a, include_series=True), assets, repeat)
+        single_pass = time_it(parse_template_assets, assets, repeat)
+        print(f"{label}: {cells} cells, {len(new_req) + len(new_rec)} unique courses "
+              f"({series_only} only in series), {len(groups)} groups | "
+              f"legacy {legacy * 1000:.1f} ms, single-pass {single_pass * 1000:.2f} ms, "
+              f"speedup {legacy / single_pass:.1f}x")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        payloads = []
+        for path in sys.argv[1:]:
+            with open(path) as f:
+                body = json.load(f)
+            payloads.append((path, json.loads(body["result"]["templateAssets"])))
+    else:
+        payloads = [
+            ("small (20x2x6)", synthetic_template_assets(groups=20, sections=2, rows=6, distinct_courses=200)),
+            ("medium (60x4x12)", synthetic_template_assets()),
+            ("large (150x6x20)", synthetic_template_assets(groups=150, sections=6, rows=20, distinct_courses=6000)),
+        ]
+    run(payloads)
@@ -0,0 +1,69 @@
+"""
+Benchmark: set-based completion matching (course_codes.mark_requirements) vs. the previous
+per-course list scan, for large transcripts against large agreements.
+
+Usage (from backend/):
+    python bench_course_codes.py
+"""
+import random
+import time
+
+from app.modules.course_codes import CourseEquivalences, mark_requirements
+
+
+def legacy_mark(requirements, completed_courses):
+    """The status loop the scraper paths used before course_codes (list membership per course)."""
+    norm_completed = [c.strip().replace(" ", "").upper() for c in (completed_courses or [])]
+    marked = []
+    for course in requirements:
+        norm_code = str(course.get('code', '')).replace(" ", "").upper()
+        status = "completed" if norm_code and norm_code in norm_completed else "remaining"
+        marked.append(dict(course, status=status))
+    return marked
+
+
+def synthetic_case(requirements=2000, transcript=400, alternatives_every=5, seed=11):
+    rng = random.Random(seed)
+    prefixes = ["MATH", "PHYS", "CHEM", "BIOL", "CIS", "ENGL", "ECON", "PSYC", "STAT", "HIST"]
+    codes = [f"{rng.choice(prefixes)} {n}{rng.choice(['', 'A', 'B', 'C', 'H'])}" for n in range(requirements)]
+    reqs = [{"code": code, "title": "Course", "units": 4.0} for code in codes]
+    sections = []
+    for i in range(0, len(codes), alternatives_every):
+        chunk = codes[i:i + alternatives_every]
+        sections.append({"courses": [chunk[0], {"any_of": chunk[1:]}] if len(chunk) > 2 else chunk})
+    groups = [{"title": "Requirements", "required": True, "conjunction": "And", "sections": sections}]
+    # transcripts use whatever formatting students type
+    taken = rng.sample(codes, min(transcript, len(codes)))
+    completed = [code.lower().replace(" ", rng.choice([" ", "-", ""])) for code in taken]
+    equivalences = CourseEquivalences([[code, f"{code}H"] for code in codes[::50]])
+    return reqs, groups, completed, equivalences
+
+
+def time_it(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run():
+    for label, kwargs in [("small", dict(requirements=40, transcript=15)),
+                          ("medium", dict(requirements=500, transcript=120)),
+                          ("large", dict(requirements=5000, transcript=1500))]:
+        reqs, groups, completed, equivalences = synthetic_case(**kwargs)
+        legacy_done = sum(r["status"] == "completed" for r in legacy_mark(reqs, completed))
+        marked = mark_requirements(reqs, completed, groups, equivalences)
+        done = sum(r["status"] == "completed" for r in marked)
+        satisfied = sum(r["status"] == "satisfied" for r in marked)
+        legacy = time_it(lambda: legacy_mark(reqs, completed))
+        engine = time_it(lambda: mark_requirements(reqs, completed, groups, equivalences))
+        print(f"{label}: {len(reqs)} requirements x {len(completed)} completed | "
+              f"legacy {legacy * 1000:.1f} ms ({legacy_done} matched), "
+              f"engine {engine * 1000:.1f} ms ({done} matched, {satisfied} satisfied by alternatives), "
+              f"speedup {legacy / engine:.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,31 @@
+import asyncio
+import os
+import tempfile
+
+from app.modules.assist_async import AsyncAssistClient
+
+
+def test_client_follows_event_loop():
+    """A new event loop gets its own pool and the previous one is closed, not leaked."""
+    print("Testing per-loop client replacement...")
+    client = AsyncAssistClient(cookie_path=os.path.join(tempfile.mkdtemp(), "cookies.json"))
+
+    async def current():
+        return client._get_client()
+
+    first = asyncio.run(current())
+
+    async def replace():
+        second = client._get_client()
+        await client.aclose()
+        return second
+
+    second = asyncio.run(replace())
+    assert second is not first
+    assert first.is_closed and second.is_closed
+    assert client._client is None and not client._closing
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_client_follows_event_loop()
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from app.modules.assist_store import AssistStore, Fetched, Unchanged
+
+
+def _store(**ttls):
+    path = os.path.join(tempfile.mkdtemp(), "assist.db")
+    return AssistStore(f"sqlite:///{path}", ttls=ttls)
+
+
+def _wait(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_fresh_stale_and_invalid():
+    print("Testing TTL and stale-while-revalidate...")
+    store = _store(majors=60)
+    calls = []
+
+    def fetcher():
+        calls.append(1)
+        return [f"Major v{len(calls)}"]
+
+    assert store.get_or_fetch("majors", "k", fetcher) == ["Major v1"]
+    assert store.get_or_fetch("majors", "k", fetcher) == ["Major v1"] and len(calls) == 1, "fresh hit"
+
+    # a reopened store reads the row from disk
+    reopened = AssistStore(store.url, ttls={"majors": 60})
+    assert reopened.get_or_fetch("majors", "k", fetcher) == ["Major v1"] and len(calls) == 1
+
+    store.ttls["majors"] = 0
+    assert store.get_or_fetch("majors", "k", fetcher) == ["Major v1"], "stale hit served as-is"
+    _wait(lambda: store.lookup("majors", "k").payload == ["Major v2"])
+    assert len(calls) == 2
+
+    # empty results are returned but not stored
+    assert store.get_or_fetch("majors", "empty", lambda: []) == []
+    assert store.lookup("majors", "empty") is None
+    print("  ok")
+
+
+def test_refresher_unchanged_only_touches():
+    print("Testing conditional refresh...")
+    store = _store(agreement=0)
+    store.get_or_fetch("agreement", "k", lambda: Fetched({"courses": 1}, {"etag": "a"}))
+    before = store.lookup("agreement", "k").fetched_at
+    seen = []
+
+    def refresher(entry):
+        seen.append(entry.meta)
+        return Unchanged({"etag": "a"})
+
+    store.get_or_fetch("agreement", "k", lambda: {"courses": 2}, refresher=refresher)
+    _wait(lambda: store.lookup("agreement", "k").fetched_at > before)
+    assert seen == [{"etag": "a"}]
+    assert store.lookup("agreement", "k").payload == {"courses": 1}
+    print("  ok")
+
+
+def test_async_reads_off_the_loop():
+    """Disk lookups run in a worker thread; memory hits don't leave the loop."""
+    print("Testing aget_or_fetch...")
+    store = _store(majors=60)
+    store.put("majors", "k", ["Math"])
+    reopened = AssistStore(store.url, ttls={"majors": 0})
+    threads = []
+    lookup = reopened.lookup
+
+    def tracking_lookup(entity, key):
+        threads.append(threading.current_thread())
+        return lookup(entity, key)
+
+    reopened.lookup = tracking_lookup
+    fetched = []
+
+    async def fetcher():
+        fetched.append(1)
+        return ["Math", "Physics"]
+
+    async def run():
+        loop_thread = threading.current_thread()
+        assert await reopened.aget_or_fetch("majors", "k", fetcher) == ["Math"], "stale hit served as-is"
+        assert threads and all(t is not loop_thread for t in threads)
+        while reopened._tasks:
+            await asyncio.sleep(0.01)
+        assert fetched == [1]
+        calls = len(threads)
+        assert await reopened.aget_or_fetch("majors", "k", fetcher) == ["Math", "Physics"]
+        assert len(threads) == calls, "memory hit skips the lookup thread"
+        while reopened._tasks:
+            await asyncio.sleep(0.01)
+        assert await reopened.aget_or_fetch("majors", "miss", fetcher) == ["Math", "Physics"]
+
+    asyncio.run(run())
+    assert reopened.lookup("majors", "miss").payload == ["Math", "Physics"]
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_fresh_stale_and_invalid()
+    test_refresher_unchanged_only_touches()
+    test_async_reads_off_the_loop()
@@ -0,0 +1,89 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.modules import browser_pool
+from app.modules.browser_pool import ChromeDriverPool
+
+
+class FakeDriver:
+    window_handles = ["main"]
+
+    def __init__(self):
+        self.quit_called = False
+
+    def execute_script(self, script):
+        return 1 if script == "return 1" else 0
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def get_log(self, kind):
+        return []
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakePool(ChromeDriverPool):
+    def __init__(self, **kwargs):
+        super().__init__(driver_path="/nonexistent/chromedriver", **kwargs)
+        self.drivers = []
+
+    def launch(self, headless=True):
+        driver = FakeDriver()
+        self.drivers.append(driver)
+        with self._lock:
+            self._uses[id(driver)] = 0
+            self.stats["launched"] += 1
+        return driver
+
+
+def test_reuse_and_retire():
+    print("Testing pooled driver reuse...")
+    pool = FakePool(size=2, max_uses=2)
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as again:
+        assert again is first
+    assert first.quit_called, "retired after max_uses checkouts"
+    assert pool.stats["launched"] == 1 and pool.stats["reused"] == 1
+    print("  ok")
+
+
+def test_close_quits_idle_and_returned_drivers():
+    print("Testing pool close...")
+    pool = FakePool(size=2)
+    pool.warm()
+    busy = pool.acquire()
+    pool.close()
+    assert sum(d.quit_called for d in pool.drivers) == 1, "idle driver quit"
+    pool.release(busy)
+    assert all(d.quit_called for d in pool.drivers), "checked-out driver quit on return"
+    pool.warm()
+    assert len(pool.drivers) == 2, "a closed pool doesn't pre-launch"
+    print("  ok")
+
+
+def test_shutdown_hook_closes_pool():
+    print("Testing /transfers shutdown hook...")
+    from app.api.routes import transfers
+
+    pool = FakePool(size=1)
+    pool.warm()
+    browser_pool._pool = pool
+    app = FastAPI()
+    app.include_router(transfers.router)
+    with TestClient(app):
+        pass
+    assert pool.drivers and all(d.quit_called for d in pool.drivers)
+    assert browser_pool._pool is None
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_reuse_and_retire()
+    test_close_quits_idle_and_returned_drivers()
+    test_shutdown_hook_closes_pool()
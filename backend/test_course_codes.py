@@ -0,0 +1,60 @@
+from app.modules.course_codes import (
+    CompletionMatcher,
+    CourseCode,
+    CourseEquivalences,
+    course_key,
+    mark_requirements,
+    parse_course_code,
+)
+
+
+def test_parse_and_key():
+    print("Testing course code parsing...")
+    for raw in ("MATH 1A", "MATH-001A", "math 1a", "MATH1A", " Math_1a "):
+        assert parse_course_code(raw) == CourseCode("MATH", 1, "A"), raw
+        assert course_key(raw) == "MATH 1A", raw
+    assert course_key("C S 61A") == course_key("CS 61A") == "CS 61A"
+    assert course_key("E&M 10") == "EM 10"
+    assert parse_course_code("Calculus") is None and course_key("Calculus") == "CALCULUS"
+    assert course_key("") == ""
+    print("  ok")
+
+
+def test_equivalences():
+    print("Testing course equivalences...")
+    equivalences = CourseEquivalences([["MATH 1A", "MATH 1AH"], ["CIS 22A", "CS 22A"], ["MATH 1AH", "MTH 1A"]])
+    assert equivalences.canonical("math-001ah") == equivalences.canonical("MTH 1A") == "MATH 1A"
+    assert equivalences.canonical("CS 22A") == "CIS 22A"
+    assert equivalences.canonical("PHYS 4A") == "PHYS 4A", "unknown codes are their own key"
+    assert len(equivalences) == 5
+    print("  ok")
+
+
+def test_completion_matching():
+    print("Testing completion matching...")
+    equivalences = CourseEquivalences([["MATH 1A", "MATH 1AH"]])
+    matcher = CompletionMatcher(["MATH-001A", "cis22a", "  ", None], equivalences)
+    assert matcher.is_completed("MATH 1A") and matcher.is_completed("MATH 1AH")
+    assert matcher.is_completed("CIS 22A") and not matcher.is_completed("CIS 22B")
+
+    requirements = [{"code": c} for c in ("MATH 1AH", "CIS 22B", "CIS 36B", "PHYS 4A", "PHYS 2A")]
+    groups = [
+        {"title": "", "required": True, "conjunction": "And",
+         "sections": [{"courses": [{"any_of": ["CIS 22B", "CIS 36B"]}]}]},
+        {"title": "", "required": True, "conjunction": "Or",
+         "sections": [{"courses": ["PHYS 4A"]}, {"courses": ["PHYS 2A"]}]},
+    ]
+    marked = mark_requirements(requirements, ["MATH 1A", "CIS 36B", "PHYS 2A"], groups, equivalences)
+    statuses = {r["code"]: (r["status"], r.get("satisfied_by")) for r in marked}
+    assert statuses == {"MATH 1AH": ("completed", None), "CIS 22B": ("satisfied", "CIS 36B"),
+                        "CIS 36B": ("completed", None), "PHYS 4A": ("satisfied", "PHYS 2A"),
+                        "PHYS 2A": ("completed", None)}, statuses
+    # without structure nothing is inferred
+    assert [r["status"] for r in mark_requirements(requirements[1:2], ["CIS 36B"], None, equivalences)] == ["remaining"]
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_parse_and_key()
+    test_equivalences()
+    test_completion_matching()
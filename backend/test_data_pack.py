@@ -0,0 +1,78 @@
+import os
+import tempfile
+
+from app.modules import data_pack
+from app.modules.assist_scraper import packed_transfer_result
+from app.modules.data_pack import DataPack, FORMAT_VERSION, build_pack, load_seed_agreements
+
+BERKELEY = "University of California, Berkeley"
+
+# a store agreement with alternatives, and one packed before groups were kept
+DATA_SCIENCE = {
+    "year": "2024-2025", "sending": "De Anza College", "receiving": BERKELEY, "major": "Data Science, B.A.",
+    "required_courses": [{"code": "MATH 1A", "title": "Calculus", "units": 5.0},
+                         {"code": "CIS 22A", "title": "Beginning Programming", "units": 4.5},
+                         {"code": "CIS 36A", "title": "Introduction to Java", "units": 4.5}],
+    "recommended_courses": [],
+    "requirement_groups": [{"title": "Major Requirements", "required": True, "conjunction": "And",
+                            "sections": [{"courses": ["MATH 1A", {"any_of": ["CIS 22A", "CIS 36A"]}]}]}],
+}
+STATISTICS = {
+    "year": "2024-2025", "sending": "De Anza College", "receiving": BERKELEY, "major": "Statistics",
+    "required_courses": [{"code": "MATH 1A", "title": "Calculus", "units": 5.0}], "recommended_courses": [],
+}
+
+
+def _pack():
+    path = os.path.join(tempfile.mkdtemp(), "test.pack")
+    build_pack(load_seed_agreements(data_pack.DEFAULT_SEED_PATH) + [DATA_SCIENCE, STATISTICS], path)
+    return DataPack(path)
+
+
+def test_round_trip():
+    print("Testing pack build -> load -> find...")
+    pack = _pack()
+    assert pack.format_version == FORMAT_VERSION and pack.agreement_count == 4
+    cs = pack.find("de anza college", BERKELEY, "CS")
+    assert cs["agreement_name"] == "Computer Science" and cs["year"] == "2024-2025"
+    assert [c["code"] for c in cs["required_courses"]][:2] == ["MATH 1A", "MATH 1B"]
+    assert cs["required_courses"][-1] == {"code": "CIS 22C", "title": "Data Structures and Algorithms in C++",
+                                          "units": 4.5}
+    assert pack.find("De Anza College", BERKELEY, "Math")["agreement_name"] == "Mathematics, Applied"
+    ds = pack.find("De Anza College", BERKELEY, "Data Science")
+    assert ds["requirement_groups"] == DATA_SCIENCE["requirement_groups"]
+    assert "requirement_groups" not in pack.find("De Anza College", BERKELEY, "Statistics")
+    assert pack.find("De Anza College", BERKELEY, "Underwater Basket Weaving") is None
+    assert pack.find("Foothill College", BERKELEY, "CS") is None
+    assert pack.find("De Anza College", BERKELEY, "CS", year="2019-2020") is None
+    print("  ok")
+
+
+def test_packed_results_keep_alternatives():
+    """Packed "or" items stay one requirement; agreements without groups aren't served."""
+    print("Testing packed_transfer_result...")
+    previous = data_pack._pack, data_pack._pack_loaded
+    data_pack._pack, data_pack._pack_loaded = _pack(), True
+    try:
+        result = packed_transfer_result("De Anza", "UC Berkeley", "Data Science", completed_courses=["CIS 36A"])
+        statuses = {r["code"]: r["status"] for r in result["requirements"]}
+        assert statuses == {"MATH 1A": "remaining", "CIS 22A": "satisfied", "CIS 36A": "completed"}, statuses
+        assert result["scraper_method"] == "Data Pack"
+        assert packed_transfer_result("De Anza", "UC Berkeley", "Statistics") is None
+    finally:
+        data_pack._pack, data_pack._pack_loaded = previous
+    print("  ok")
+
+
+def test_bundled_pack_is_current():
+    print("Testing the bundled pack...")
+    pack = DataPack(data_pack.DEFAULT_PACK_PATH)
+    assert pack.format_version == FORMAT_VERSION
+    assert all(pathway["has_groups"] for pathway in pack.pathways())
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_packed_results_keep_alternatives()
+    test_bundled_pack_is_current()
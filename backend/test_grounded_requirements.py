@@ -0,0 +1,64 @@
+import asyncio
+
+from app.modules.agreement_parser import parse_template_assets
+from app.modules.course_codes import CompletionMatcher, CourseEquivalences
+from app.modules.scheduler import Scheduler
+
+
+def _course(prefix, number, units=4.0):
+    return {"prefix": prefix, "courseNumber": number, "courseTitle": f"{prefix} {number}", "minUnits": units}
+
+
+def _agreement():
+    """MATH 1A, then "CIS 22A or CIS 36A", then either PHYS 4A + 4B or PHYS 2A + 2B."""
+    return [
+        {"type": "RequirementTitle", "content": "Major Requirements"},
+        {"type": "RequirementGroup", "sections": [{"rows": [
+            {"cells": [{"type": "Course", "course": _course("MATH", "1A", 5)}]},
+            {"cells": [{"type": "Series", "series": {"conjunction": "Or",
+                                                     "courses": [_course("CIS", "22A"), _course("CIS", "36A")]}}]},
+        ]}]},
+        {"type": "RequirementGroup", "instruction": {"conjunction": "Or"}, "sections": [
+            {"rows": [{"cells": [{"type": "Course", "course": _course("PHYS", "4A")}]},
+                      {"cells": [{"type": "Course", "course": _course("PHYS", "4B")}]}]},
+            {"rows": [{"cells": [{"type": "Course", "course": _course("PHYS", "2A")}]},
+                      {"cells": [{"type": "Course", "course": _course("PHYS", "2B")}]}]},
+        ]},
+    ]
+
+
+def test_choose_alternatives():
+    """One course per "or" item and one section per "Or" group: the completed one, else the first."""
+    print("Testing choose_alternatives...")
+    _, _, groups = parse_template_assets(_agreement())
+    equivalences = CourseEquivalences()
+
+    choice = CompletionMatcher([], equivalences).choose_alternatives(groups)
+    assert choice.dropped == {"CIS 36A", "PHYS 2A", "PHYS 2B"}, choice
+    assert choice.alternatives["CIS 22A"] == ["CIS 36A"]
+    assert choice.alternatives["PHYS 4A"] == ["PHYS 2A + PHYS 2B"]
+
+    choice = CompletionMatcher(["CIS 36A", "PHYS 2A", "PHYS 2B"], equivalences).choose_alternatives(groups)
+    assert choice.dropped == {"CIS 22A", "PHYS 4A", "PHYS 4B"}, choice
+    print("  ok")
+
+
+def test_grounded_rows_keep_one_alternative():
+    """The grounded table / local solver get one row per requirement, with the options attached."""
+    print("Testing grounded requirement rows...")
+    required, _, groups = parse_template_assets(_agreement())
+    pathway = {"requirements": [dict(c, status="remaining") for c in required], "requirement_groups": groups}
+    params = dict(completed_courses=[], target_major="Computer Science", target_institution="UC Berkeley",
+                  academic_year="2024-2025", unit_range=[12, 16], preferred_times=None,
+                  origin_institution="Test College", prompt_mode="grounded")
+    rows = asyncio.run(Scheduler()._remaining_requirements(params, pathway))
+    codes = sorted(row["code"] for row in rows)
+    print(f"  rows: {codes}")
+    assert codes == ["CIS 22A", "MATH 1A", "PHYS 4A", "PHYS 4B"], codes
+    assert next(row for row in rows if row["code"] == "CIS 22A")["alternatives"] == ["CIS 36A"]
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_choose_alternatives()
+    test_grounded_rows_keep_one_alternative()
@@ -0,0 +1,66 @@
+import json
+import random
+
+from app.modules.json_stream import ArrayItemStream
+
+QUARTERS = [
+    {"term": "Fall 2025", "courses": [{"code": "MATH 1A", "title": "Calculus {I}", "units": 5}]},
+    {"term": "Winter 2026", "courses": [{"code": "CIS 22A", "title": "Say \"hi\" ]", "units": 4.5},
+                                        {"code": "PHYS 4A", "units": 5}]},
+    {"term": "Spring 2026", "courses": []},
+]
+
+
+def _document():
+    """The reply text and, for each quarter, the offset just past its closing brace."""
+    text = '{"note": "a } and a ] in a string", "meta": {"quarters": [{"term": "not me"}]}, "quarters": ['
+    ends = []
+    for i, quarter in enumerate(QUARTERS):
+        text += (", " if i else "") + json.dumps(quarter)
+        ends.append(len(text))
+    text += '], "warnings": [{"code": "X"}]}'
+    return text, ends
+
+
+def test_random_chunking(cases=300, seed=3):
+    """Each quarter comes out of the feed() call that delivers its closing brace, whatever the chunking."""
+    print(f"Testing {cases} random chunkings...")
+    rng = random.Random(seed)
+    document, ends = _document()
+    preamble = "```json\n"
+    raw = preamble + document + "\n```"
+    for _ in range(cases):
+        stream = ArrayItemStream("quarters")
+        emitted, fed = [], 0
+        while fed < len(raw):
+            size = rng.choice([1, 1, 2, 3, 7, 20, 200])
+            emitted += stream.feed(raw[fed:fed + size])
+            fed += size
+            closed = sum(len(preamble) + end <= fed for end in ends)
+            assert len(emitted) == closed, (fed, len(emitted), closed)
+        assert emitted == QUARTERS
+        assert stream.done and stream.text == document
+        assert stream.document() == json.loads(document)
+    print("  ok")
+
+
+def test_unfinished_and_malformed():
+    print("Testing unfinished and malformed streams...")
+    stream = ArrayItemStream("quarters")
+    assert stream.feed("Sure! Here is the plan: ") == []
+    assert stream.feed('{"quarters": [{"term": "Fall 2025", "courses": []}, {"term": "Win') == [
+        {"term": "Fall 2025", "courses": []}]
+    assert not stream.done and stream.document() is None
+
+    # a broken element is skipped, later ones still come through
+    stream = ArrayItemStream("quarters")
+    items = stream.feed('{"quarters": [{"term": "A",}, {"term": "B"}]}')
+    assert items == [{"term": "B"}]
+    assert stream.done and stream.document() is None
+    assert stream.feed('{"quarters": [{"term": "C"}]}') == [], "nothing is read after the object closes"
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_random_chunking()
+    test_unfinished_and_malformed()
@@ -0,0 +1,106 @@
+import json
+
+from app.modules.llm_json import extract_json_object, is_complete_schedule, parse_schedule_content
+
+SCHEDULE = {
+    "quarters": [
+        {"term": "Fall 2025", "courses": [{"code": "MATH 1A", "title": "Calculus I", "units": 5},
+                                          {"code": "CIS 22A", "units": "4.5"}]},
+        {"term": "Winter 2026", "courses": [{"code": "MATH 1B", "units": 5}]},
+    ],
+    "warnings": [{"term": "Fall 2025", "code": "CIS 22A", "message": "Check lab section."}],
+    "reminder_to_meet_counselor": True,
+}
+TERMS = {"Fall 2025", "Winter 2026"}
+CODES = {"MATH 1A", "CIS 22A", "MATH 1B"}
+
+
+def test_wrapped_and_malformed():
+    """Fences, prose, double encoding and trailing commas decode to the same plan."""
+    print("Testing wrapped/malformed replies...")
+    text = json.dumps(SCHEDULE, indent=2)
+    variants = {
+        "plain": text,
+        "fenced": f"```json\n{text}\n```",
+        "prose": f"Here is your plan:\n{text}\nGood luck!",
+        "double-encoded": json.dumps(text),
+        "trailing commas": text.replace("}\n  ]", "},\n  ]"),
+    }
+    for name, raw in variants.items():
+        parsed = parse_schedule_content(raw)
+        assert [q["term"] for q in parsed["quarters"]] == ["Fall 2025", "Winter 2026"], name
+        assert not parsed.get("truncated"), name
+        print(f"  {name}: {parsed.get('diagnostics', [])}")
+    print("  ok")
+
+
+def test_every_truncation_point():
+    """Cutting the reply anywhere yields only whole terms and codes (or a clean ValueError)."""
+    print("Testing every prefix of the reply...")
+    for raw in (json.dumps(SCHEDULE), json.dumps(SCHEDULE, indent=2)):
+        failures = 0
+        for cut in range(1, len(raw)):
+            try:
+                parsed = parse_schedule_content(raw[:cut])
+            except ValueError:
+                failures += 1
+                continue
+            for quarter in parsed["quarters"]:
+                assert quarter["term"] in TERMS, (raw[:cut], quarter)
+                for course in quarter["courses"]:
+                    assert course["code"] in CODES, (raw[:cut], course)
+        # every prefix starts with the opening brace, so something is always recoverable
+        assert failures == 0, failures
+    print("  ok")
+
+
+def test_schema_drops_bad_items():
+    print("Testing schema validation...")
+    raw = json.dumps({"quarters": [{"term": "Fall 2025", "courses": [{"title": "no code"}, {"code": "MATH 1A",
+                                                                                          "units": "4-5"}]},
+                                   {"courses": []}],
+                      "warnings": [{"code": "X"}]})
+    parsed = parse_schedule_content(raw)
+    assert [q["term"] for q in parsed["quarters"]] == ["Fall 2025"]
+    assert parsed["quarters"][0]["courses"] == [{"code": "MATH 1A", "title": None, "units": None,
+                                                 "no_articulation": False, "must_take_at_university": False}]
+    assert parsed["warnings"] == []
+    assert len(parsed["diagnostics"]) == 4, parsed["diagnostics"]
+    print("  ok")
+
+
+def test_extract_closes_structures():
+    print("Testing truncated structure closing...")
+    # only the one cut-off token goes; complete values before it are kept
+    assert extract_json_object('{"a": [1, 2, 3').value == {"a": [1, 2]}
+    assert extract_json_object('{"a": [1, 2,').value == {"a": [1, 2]}
+    assert extract_json_object('{"a": 1.5, "b": tr').value == {"a": 1.5}
+    assert extract_json_object('{"a": 1, "b"').value == {"a": 1}
+    assert extract_json_object('{"a": {"b": [1]}, "c": "unterminated').value == {"a": {"b": [1]}}
+    assert extract_json_object('noise {"a": 1,} tail').value == {"a": 1}
+    try:
+        extract_json_object("no json here")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    print("  ok")
+
+
+def test_is_complete_schedule():
+    """Only whole plans with at least one valid quarter are worth caching."""
+    print("Testing is_complete_schedule...")
+    assert is_complete_schedule(parse_schedule_content(json.dumps(SCHEDULE)))
+    assert not is_complete_schedule(parse_schedule_content('{"note": "sorry"}'))
+    assert not is_complete_schedule(parse_schedule_content('{"quarters": []}'))
+    assert not is_complete_schedule(parse_schedule_content('{"quarters": [{"courses": []}]}'))
+    assert not is_complete_schedule(parse_schedule_content(json.dumps(SCHEDULE)[:-40]))
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_wrapped_and_malformed()
+    test_every_truncation_point()
+    test_schema_drops_bad_items()
+    test_extract_closes_structures()
+    test_is_complete_schedule()
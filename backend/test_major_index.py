@@ -0,0 +1,49 @@
+from app.modules.major_index import MajorIndex, tokenize_major
+
+MAJORS = [
+    {"key": "m-ba", "name": "Mathematics, B.A."},
+    {"key": "m-bs", "name": "Mathematics, B.S."},
+    {"key": "am", "name": "Applied Mathematics, B.A."},
+    {"key": "cs", "name": "Computer Science, B.A."},
+    {"key": "eecs", "name": "Electrical Engineering and Computer Sciences, B.S."},
+    {"key": "ds", "name": "Data Science, B.A."},
+]
+
+
+def test_tokenize():
+    print("Testing tokenize_major...")
+    assert tokenize_major("Comp Sci, B.S.") == ["computer", "science"]
+    assert tokenize_major("Electrical Engineering & Computer Sciences") == [
+        "electrical", "engineering", "computer", "science"]
+    print("  ok")
+
+
+def test_ranking():
+    print("Testing major ranking...")
+    index = MajorIndex(MAJORS)
+    assert index.search("CS")[0]["key"] == "cs"
+    assert index.search("applied math")[0]["key"] == "am"
+    assert index.search("Data Science")[0]["key"] == "ds"
+    assert index.search("EECS")[0]["key"] == "eecs"
+    assert index.search("underwater basket weaving") == []
+    print("  ok")
+
+
+def test_tied_degree_variants_are_ambiguous():
+    """B.A./B.S. variants of the same major tie at 1.0 and must not be picked silently."""
+    print("Testing ambiguity...")
+    index = MajorIndex(MAJORS)
+    candidates = index.search("Math")
+    print(f"  {candidates[:3]}")
+    assert candidates[0]["score"] == candidates[1]["score"] == 1.0
+    assert MajorIndex.is_ambiguous(candidates)
+    assert not MajorIndex.is_ambiguous(index.search("Applied Math"))
+    assert not MajorIndex.is_ambiguous(index.search("CS"))
+    assert not MajorIndex.is_ambiguous(index.search("Data Science")[:1])
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_tokenize()
+    test_ranking()
+    test_tied_degree_variants_are_ambiguous()
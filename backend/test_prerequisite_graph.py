@@ -0,0 +1,107 @@
+import random
+
+from app.modules.course_codes import CourseEquivalences
+from app.modules.prerequisite_graph import PrerequisiteCycle, PrerequisiteGraph, PrerequisiteGraphStore
+
+
+def _reference(codes, edges):
+    """Ancestors and depth straight from the edge set, by plain recursion."""
+    parents = {code: {p for c, p in edges if c == code} for code in codes}
+    ancestors, depth = {}, {}
+
+    def visit(code):
+        if code not in ancestors:
+            found, longest = set(), 0
+            for parent in parents[code]:
+                visit(parent)
+                found |= ancestors[parent] | {parent}
+                longest = max(longest, depth[parent] + 1)
+            ancestors[code], depth[code] = found, longest
+    for code in codes:
+        visit(code)
+    return ancestors, depth
+
+
+def _rebuild(codes, edges):
+    graph = PrerequisiteGraph(CourseEquivalences())
+    for code in codes:
+        graph.node(code)
+    for course, prereq in edges:
+        graph.add_edge(course, prereq)
+    return graph
+
+
+def test_incremental_matches_rebuild(edits=3000, seed=11):
+    """Random adds/removes on one graph agree with a fresh build (and a reference) after every edit."""
+    print(f"Testing {edits} random incremental edits...")
+    rng = random.Random(seed)
+    codes = [f"MATH {n}{suffix}" for n in range(1, 11) for suffix in "ABC"]
+    graph = PrerequisiteGraph(CourseEquivalences())
+    edges = set()
+    rejected = 0
+    for _ in range(edits):
+        course, prereq = rng.sample(codes, 2)
+        if edges and rng.random() < 0.4:
+            course, prereq = rng.choice(sorted(edges))
+            assert graph.remove_edge(course, prereq)
+            edges.discard((course, prereq))
+        else:
+            try:
+                added = graph.add_edge(course, prereq)
+            except PrerequisiteCycle:
+                # rejected exactly when `course` is already at or above `prereq`
+                assert course in _reference(codes, edges)[0][prereq], (course, prereq)
+                rejected += 1
+                continue
+            assert added == ((course, prereq) not in edges)
+            edges.add((course, prereq))
+
+        ancestors, depth = _reference(codes, edges)
+        rebuilt = _rebuild(codes, edges)
+        for code in codes:
+            assert set(graph.ancestors(code)) == ancestors[code] == set(rebuilt.ancestors(code)), code
+            assert graph.depth(code) == depth[code] == rebuilt.depth(code), code
+    print(f"  {len(edges)} edges at the end, {rejected} cycles rejected")
+    print("  ok")
+
+
+def test_missing_and_earliest_quarter():
+    print("Testing missing prerequisites / earliest quarter...")
+    graph = PrerequisiteGraph(CourseEquivalences([["MATH 1A", "MATH 1AH"]]))
+    graph.add_prerequisites({"MATH 1B": ["MATH 1A"], "MATH 1C": ["MATH 1B"], "MATH 2A": ["MATH 1C"],
+                             "PHYS 4A": ["MATH 1A"]})
+    assert graph.depth("MATH 2A") == 3
+    assert graph.missing_prerequisites("MATH 2A") == ["MATH 1A", "MATH 1B", "MATH 1C"]
+    # honors section counts as the regular course
+    assert graph.missing_prerequisites("MATH 2A", ["MATH 1AH"]) == ["MATH 1B", "MATH 1C"]
+    assert graph.earliest_quarter("MATH 2A", ["MATH 1AH"]) == 2
+    assert graph.earliest_quarter("MATH 2A", ["MATH 1A", "MATH 1B", "MATH 1C"]) == 0
+    assert graph.earliest_quarter("PHYS 4A", ["MATH 1A"]) == 0
+    # a cycle-forming edge from a batch is skipped, the rest are kept
+    assert graph.add_prerequisites({"MATH 1A": ["MATH 2A"], "PHYS 4B": ["PHYS 4A"]}) == 1
+    assert graph.ancestors("MATH 1A") == []
+    print("  ok")
+
+
+def test_sequence_guesses_stay_per_request():
+    """Guessed MATH 2A -> 2B style edges fill gaps only, and never reach the shared graph."""
+    print("Testing sequence guesses...")
+    store = PrerequisiteGraphStore()
+    shared = store.graph("De Anza College")
+    before = {code: shared.ancestors(code) for code in ("MATH 2B", "PHYS 4C", "CHEM 1B")}
+    graph = shared.with_sequence_guesses(["MATH 2A", "MATH 2B", "PHYS 4B", "PHYS 4C", "CHEM 1A", "CHEM 1B",
+                                          "CHEM 1C"])
+    # seeded courses keep their seeded prerequisites
+    assert graph.prerequisites("MATH 2B") == ["MATH 1C"]
+    assert graph.prerequisites("PHYS 4C") == ["MATH 1B", "PHYS 4A"]
+    # courses without data get the guess, transitively
+    assert sorted(graph.ancestors("CHEM 1C")) == ["CHEM 1A", "CHEM 1B"]
+    assert {code: shared.ancestors(code) for code in before} == before
+    assert "CHEM 1B" not in shared and store.graph("De Anza College") is shared
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_incremental_matches_rebuild()
+    test_missing_and_earliest_quarter()
+    test_sequence_guesses_stay_per_request()
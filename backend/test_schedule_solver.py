@@ -0,0 +1,81 @@
+import random
+
+from app.modules.course_codes import course_key
+from app.modules.schedule_solver import GE_PLACEHOLDER, quarter_terms, solve_schedule
+
+
+def _quarter_of(plan):
+    return {course_key(c["code"]): i for i, q in enumerate(plan["schedule"]) for c in q["courses"] if c["code"] != "GE"}
+
+
+def test_quarter_terms():
+    print("Testing quarter_terms...")
+    terms = quarter_terms("2025-2026")
+    assert [next(terms) for _ in range(4)] == ["Fall 2025", "Winter 2026", "Spring 2026", "Fall 2026"]
+    terms = quarter_terms("Spring 2026")
+    assert [next(terms) for _ in range(2)] == ["Spring 2026", "Fall 2026"]
+    assert next(quarter_terms("next year")) == "Quarter 1"
+    print("  ok")
+
+
+def test_cycle_keeps_downstream_order():
+    """X 1 <-> X 2 is a cycle; Y 1 only depends on it, so it keeps its ordering and isn't flagged."""
+    print("Testing circular prerequisites...")
+    requirements = [{"code": "X 1", "units": 4, "requires": ["X 2"]},
+                    {"code": "X 2", "units": 4, "requires": ["X 1"]},
+                    {"code": "Y 1", "units": 4, "requires": ["X 1"]},
+                    {"code": "Z 1", "units": 4, "requires": ["Y 1"]}]
+    plan = solve_schedule(requirements, "2025-2026", [12, 16])
+    quarter = _quarter_of(plan)
+    flagged = sorted(w["code"] for w in plan["warnings"] if "Circular" in w["message"])
+    print(f"  quarters: {quarter}, flagged: {flagged}")
+    assert flagged == ["X 1", "X 2"], flagged
+    assert quarter["Y 1"] > quarter["X 1"] and quarter["Z 1"] > quarter["Y 1"]
+    assert len(quarter) == 4
+    print("  ok")
+
+
+def test_random_plans_respect_rules(cases=200, seed=7):
+    """Prerequisites come in earlier quarters, one course per subject, units within the maximum."""
+    print(f"Testing {cases} random requirement sets...")
+    rng = random.Random(seed)
+    subjects = ["MATH", "PHYS", "CIS", "CHEM", "BIOL", "ECON"]
+    for _ in range(cases):
+        codes = list(dict.fromkeys(f"{rng.choice(subjects)} {rng.randint(1, 40)}" for _ in range(rng.randint(1, 25))))
+        requirements = []
+        for i, code in enumerate(codes):
+            # prerequisites only point backwards, so the set is acyclic
+            requires = rng.sample(codes[:i], min(i, rng.randint(0, 2)))
+            requirements.append({"code": code, "units": rng.choice([3, 4, 4.5, 5]), "requires": requires})
+        low, high = rng.choice([[12, 16], [8, 12], [15, 15]])
+        plan = solve_schedule(requirements, "2025-2026", [low, high], current_gpa=rng.choice([None, 2.5, 3.5]))
+
+        quarter = _quarter_of(plan)
+        assert set(quarter) == {course_key(c) for c in codes}, "every course is placed"
+        for req in requirements:
+            for prereq in req["requires"]:
+                assert quarter[course_key(prereq)] < quarter[course_key(req["code"])], (req, plan)
+        for q in plan["schedule"]:
+            majors = [c for c in q["courses"] if c["code"] != "GE"]
+            prefixes = [c["code"].split(" ")[0] for c in majors]
+            assert len(prefixes) == len(set(prefixes)), q
+            total = sum(c["units"] for c in q["courses"])
+            assert total <= high or len(majors) == 1, q
+        assert not plan["warnings"], plan["warnings"]
+    print("  ok")
+
+
+def test_ge_fills_to_minimum():
+    print("Testing GE placeholders...")
+    plan = solve_schedule([{"code": "MATH 1A", "units": 5}], "2025-2026", [12, 16])
+    courses = plan["schedule"][0]["courses"]
+    assert [c["code"] for c in courses] == ["MATH 1A", "GE", "GE"]
+    assert sum(c["units"] for c in courses) == 5 + 2 * GE_PLACEHOLDER["units"]
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_quarter_terms()
+    test_cycle_keeps_downstream_order()
+    test_random_plans_respect_rules()
+    test_ge_fills_to_minimum()
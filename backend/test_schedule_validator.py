@@ -0,0 +1,109 @@
+import random
+
+from app.modules.course_codes import CourseEquivalences
+from app.modules.prerequisite_graph import PrerequisiteGraph
+from app.modules.schedule_validator import find_violations, repair_schedule
+
+
+def _graph(edges, equivalences=()):
+    graph = PrerequisiteGraph(CourseEquivalences(equivalences))
+    graph.add_prerequisites(edges)
+    return graph
+
+
+def _codes(schedule):
+    return [c["code"] for q in schedule for c in q["courses"]]
+
+
+def test_repair_clears_violations(cases=300, seed=5):
+    """After repair, only prerequisites missing from the plan and lone oversized courses remain."""
+    print(f"Testing repair on {cases} random plans...")
+    rng = random.Random(seed)
+    subjects = ["MATH", "PHYS", "CIS", "CHEM", "ECON"]
+    for _ in range(cases):
+        codes = list(dict.fromkeys(f"{rng.choice(subjects)} {rng.randint(1, 12)}" for _ in range(rng.randint(2, 18))))
+        edges = {code: rng.sample(codes[:i], min(i, rng.randint(0, 2))) for i, code in enumerate(codes)}
+        graph = _graph(edges)
+        # duplicates, placeholders and any order, spread over a few quarters
+        listed = codes + rng.sample(codes, min(len(codes), rng.randint(0, 3))) + ["GE"] * rng.randint(0, 3)
+        rng.shuffle(listed)
+        schedule = [{"term": term, "courses": []} for term in ("Fall 2025", "Winter 2026", "Spring 2026")]
+        for code in listed:
+            units = rng.choice([3, 4, 5, 18]) if code != "GE" else 4
+            rng.choice(schedule)["courses"].append({"code": code, "units": units})
+        completed = rng.sample(codes, min(len(codes), rng.randint(0, 3)))
+        unit_range = rng.choice([[12, 16], [8, 12]])
+
+        repaired, warnings = repair_schedule(schedule, completed, unit_range, graph)
+        remaining = find_violations(repaired, completed, unit_range, graph)
+        lone = {(w["term"], w["code"]) for w in warnings if w["action"] == "kept"}
+        for violation in remaining:
+            if violation["rule"] == "overload":
+                quarter = next(q for q in repaired if q["term"] == violation["term"])
+                assert len(quarter["courses"]) == 1 and (quarter["term"], quarter["courses"][0]["code"]) in lone, \
+                    (violation, repaired)
+            else:
+                assert violation["rule"] == "missing_prerequisite", (violation, repaired)
+        majors = [c for c in _codes(repaired) if c != "GE"]
+        assert sorted(majors) == sorted(set(codes) - set(completed)), "each remaining course kept exactly once"
+        assert _codes(repaired).count("GE") == listed.count("GE")
+        assert not repaired or repaired[-1]["courses"], "trailing empty quarters are trimmed"
+    print("  ok")
+
+
+def test_duplicates_keep_first_position():
+    print("Testing duplicate and completed handling...")
+    schedule = [{"term": "Fall 2025", "courses": [{"code": "MATH 1A", "units": 5}, {"code": "CIS 22A", "units": 4}]},
+                {"term": "Winter 2026", "courses": [{"code": "math-1a", "units": 5}, {"code": "PHYS 4AH", "units": 5}]}]
+    graph = _graph({}, [["PHYS 4A", "PHYS 4AH"]])
+    rules = sorted(v["rule"] for v in find_violations(schedule, ["PHYS 4A"], [12, 16], graph))
+    assert rules == ["completed", "duplicate"], rules
+    repaired, warnings = repair_schedule(schedule, ["PHYS 4A"], [12, 16], graph)
+    assert [[c["code"] for c in q["courses"]] for q in repaired] == [["MATH 1A", "CIS 22A"]]
+    assert [w["action"] for w in warnings] == ["removed", "removed"]
+    print("  ok")
+
+
+def test_prerequisites_shift_and_flag():
+    print("Testing prerequisite shifts...")
+    graph = _graph({"MATH 1B": ["MATH 1A"], "MATH 1C": ["MATH 1B"], "PHYS 4A": ["MATH 1A"]})
+    schedule = [{"term": "Fall 2025", "courses": [{"code": "MATH 1A", "units": 5}, {"code": "PHYS 4A", "units": 5}]},
+                {"term": "Winter 2026", "courses": [{"code": "MATH 1C", "units": 5}]}]
+    assert {v["rule"] for v in find_violations(schedule, [], [12, 16], graph)} == {"prerequisite", "missing_prerequisite"}
+    repaired, warnings = repair_schedule(schedule, [], [12, 16], graph)
+    assert [[c["code"] for c in q["courses"]] for q in repaired] == [["MATH 1A"], ["MATH 1C", "PHYS 4A"]]
+    assert [(w["code"], w["action"]) for w in warnings] == [("PHYS 4A", "shifted"), ("MATH 1C", "flagged")]
+
+    # a completed later course implies its own prerequisites
+    assert find_violations(schedule[1:], ["MATH 1B"], [12, 16], graph) == []
+
+    # no later quarter fits: a new one is appended after the last term
+    repaired, warnings = repair_schedule(schedule[:1], [], [12, 16], graph)
+    assert [q["term"] for q in repaired] == ["Fall 2025", "Winter 2026"]
+    assert warnings[0]["action"] == "split"
+    print("  ok")
+
+
+def test_sequence_guess_defers_to_graph():
+    """"MATH 2B needs 2A" is only guessed for courses the graph has no prerequisites for."""
+    print("Testing lettered-sequence guesses...")
+    graph = _graph({"MATH 2A": ["MATH 1C"], "MATH 2B": ["MATH 1C"]})
+    # the graph says 2A and 2B each need only 1C, so 2B may come before 2A
+    schedule = [{"term": "Fall 2025", "courses": [{"code": "MATH 1C", "units": 5}, {"code": "CIS 22B", "units": 4}]},
+                {"term": "Winter 2026", "courses": [{"code": "MATH 2B", "units": 5}, {"code": "CIS 22A", "units": 4}]},
+                {"term": "Spring 2026", "courses": [{"code": "MATH 2A", "units": 5}]}]
+    rules = [(v["code"], v["rule"]) for v in find_violations(schedule, [], [20, 20], graph)
+             if v["rule"] == "prerequisite"]
+    assert rules == [("CIS 22B", "prerequisite")], rules
+    repaired, warnings = repair_schedule(schedule, [], [20, 20], graph)
+    assert [(w["code"], w["action"]) for w in warnings] == [("CIS 22B", "shifted")], warnings
+    # without a graph the guess applies everywhere
+    assert ("MATH 2B", "prerequisite") in [(v["code"], v["rule"]) for v in find_violations(schedule, [], [20, 20])]
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_repair_clears_violations()
+    test_duplicates_keep_first_position()
+    test_prerequisites_shift_and_flag()
+    test_sequence_guess_defers_to_graph()
@@ -0,0 +1,75 @@
+import asyncio
+
+from app.modules.single_flight import SingleFlight
+
+
+def test_identical_callers_share_one_call():
+    print("Testing coalescing...")
+    flight = SingleFlight("test")
+    calls = []
+
+    async def lookup(key):
+        calls.append(key)
+        await asyncio.sleep(0.02)
+        return {"key": key, "call": len(calls)}
+
+    async def run():
+        results = await asyncio.gather(*(flight.do(key, lambda key=key: lookup(key)) for key in "aaab"))
+        assert results[0] is results[1] is results[2], "identical keys share one result"
+        assert results[3]["key"] == "b"
+        # keys are released when the call ends: this is coalescing, not caching
+        again = await flight.do("a", lambda: lookup("a"))
+        assert again is not results[0]
+
+    asyncio.run(run())
+    assert calls == ["a", "b", "a"]
+    assert flight.snapshot() == {"calls": 5, "upstream": 3, "coalesced": 2, "errors": 0, "in_flight": 0}
+    print("  ok")
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    print("Testing caller cancellation...")
+    flight = SingleFlight("test")
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def lookup():
+            await gate.wait()
+            return "plan"
+
+        leaver = asyncio.ensure_future(flight.do("k", lookup))
+        stayer = asyncio.ensure_future(flight.do("k", lookup))
+        await asyncio.sleep(0)
+        leaver.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        assert await stayer == "plan"
+        assert leaver.cancelled()
+
+    asyncio.run(run())
+    assert flight.stats["upstream"] == 1
+    print("  ok")
+
+
+def test_errors_reach_every_waiter():
+    print("Testing error propagation...")
+    flight = SingleFlight("test")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("ASSIST unavailable")
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("k", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) and str(r) == "ASSIST unavailable" for r in results), results
+
+    asyncio.run(run())
+    assert flight.snapshot() == {"calls": 3, "upstream": 1, "coalesced": 2, "errors": 1, "in_flight": 0}
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_identical_callers_share_one_call()
+    test_cancelled_caller_does_not_cancel_others()
+    test_errors_reach_every_waiter()
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+
+from app.modules import sonar_cache
+from app.modules.sonar_cache import SonarResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def _with_clock(test):
+    def run():
+        clock, original = Clock(), sonar_cache.time
+        sonar_cache.time = clock
+        try:
+            test(clock)
+        finally:
+            sonar_cache.time = original
+    run.__name__ = test.__name__
+    return run
+
+
+def _cache(url=None, **kwargs):
+    url = url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'sonar.db')}"
+    options = dict(ttl=100, stale_ttl=1000, memory_entries=8, max_entries=100, max_bytes=1 << 20)
+    options.update(kwargs)
+    return SonarResponseCache(url, **options)
+
+
+@_with_clock
+def test_ttl_and_stale_window(clock):
+    print("Testing TTL and stale window...")
+    cache = _cache()
+    cache.put("k", {"quarters": [1]})
+    assert cache.get("k") == {"quarters": [1]}
+    disk = _cache(cache.url)
+    assert disk.get("k") == {"quarters": [1]}, "disk tier survives a restart"
+
+    clock.advance(150)
+    for tier in (cache, _cache(cache.url)):  # memory tier, disk tier
+        assert tier.get("k", stale_ok=True) == {"quarters": [1]}
+        assert tier.get("k") is None
+        assert tier.get("k", stale_ok=True) == {"quarters": [1]}, "expired rows stay for the stale window"
+
+    memory = _cache(cache.url)
+    memory.put("m", {"quarters": [2]})
+    clock.advance(1200)  # past ttl + stale_ttl for both entries
+    assert memory.get("m", stale_ok=True) is None, "memory tier honours the stale window"
+    assert _cache(cache.url).get("k", stale_ok=True) is None, "disk tier honours the stale window"
+    print("  ok")
+
+
+@_with_clock
+def test_memory_lru(clock):
+    print("Testing memory LRU...")
+    cache = _cache(memory_entries=2)
+    for key in "abc":
+        cache.put(key, {"key": key})
+        clock.advance(1)
+    assert list(cache._memory) == ["b", "c"]
+    cache.get("b")
+    cache.put("d", {"key": "d"})
+    assert list(cache._memory) == ["b", "d"]
+    assert cache.get("a") == {"key": "a"}, "evicted from memory, still on disk"
+    assert cache.stats()["memory_evictions"] == 3
+    print("  ok")
+
+
+@_with_clock
+def test_disk_trimming(clock):
+    print("Testing disk trimming...")
+    # memory_entries=0 sends every read to disk, so reads refresh last_used
+    cache = _cache(memory_entries=0, max_entries=3)
+    for key in "abc":
+        cache.put(key, {"key": key})
+        clock.advance(1)
+    cache.get("a")
+    clock.advance(1)
+    cache.put("d", {"key": "d"})
+    assert [cache.get(key) is not None for key in "abcd"] == [True, False, True, True]
+
+    payload = {"text": "x" * 100}
+    size = len(json.dumps(payload))
+    cache = _cache(memory_entries=0, max_bytes=2 * size)
+    for key in "abc":
+        cache.put(key, payload)
+        clock.advance(1)
+    stats = cache.stats()
+    assert stats["disk_entries"] == 2 and stats["disk_bytes"] == 2 * size and stats["disk_evictions"] == 1
+    assert cache.get("a") is None and cache.get("c") == payload
+
+    # rows past the stale window are dropped on the next write
+    clock.advance(2000)
+    cache.put("e", payload)
+    assert cache.stats()["disk_entries"] == 1
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_ttl_and_stale_window()
+    test_memory_lru()
+    test_disk_trimming()
@@ -0,0 +1,202 @@
+import asyncio
+from contextlib import contextmanager
+
+import httpx
+
+from app.config import settings
+from app.modules import sonar_resilience
+from app.modules.sonar_resilience import CircuitBreaker, CircuitOpen, SonarResilience, SonarUnavailable
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@contextmanager
+def _settings(**overrides):
+    # fast retries by default; hedging only where a test turns it on
+    overrides = dict(dict(SONAR_RETRY_BASE_DELAY=0.001, SONAR_RETRY_MAX_DELAY=0.001, SONAR_MAX_ATTEMPTS=3,
+                          SONAR_HEDGE_PERCENTILE=0, SONAR_BREAKER_FAILURES=5), **overrides)
+    previous = {name: getattr(settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+
+def _status_error(status):
+    request = httpx.Request("POST", "https://api.perplexity.ai/chat/completions")
+    return httpx.HTTPStatusError(f"{status}", request=request, response=httpx.Response(status, request=request))
+
+
+def test_breaker_states():
+    print("Testing circuit breaker states...")
+    clock, original = Clock(), sonar_resilience.time
+    sonar_resilience.time = clock
+    try:
+        breaker = CircuitBreaker(failures=3, reset=10)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == "closed" and breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open" and not breaker.allow()
+        assert breaker.retry_after() == 10
+
+        # half-open lets one probe through; a failed probe reopens at once
+        clock.advance(10)
+        assert breaker.allow() and breaker.state == "half_open"
+        assert not breaker.allow(), "only one probe at a time"
+        breaker.record_failure()
+        assert breaker.state == "open" and not breaker.allow()
+
+        clock.advance(10)
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed" and breaker.allow()
+        assert breaker.snapshot() == {"opened": 2, "rejected": 3, "state": "closed", "consecutive_failures": 0}
+
+        # a probe that never reports back stops holding the circuit after `reset`
+        for _ in range(3):
+            breaker.record_failure()
+        clock.advance(10)
+        assert breaker.allow() and not breaker.allow()
+        clock.advance(10)
+        assert breaker.allow()
+    finally:
+        sonar_resilience.time = original
+    print("  ok")
+
+
+def test_client_errors_are_not_retried():
+    print("Testing non-retryable errors...")
+    with _settings():
+        resilience = SonarResilience()
+        calls = []
+
+        async def attempt(timeout):
+            calls.append(timeout)
+            raise _status_error(400)
+
+        try:
+            asyncio.run(resilience.call(attempt))
+        except httpx.HTTPStatusError as e:
+            assert e.response.status_code == 400
+        else:
+            raise AssertionError("expected the 400 to be raised")
+        assert len(calls) == 1 and resilience.stats["retries"] == 0
+        assert resilience.breaker.state == "closed", "a 4xx means the upstream is up"
+        assert sonar_resilience.is_retryable(_status_error(429)) and sonar_resilience.is_retryable(httpx.ReadTimeout("t"))
+    print("  ok")
+
+
+def test_retries_then_gives_up():
+    print("Testing retries and attempt limit...")
+    with _settings(SONAR_MAX_ATTEMPTS=3):
+        resilience = SonarResilience()
+        calls = []
+
+        async def flaky(timeout):
+            calls.append(timeout)
+            if len(calls) < 2:
+                raise httpx.ConnectError("refused")
+            return "plan"
+
+        assert asyncio.run(resilience.call(flaky)) == "plan"
+        assert len(calls) == 2 and resilience.stats["retries"] == 1
+
+        async def down(timeout):
+            calls.append(timeout)
+            raise _status_error(503)
+
+        calls.clear()
+        try:
+            asyncio.run(resilience.call(down))
+        except SonarUnavailable as e:
+            assert isinstance(e.__cause__, httpx.HTTPStatusError)
+        else:
+            raise AssertionError("expected SonarUnavailable")
+        assert len(calls) == 3 and resilience.stats["gave_up"] == 1
+    print("  ok")
+
+
+def test_retry_budget_and_open_circuit():
+    print("Testing retry budget and open circuit...")
+    with _settings(SONAR_MAX_ATTEMPTS=10, SONAR_RETRY_RATIO=0, SONAR_BREAKER_FAILURES=3):
+        resilience = SonarResilience()
+        resilience._tokens = 1
+        calls = []
+
+        async def down(timeout):
+            calls.append(timeout)
+            raise httpx.ReadTimeout("slow")
+
+        try:
+            asyncio.run(resilience.call(down))
+        except SonarUnavailable as e:
+            assert "retry budget" in str(e) and not isinstance(e, CircuitOpen)
+        else:
+            raise AssertionError("expected SonarUnavailable")
+        assert len(calls) == 2, "one retry token, one retry"
+        assert resilience.stats["retry_budget_denied"] == 1
+
+        # the next failure is the third in a row: it opens the circuit and the retry is rejected
+        resilience._tokens = 10
+        try:
+            asyncio.run(resilience.call(down))
+        except CircuitOpen:
+            pass
+        else:
+            raise AssertionError("expected CircuitOpen")
+        assert len(calls) == 3 and resilience.breaker.state == "open"
+    print("  ok")
+
+
+def test_hedge_wins_and_loser_is_cancelled():
+    print("Testing hedged requests...")
+    with _settings(SONAR_HEDGE_PERCENTILE=95, SONAR_HEDGE_MIN_SAMPLES=20):
+        resilience = SonarResilience()
+        assert resilience.hedge_delay() is None, "no hedging before enough samples"
+        for _ in range(20):
+            resilience.record_success(0.01)
+        assert resilience.hedge_delay() == 0.01
+        started, cancelled = [], []
+
+        async def attempt(timeout):
+            started.append(timeout)
+            if len(started) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return "slow"
+            return "fast"
+
+        async def run():
+            result = await resilience.call(attempt)
+            await asyncio.sleep(0)  # let the cancelled primary unwind
+            return result
+
+        assert asyncio.run(run()) == "fast"
+        assert len(started) == 2 and cancelled == [True]
+        assert resilience.stats["hedges"] == 1 and resilience.stats["hedge_wins"] == 1
+        assert resilience.snapshot()["calls"]["hedge_win_rate"] == 1.0
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_breaker_states()
+    test_client_errors_are_not_retried()
+    test_retries_then_gives_up()
+    test_retry_budget_and_open_circuit()
+    test_hedge_wins_and_loser_is_cancelled()
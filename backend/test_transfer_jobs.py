@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+from app.modules import transfer_jobs
+from app.modules.transfer_jobs import JobQueueFull, TransferJobManager
+
+
+def _wait(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _fake_lookup(release):
+    def get_transfer_courses(major_name_input, progress=None, **kwargs):
+        progress("resolving")
+        release.wait(5)
+        if major_name_input == "crash":
+            raise RuntimeError("boom")
+        if major_name_input == "missing":
+            return {"error": "not found", "requirements": []}
+        return {"requirements": [{"code": "MATH 1A"}]}
+    return get_transfer_courses
+
+
+def test_queue_full_and_events():
+    print("Testing job queue limits and events...")
+    release = threading.Event()
+    original = transfer_jobs.get_transfer_courses
+    transfer_jobs.get_transfer_courses = _fake_lookup(release)
+    try:
+        manager = TransferJobManager(workers=1, max_pending=2)
+        first = manager.submit({"major_name_input": "CS"})
+        second = manager.submit({"major_name_input": "crash"})
+        try:
+            manager.submit({"major_name_input": "Math"})
+        except JobQueueFull:
+            pass
+        else:
+            raise AssertionError("expected JobQueueFull")
+
+        async def collect(job):
+            return [record["event"] for record in [r async for r in job.stream()]]
+
+        async def run():
+            streams = [asyncio.ensure_future(collect(first)), asyncio.ensure_future(collect(second))]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*streams)
+
+        events = asyncio.run(run())
+        assert events[0] == ["queued", "running", "step", "done"], events
+        assert events[1] == ["queued", "running", "step", "failed"], events
+        assert first.result == {"requirements": [{"code": "MATH 1A"}]}
+        assert "boom" in second.result["error"] and second.status == "failed"
+        # finished jobs free their slots; a replayed stream ends at the final event
+        third = manager.submit({"major_name_input": "missing"})
+        _wait(lambda: third.finished)
+        assert third.status == "failed"
+        assert asyncio.run(collect(first)) == ["queued", "running", "step", "done"]
+    finally:
+        transfer_jobs.get_transfer_courses = original
+    print("  ok")
+
+
+def test_pruning():
+    print("Testing finished-job pruning...")
+    release = threading.Event()
+    release.set()
+    original = transfer_jobs.get_transfer_courses
+    transfer_jobs.get_transfer_courses = _fake_lookup(release)
+    try:
+        manager = TransferJobManager(workers=2, max_pending=10, retention=2, ttl=60)
+        jobs = [manager.submit({"major_name_input": f"Major {i}"}) for i in range(4)]
+        _wait(lambda: all(job.finished for job in jobs))
+        kept = [job for job in jobs if manager.get(job.id) is not None]
+        assert kept == jobs[-2:], "only the newest `retention` finished jobs are kept"
+
+        jobs[-1].finished_at -= 120
+        assert manager.get(jobs[-1].id) is None, "expired after ttl"
+    finally:
+        transfer_jobs.get_transfer_courses = original
+    print("  ok")
+
+
+if __name__ == "__main__":
+    test_queue_full_and_events()
+    test_pruning()